@@ -0,0 +1,409 @@
+"""
+Offline end-to-end benchmark of the request pipeline.
+
+Replays a corpus of queries (bench/corpus.jsonl) through JarvisEngine and
+the real skills, with every network dependency replaced by a local
+stand-in: the stub LLM server (bench/stub_llm.py), a fake OpenWeatherMap
+(bench/fake_weather.py) and a fake IMAP server (bench/fake_imap.py). The
+stand-ins run in a child process, so their threads neither compete with
+the engine for the GIL nor show up in the allocation numbers. HOME points
+at a temporary directory, so memories, caches and the skill manifest of
+the real user are never touched.
+
+    python -m bench.engine_bench --repeat 5 --out bench/results/head.json
+    python -m bench.engine_bench --repeat 5 --first-token-ms 300 --token-ms 15 --concurrency 4
+    python -m bench.engine_bench --repeat 5 --compare bench/results/base.json --tolerance 10
+
+Every pass replays the whole corpus once, after clearing the response and
+weather caches (repeated queries inside the corpus still hit them). The
+report covers p50/p95/p99 latency overall and per category, time to the
+first chunk in stream mode, throughput, and allocations per request
+(peak and retained KB, measured in a separate sequential pass under
+tracemalloc). With --compare, exits non-zero when a p95 got slower than
+the baseline by more than the tolerance.
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import platform
+import tempfile
+import subprocess
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+DEFAULT_CORPUS = os.path.join(ROOT, "bench", "corpus.jsonl")
+FALLBACK_REPLY = "I am having trouble connecting to the brain, sir."
+
+# Differences below this are noise, whatever the tolerance says
+NOISE_FLOOR_MS = 1.0
+
+
+def percentile(values: List[float], pct: float) -> float:
+    """Linear interpolation between closest ranks."""
+    ordered = sorted(values)
+    if not ordered:
+        return 0.0
+    position = (len(ordered) - 1) * pct / 100
+    lower = int(position)
+    upper = min(lower + 1, len(ordered) - 1)
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (position - lower)
+
+
+def summarize(values: List[float]) -> Dict[str, float]:
+    if not values:
+        return {}
+    return {
+        "count": len(values),
+        "mean": sum(values) / len(values),
+        "p50": percentile(values, 50),
+        "p95": percentile(values, 95),
+        "p99": percentile(values, 99),
+        "max": max(values)
+    }
+
+
+def load_corpus(path: str) -> List[Dict[str, Any]]:
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip() and not line.startswith("#")]
+
+
+# ================== STAND-IN SERVERS ==================
+def _serve_fakes(args):
+    """Child process: start the stand-ins, print their addresses, run until stdin closes."""
+    from bench.stub_llm import StubLLMServer
+    from bench.fake_weather import FakeWeatherServer
+    from bench.fake_imap import FakeIMAPServer, FakeMailbox, seed
+
+    llm = StubLLMServer(
+        script=load_corpus(args.corpus),
+        first_token_ms=args.first_token_ms,
+        token_ms=args.token_ms
+    ).start()
+    weather = FakeWeatherServer(latency=args.service_latency_ms / 1000).start()
+    imap = FakeIMAPServer(
+        mailbox=seed(FakeMailbox(), args.messages),
+        latency=args.service_latency_ms / 1000
+    ).start()
+
+    print(json.dumps({"llm": llm.base_url, "weather": weather.url, "imap_port": imap.port}), flush=True)
+    sys.stdin.read()
+
+
+class Fakes:
+    """The stand-in servers, running in a child process."""
+
+    def __init__(self, args):
+        command = [
+            sys.executable, "-m", "bench.engine_bench", "--serve-fakes",
+            "--corpus", args.corpus,
+            "--first-token-ms", str(args.first_token_ms),
+            "--token-ms", str(args.token_ms),
+            "--service-latency-ms", str(args.service_latency_ms),
+            "--messages", str(args.messages)
+        ]
+        self.process = subprocess.Popen(command, cwd=ROOT, stdin=subprocess.PIPE, stdout=subprocess.PIPE, text=True)
+        line = self.process.stdout.readline()
+        if not line:
+            self.process.wait()
+            raise RuntimeError("Stand-in servers failed to start")
+        self.addresses = json.loads(line)
+
+    def stop(self):
+        try:
+            self.process.stdin.close()
+            self.process.wait(timeout=5)
+        except subprocess.TimeoutExpired:
+            self.process.kill()
+            self.process.wait()
+
+
+def configure_environment(addresses: Dict[str, Any], home: str):
+    """Point the engine and skills at the stand-ins and a throwaway HOME."""
+    os.environ.update({
+        "HOME": home,
+        "GROQ_API_KEY": "bench",
+        "GROQ_BASE_URL": addresses["llm"],
+        "OPENWEATHERMAP_API_KEY": "bench",
+        "OPENWEATHERMAP_URL": addresses["weather"],
+        "EMAIL_ADDRESS": "bench@example.com",
+        "EMAIL_PASSWORD": "bench",
+        "EMAIL_IMAP_SERVER": "127.0.0.1",
+        "EMAIL_IMAP_PORT": str(addresses["imap_port"]),
+        "EMAIL_IMAP_SSL": "0",
+        "JARVIS_SKILL_MANIFEST": os.path.join(home, "skill_manifest.json"),
+        "JARVIS_WARMUP": "0"
+    })
+    os.environ.pop("JARVIS_CACHE_PATH", None)
+
+    with open(os.path.join(home, "notes.txt"), "w", encoding="utf-8") as f:
+        for i in range(200):
+            f.write(f"{i + 1}. Launch checklist item {i + 1}: verify subsystem {i % 12} and sign off.\n")
+
+
+# ================== REPLAY ==================
+class Replayer:
+    def __init__(self, engine, mode: str):
+        self.engine = engine
+        self.mode = mode
+
+    def reset_caches(self):
+        from core.cache import get_cache
+        self.engine.response_cache.clear()
+        get_cache("weather").clear()
+
+    def request(self, entry: Dict[str, Any]) -> Dict[str, Any]:
+        """Run one query; returns its timings and whether the reply is what the script says."""
+        first_chunk_ms = None
+        started = time.perf_counter()
+
+        if self.mode == "stream":
+            parts = []
+            for text in self.engine.stream_conversation(entry["query"]):
+                if first_chunk_ms is None:
+                    first_chunk_ms = (time.perf_counter() - started) * 1000
+                parts.append(text)
+            reply = "".join(parts)
+        else:
+            reply = self.engine.run_conversation(entry["query"]) or ""
+
+        total_ms = (time.perf_counter() - started) * 1000
+        expected = entry.get("reply")
+        ok = bool(reply) and reply != FALLBACK_REPLY and (expected is None or reply.strip() == expected)
+
+        return {
+            "id": entry["id"],
+            "category": entry.get("category", "other"),
+            "total_ms": total_ms,
+            "first_chunk_ms": first_chunk_ms,
+            "ok": ok,
+            "reply": None if ok else reply
+        }
+
+    def latency_passes(self, corpus: List[Dict[str, Any]], repeat: int, concurrency: int):
+        samples = []
+        wall = 0.0
+        with ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="bench") as pool:
+            for _ in range(repeat):
+                self.reset_caches()
+                started = time.perf_counter()
+                samples.extend(pool.map(self.request, corpus))
+                wall += time.perf_counter() - started
+        return samples, wall
+
+    def allocation_pass(self, corpus: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Peak and retained bytes per request, one request at a time."""
+        self.reset_caches()
+        results = []
+        tracemalloc.start()
+        try:
+            for entry in corpus:
+                before, _ = tracemalloc.get_traced_memory()
+                tracemalloc.reset_peak()
+                self.request(entry)
+                after, peak = tracemalloc.get_traced_memory()
+                results.append({
+                    "id": entry["id"],
+                    "category": entry.get("category", "other"),
+                    "peak_kb": (peak - before) / 1024,
+                    "retained_kb": (after - before) / 1024
+                })
+        finally:
+            tracemalloc.stop()
+        return results
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True, text=True, check=True
+        ).stdout.strip()
+        dirty = subprocess.run(
+            ["git", "status", "--porcelain", "--untracked-files=no"], cwd=ROOT, capture_output=True, text=True
+        ).stdout.strip()
+        return commit + ("-dirty" if dirty else "")
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run(args) -> Dict[str, Any]:
+    corpus = load_corpus(args.corpus)
+    fakes = Fakes(args)
+    home = tempfile.TemporaryDirectory(prefix="jarvis-bench-")
+    try:
+        configure_environment(fakes.addresses, home.name)
+
+        from core.registry import SkillRegistry
+        from core.engine import JarvisEngine
+
+        started = time.perf_counter()
+        registry = SkillRegistry()
+        registry.load_skills(os.path.join(ROOT, "skill"), lazy=True)
+        engine = JarvisEngine(registry)
+        replayer = Replayer(engine, args.mode)
+
+        # Lazy imports, connection set-up and the mailbox watcher happen here
+        for _ in range(args.warmup):
+            replayer.reset_caches()
+            for entry in corpus:
+                replayer.request(entry)
+        warmup_ms = (time.perf_counter() - started) * 1000
+
+        samples, wall = replayer.latency_passes(corpus, args.repeat, args.concurrency)
+        allocations = [] if args.no_alloc else replayer.allocation_pass(corpus)
+    finally:
+        fakes.stop()
+        home.cleanup()
+
+    categories = sorted({s["category"] for s in samples})
+    result = {
+        "meta": {
+            "commit": _git_commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "time": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+            "corpus": os.path.relpath(args.corpus, ROOT),
+            "mode": args.mode,
+            "repeat": args.repeat,
+            "concurrency": args.concurrency,
+            "first_token_ms": args.first_token_ms,
+            "token_ms": args.token_ms,
+            "service_latency_ms": args.service_latency_ms
+        },
+        "warmup_ms": warmup_ms,
+        "requests": len(samples),
+        "errors": [
+            {"id": s["id"], "reply": s["reply"]} for s in samples if not s["ok"]
+        ],
+        "throughput_rps": len(samples) / wall if wall else 0.0,
+        "latency_ms": summarize([s["total_ms"] for s in samples]),
+        "first_chunk_ms": summarize([s["first_chunk_ms"] for s in samples if s["first_chunk_ms"] is not None]),
+        "categories": {
+            category: summarize([s["total_ms"] for s in samples if s["category"] == category])
+            for category in categories
+        }
+    }
+
+    if allocations:
+        result["allocations_kb"] = {
+            "peak": summarize([a["peak_kb"] for a in allocations]),
+            "retained": summarize([a["retained_kb"] for a in allocations]),
+            "per_request": allocations
+        }
+    return result
+
+
+# ================== COMPARISON ==================
+def _flatten(result: Dict[str, Any]) -> Dict[str, float]:
+    """p95 of every latency series, by name."""
+    flat = {}
+    if result.get("latency_ms"):
+        flat["latency"] = result["latency_ms"]["p95"]
+    if result.get("first_chunk_ms"):
+        flat["first_chunk"] = result["first_chunk_ms"]["p95"]
+    for category, stats in result.get("categories", {}).items():
+        flat[f"category:{category}"] = stats["p95"]
+    return flat
+
+
+def compare(base: Dict[str, Any], head: Dict[str, Any], tolerance: float) -> List[str]:
+    """Lines describing p95 regressions beyond tolerance percent (empty if none)."""
+    regressions = []
+    base_flat, head_flat = _flatten(base), _flatten(head)
+    for name in sorted(base_flat.keys() & head_flat.keys()):
+        before, after = base_flat[name], head_flat[name]
+        if after - before > NOISE_FLOOR_MS and after > before * (1 + tolerance / 100):
+            regressions.append(f"{name} p95 {before:.1f} -> {after:.1f} ms (+{(after / before - 1) * 100:.0f}%)")
+
+    before, after = base.get("throughput_rps"), head.get("throughput_rps")
+    if before and after and after < before / (1 + tolerance / 100):
+        regressions.append(f"throughput {before:.1f} -> {after:.1f} req/s")
+    return regressions
+
+
+def print_report(result: Dict[str, Any]):
+    def row(label: str, stats: Dict[str, float]):
+        if stats:
+            print(
+                f"  {label:<18} n={stats['count']:<4} p50 {stats['p50']:8.2f}  p95 {stats['p95']:8.2f}  "
+                f"p99 {stats['p99']:8.2f}  mean {stats['mean']:8.2f}"
+            )
+
+    meta = result["meta"]
+    print(
+        f"{result['requests']} requests ({meta['mode']}, concurrency {meta['concurrency']}) "
+        f"at {meta['commit'] or 'unknown commit'}; warm-up {result['warmup_ms']:.0f} ms"
+    )
+    print("latency (ms):")
+    row("all", result["latency_ms"])
+    row("first chunk", result["first_chunk_ms"])
+    for category, stats in result["categories"].items():
+        row(category, stats)
+    print(f"throughput: {result['throughput_rps']:.1f} req/s")
+
+    allocations = result.get("allocations_kb")
+    if allocations:
+        print(
+            f"allocations per request: peak {allocations['peak']['mean']:.1f} KB mean "
+            f"({allocations['peak']['max']:.1f} max), retained {allocations['retained']['mean']:.1f} KB mean"
+        )
+    if result["errors"]:
+        print(f"FAIL: {len(result['errors'])} unexpected replies")
+        for error in result["errors"][:5]:
+            print(f"  {error['id']}: {error['reply']!r}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline request pipeline benchmark")
+    parser.add_argument("--corpus", default=DEFAULT_CORPUS)
+    parser.add_argument("--mode", choices=["stream", "run"], default="stream")
+    parser.add_argument("--repeat", type=int, default=5, help="Measured passes over the corpus")
+    parser.add_argument("--warmup", type=int, default=1, help="Unmeasured passes first")
+    parser.add_argument("--concurrency", type=int, default=1)
+    parser.add_argument("--first-token-ms", type=float, default=0, help="Stub LLM delay before the first token")
+    parser.add_argument("--token-ms", type=float, default=0, help="Stub LLM delay per streamed word")
+    parser.add_argument("--service-latency-ms", type=float, default=0, help="Weather/IMAP delay per request")
+    parser.add_argument("--messages", type=int, default=40, help="Messages in the fake mailbox")
+    parser.add_argument("--no-alloc", action="store_true", help="Skip the tracemalloc pass")
+    parser.add_argument("--out", help="Write the results as JSON")
+    parser.add_argument("--compare", help="Baseline JSON from an earlier run")
+    parser.add_argument("--tolerance", type=float, default=10, help="Allowed p95 slowdown in percent")
+    parser.add_argument("--serve-fakes", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.serve_fakes:
+        _serve_fakes(args)
+        return
+
+    result = run(args)
+    print_report(result)
+
+    if args.out:
+        os.makedirs(os.path.dirname(os.path.abspath(args.out)), exist_ok=True)
+        with open(args.out, "w") as f:
+            json.dump(result, f, indent=2)
+
+    failed = bool(result["errors"])
+    if args.compare:
+        with open(args.compare) as f:
+            base = json.load(f)
+        for key in ("mode", "concurrency", "first_token_ms", "token_ms", "service_latency_ms"):
+            if base["meta"].get(key) != result["meta"][key]:
+                print(f"warning: baseline ran with {key}={base['meta'].get(key)}, this run with {result['meta'][key]}")
+        regressions = compare(base, result, args.tolerance)
+        print(f"compared with {base['meta'].get('commit') or args.compare}: "
+              f"{'no regressions' if not regressions else 'REGRESSED'}")
+        for line in regressions:
+            print(f"  {line}")
+        failed = failed or bool(regressions)
+
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
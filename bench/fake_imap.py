@@ -0,0 +1,307 @@
+"""
+Plain-text IMAP server with an in-memory INBOX, for benchmarks.
+
+Supports what the email skill and MailboxWatcher use: LOGIN, SELECT /
+EXAMINE, STATUS, SEARCH, FETCH / UID FETCH (flags, header fields,
+CHANGEDSINCE) and IDLE. Point the skill at it with:
+
+    EMAIL_IMAP_SERVER=127.0.0.1 EMAIL_IMAP_PORT=<port> EMAIL_IMAP_SSL=0
+
+    python -m bench.fake_imap --port 1143 --messages 50
+"""
+import re
+import time
+import argparse
+import queue
+import select
+import threading
+import socketserver
+from email.utils import formatdate
+from typing import Dict, List, Optional
+
+
+class FakeMailbox:
+    """In-memory INBOX with UIDs, flags, MODSEQ and IDLE notifications."""
+
+    def __init__(self, uidvalidity: int = 1):
+        self.uidvalidity = uidvalidity
+        self.uidnext = 1
+        self.modseq = 1
+        self.messages: List[Dict] = []
+        self.lock = threading.RLock()
+        self.listeners: List[queue.Queue] = []
+
+    def _notify(self, line: str):
+        for listener in list(self.listeners):
+            listener.put(line)
+
+    def add(self, sender: str, subject: str, seen: bool = False) -> int:
+        with self.lock:
+            uid = self.uidnext
+            self.uidnext += 1
+            self.modseq += 1
+            header = (
+                f"From: {sender}\r\nSubject: {subject}\r\n"
+                f"Date: {formatdate(localtime=True)}\r\n\r\n"
+            ).encode()
+            self.messages.append({
+                "uid": uid,
+                "flags": {"\\Seen"} if seen else set(),
+                "header": header,
+                "modseq": self.modseq
+            })
+            self._notify(f"* {len(self.messages)} EXISTS")
+            return uid
+
+    def expunge(self, uid: int):
+        with self.lock:
+            for index, message in enumerate(self.messages):
+                if message["uid"] == uid:
+                    del self.messages[index]
+                    self.modseq += 1
+                    self._notify(f"* {index + 1} EXPUNGE")
+                    return
+
+    def set_seen(self, uid: int, seen: bool = True):
+        with self.lock:
+            for index, message in enumerate(self.messages):
+                if message["uid"] == uid:
+                    if seen:
+                        message["flags"].add("\\Seen")
+                    else:
+                        message["flags"].discard("\\Seen")
+                    self.modseq += 1
+                    message["modseq"] = self.modseq
+                    flags = " ".join(sorted(message["flags"]))
+                    self._notify(f"* {index + 1} FETCH (FLAGS ({flags}) UID {uid})")
+                    return
+
+    def unseen(self) -> int:
+        with self.lock:
+            return sum(1 for message in self.messages if "\\Seen" not in message["flags"])
+
+
+def parse_set(text: str, maximum: int) -> List[range]:
+    ranges = []
+    for part in text.split(","):
+        if ":" in part:
+            a, b = part.split(":")
+        else:
+            a = b = part
+        lo = maximum if a == "*" else int(a)
+        hi = maximum if b == "*" else int(b)
+        lo, hi = min(lo, hi), max(lo, hi)
+        ranges.append(range(lo, hi + 1))
+    return ranges
+
+
+class FakeIMAPHandler(socketserver.StreamRequestHandler):
+    disable_nagle_algorithm = True
+
+    def send(self, line):
+        if isinstance(line, str):
+            line = line.encode()
+        self.wfile.write(line + b"\r\n")
+
+    def handle(self):
+        self.send("* OK [CAPABILITY IMAP4rev1 IDLE CONDSTORE] fake IMAP ready")
+        self.selected = False
+
+        while True:
+            raw = self.rfile.readline()
+            if not raw:
+                return
+            line = raw.decode().rstrip("\r\n")
+            parts = line.split(" ", 2)
+            if len(parts) < 2:
+                continue
+            tag, command = parts[0], parts[1].upper()
+            rest = parts[2] if len(parts) > 2 else ""
+
+            if self.server.latency:
+                time.sleep(self.server.latency)
+            self.server.command_log.append(f"{command} {rest}".strip())
+
+            handler = getattr(self, f"cmd_{command.lower()}", None)
+            if handler is None:
+                self.send(f"{tag} BAD unknown command {command}")
+                continue
+            if handler(tag, rest) is False:
+                return
+
+    @property
+    def mailbox(self) -> FakeMailbox:
+        return self.server.mailbox
+
+    def cmd_capability(self, tag, rest):
+        self.send("* CAPABILITY IMAP4rev1 IDLE CONDSTORE")
+        self.send(f"{tag} OK CAPABILITY completed")
+
+    def cmd_login(self, tag, rest):
+        self.send(f"{tag} OK LOGIN completed")
+
+    def cmd_noop(self, tag, rest):
+        self.send(f"{tag} OK NOOP completed")
+
+    def cmd_logout(self, tag, rest):
+        self.send("* BYE logging out")
+        self.send(f"{tag} OK LOGOUT completed")
+        return False
+
+    def cmd_close(self, tag, rest):
+        self.selected = False
+        self.send(f"{tag} OK CLOSE completed")
+
+    def _select(self, tag, rest, name):
+        with self.mailbox.lock:
+            self.send(f"* {len(self.mailbox.messages)} EXISTS")
+            self.send(f"* OK [UIDVALIDITY {self.mailbox.uidvalidity}] UIDs valid")
+            self.send(f"* OK [UIDNEXT {self.mailbox.uidnext}] next UID")
+            self.send(f"* OK [HIGHESTMODSEQ {self.mailbox.modseq}] modseq")
+        self.selected = True
+        self.send(f"{tag} OK [READ-WRITE] {name} completed")
+
+    def cmd_select(self, tag, rest):
+        self._select(tag, rest, "SELECT")
+
+    def cmd_examine(self, tag, rest):
+        self._select(tag, rest, "EXAMINE")
+
+    def cmd_status(self, tag, rest):
+        with self.mailbox.lock:
+            self.send(
+                f"* STATUS INBOX (MESSAGES {len(self.mailbox.messages)} "
+                f"UNSEEN {self.mailbox.unseen()} UIDNEXT {self.mailbox.uidnext} "
+                f"UIDVALIDITY {self.mailbox.uidvalidity})"
+            )
+        self.send(f"{tag} OK STATUS completed")
+
+    def cmd_search(self, tag, rest, by_uid=False):
+        with self.mailbox.lock:
+            messages = list(enumerate(self.mailbox.messages, start=1))
+            criteria = rest.upper()
+            if criteria.startswith("UID "):
+                max_uid = messages[-1][1]["uid"] if messages else 0
+                ranges = parse_set(rest.split()[1], max_uid)
+                messages = [(seq, m) for seq, m in messages if any(m["uid"] in r for r in ranges)]
+            elif "UNSEEN" in criteria:
+                messages = [(seq, m) for seq, m in messages if "\\Seen" not in m["flags"]]
+            ids = [str(m["uid"] if by_uid else seq) for seq, m in messages]
+        self.send("* SEARCH " + " ".join(ids) if ids else "* SEARCH")
+        self.send(f"{tag} OK SEARCH completed")
+
+    def cmd_fetch(self, tag, rest, by_uid=False):
+        match = re.match(r"(\S+) \((.*?)\)(?: \(CHANGEDSINCE (\d+)\))?$", rest)
+        if not match:
+            self.send(f"{tag} BAD fetch syntax")
+            return
+        id_set, items, changed_since = match.group(1), match.group(2).upper(), match.group(3)
+
+        with self.mailbox.lock:
+            messages = list(enumerate(self.mailbox.messages, start=1))
+            if messages:
+                maximum = messages[-1][1]["uid"] if by_uid else len(messages)
+                ranges = parse_set(id_set, maximum)
+                for seq, message in messages:
+                    key = message["uid"] if by_uid else seq
+                    if not any(key in r for r in ranges):
+                        continue
+                    if changed_since and message["modseq"] <= int(changed_since):
+                        continue
+                    attrs = f"UID {message['uid']}"
+                    if "FLAGS" in items:
+                        attrs += f" FLAGS ({' '.join(sorted(message['flags']))})"
+                    if "HEADER.FIELDS" in items:
+                        header = message["header"]
+                        self.wfile.write(
+                            f"* {seq} FETCH ({attrs} BODY[HEADER.FIELDS (FROM SUBJECT DATE)] "
+                            f"{{{len(header)}}}\r\n".encode() + header + b")\r\n"
+                        )
+                    else:
+                        self.send(f"* {seq} FETCH ({attrs})")
+        self.send(f"{tag} OK FETCH completed")
+
+    def cmd_uid(self, tag, rest):
+        sub, _, args = rest.partition(" ")
+        sub = sub.upper()
+        if sub == "FETCH":
+            self.cmd_fetch(tag, args, by_uid=True)
+        elif sub == "SEARCH":
+            self.cmd_search(tag, args, by_uid=True)
+        else:
+            self.send(f"{tag} BAD unsupported UID command")
+
+    def cmd_idle(self, tag, rest):
+        events: queue.Queue = queue.Queue()
+        self.mailbox.listeners.append(events)
+        self.send("+ idling")
+        try:
+            while True:
+                try:
+                    while True:
+                        self.send(events.get_nowait())
+                except queue.Empty:
+                    pass
+
+                readable, _, _ = select.select([self.connection], [], [], 0.05)
+                if readable:
+                    line = self.rfile.readline()
+                    if not line:
+                        return False
+                    if line.strip().upper() == b"DONE":
+                        break
+        finally:
+            self.mailbox.listeners.remove(events)
+        self.send(f"{tag} OK IDLE terminated")
+
+
+class FakeIMAPServer(socketserver.ThreadingTCPServer):
+    """Plain-text IMAP stand-in for tests and benchmarks (EMAIL_IMAP_SSL=0)."""
+
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, address=("127.0.0.1", 0), mailbox: Optional[FakeMailbox] = None, latency: float = 0.0):
+        super().__init__(address, FakeIMAPHandler)
+        self.mailbox = mailbox or FakeMailbox()
+        self.latency = latency
+        self.command_log: List[str] = []
+
+    @property
+    def port(self) -> int:
+        return self.server_address[1]
+
+    def start(self) -> "FakeIMAPServer":
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+        return self
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+
+
+def seed(mailbox: FakeMailbox, count: int, unread: int = None) -> FakeMailbox:
+    """Fill mailbox with count messages, the last `unread` of them unseen."""
+    unread = count // 4 if unread is None else unread
+    for i in range(count):
+        mailbox.add(f"Sender {i % 7} <sender{i % 7}@example.com>", f"Message {i + 1}", seen=i < count - unread)
+    return mailbox
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fake IMAP server")
+    parser.add_argument("--port", type=int, default=1143)
+    parser.add_argument("--messages", type=int, default=20)
+    parser.add_argument("--latency-ms", type=float, default=0, help="Delay before every command")
+    args = parser.parse_args()
+
+    server = FakeIMAPServer(("127.0.0.1", args.port), seed(FakeMailbox(), args.messages), args.latency_ms / 1000)
+    print(f"Fake IMAP on 127.0.0.1:{server.port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+"""
+OpenWeatherMap stand-in for benchmarks.
+
+Answers GET /data/2.5/weather?q=<city> (or zip=) with a deterministic
+report per city; "atlantis" is unknown (404). Point the weather skill at
+it with:
+
+    OPENWEATHERMAP_API_KEY=bench OPENWEATHERMAP_URL=http://127.0.0.1:<port>/data/2.5/weather
+
+    python -m bench.fake_weather --port 8081 --latency-ms 80
+"""
+import json
+import time
+import zlib
+import argparse
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+CONDITIONS = ["clear sky", "few clouds", "scattered clouds", "light rain", "overcast clouds", "mist"]
+UNKNOWN_CITIES = {"atlantis"}
+
+
+def report(city: str) -> dict:
+    # Same city, same weather: keeps runs comparable
+    seed = zlib.crc32(city.lower().encode())
+    return {
+        "name": city.title(),
+        "sys": {"country": "XX"},
+        "main": {
+            "temp": 5 + seed % 300 / 10,
+            "feels_like": 4 + seed % 290 / 10,
+            "humidity": 30 + seed % 60
+        },
+        "weather": [{"description": CONDITIONS[seed % len(CONDITIONS)]}],
+        "wind": {"speed": round(seed % 120 / 10, 1)}
+    }
+
+
+class FakeWeatherHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send(self, status: int, payload: dict):
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_HEAD(self):
+        # pool.warm_up() touches the host
+        self.send_response(200)
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        if self.server.latency:
+            time.sleep(self.server.latency)
+        self.server.request_count += 1
+
+        if url.path != "/data/2.5/weather":
+            self._send(404, {"cod": "404", "message": "not found"})
+            return
+
+        params = parse_qs(url.query)
+        city = (params.get("q") or params.get("zip") or [""])[0].split(",")[0].strip()
+        if not city or city.lower() in UNKNOWN_CITIES:
+            self._send(404, {"cod": "404", "message": "city not found"})
+            return
+        self._send(200, report(city))
+
+
+class FakeWeatherServer(ThreadingHTTPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, address=("127.0.0.1", 0), latency: float = 0.0):
+        super().__init__(address, FakeWeatherHandler)
+        self.latency = latency
+        self.request_count = 0
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.server_address[1]}/data/2.5/weather"
+
+    def start(self) -> "FakeWeatherServer":
+        threading.Thread(target=self.serve_forever, name="fake-weather", daemon=True).start()
+        return self
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fake OpenWeatherMap server")
+    parser.add_argument("--port", type=int, default=8081)
+    parser.add_argument("--latency-ms", type=float, default=0)
+    args = parser.parse_args()
+
+    server = FakeWeatherServer(("127.0.0.1", args.port), args.latency_ms / 1000)
+    print(f"Fake weather at {server.url}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
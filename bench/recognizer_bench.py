@@ -0,0 +1,167 @@
+"""
+Benchmark wake-word detection and speech recognition on recorded WAV files.
+
+Fixtures are 16-bit WAV files in one directory, each optionally paired
+with a .txt file holding the expected command (without the wake word).
+A WAV without a .txt file is background speech that Jarvis should ignore.
+
+    python -m bench.recognizer_bench bench/fixtures/audio --recognizer vosk google --wake vosk off
+
+Every file runs through the same AudioPipeline (VAD segmentation) as the
+microphone. The report covers wake accuracy, word error rate, per-stage
+latency, and how many utterances reached the recognizer.
+"""
+import os
+import sys
+import glob
+import json
+import time
+import argparse
+import statistics
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.audio import AudioPipeline, WavFileSource
+from core.voice import WakeGate, get_recognizer, get_wake_detector
+
+
+def word_error_rate(reference: str, hypothesis: str) -> float:
+    ref, hyp = reference.lower().split(), hypothesis.lower().split()
+    if not ref:
+        return 0.0 if not hyp else 1.0
+
+    previous = list(range(len(hyp) + 1))
+    for i, ref_word in enumerate(ref, start=1):
+        current = [i]
+        for j, hyp_word in enumerate(hyp, start=1):
+            current.append(min(
+                previous[j] + 1,
+                current[j - 1] + 1,
+                previous[j - 1] + (ref_word != hyp_word)
+            ))
+        previous = current
+    return previous[-1] / len(ref)
+
+
+class _Timed:
+    """Wraps a detector or recognizer and records how long each call took."""
+
+    def __init__(self, inner, method: str):
+        self.inner = inner
+        self.method = method
+        self.timings = []
+
+    def __getattr__(self, name):
+        return getattr(self.inner, name)
+
+    def _call(self, *args):
+        started = time.perf_counter()
+        try:
+            return getattr(self.inner, self.method)(*args)
+        finally:
+            self.timings.append((time.perf_counter() - started) * 1000)
+
+    def find(self, *args):
+        return self._call(*args)
+
+    def recognize(self, *args):
+        return self._call(*args)
+
+
+def _percentile(values, pct):
+    if not values:
+        return None
+    ordered = sorted(values)
+    return round(ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))], 1)
+
+
+def run(fixtures, recognizer_name: str, wake_name: str, wake_word: str = "jarvis") -> dict:
+    recognizer = _Timed(get_recognizer(recognizer_name), "recognize")
+    detector = get_wake_detector(wake_name)
+    if wake_name != "off" and detector is None:
+        raise SystemExit(f"Wake engine '{wake_name}' is not installed")
+    detector = _Timed(detector, "find") if detector else None
+    gate = WakeGate(detector, recognizer, wake_word) if detector else None
+
+    files = []
+    for path in fixtures:
+        expected_path = os.path.splitext(path)[0] + ".txt"
+        expected = open(expected_path).read().strip() if os.path.exists(expected_path) else None
+
+        started = time.perf_counter()
+        pipeline = AudioPipeline(WavFileSource(path)).start()
+        transcripts = []
+        for utterance in pipeline:
+            if gate is not None:
+                text = gate.process(utterance.pcm, utterance.sample_rate)
+                if text:
+                    transcripts.append(text[len(wake_word):].strip())
+            else:
+                text = recognizer.recognize(utterance.to_audio_data())
+                if text:
+                    transcripts.append(text.lower().replace(wake_word, "").strip())
+        gate and setattr(gate, "armed_until", 0.0)
+
+        heard = " ".join(transcripts)
+        files.append({
+            "file": os.path.basename(path),
+            "expected": expected,
+            "heard": heard,
+            "accepted": bool(heard),
+            "wer": word_error_rate(expected, heard) if expected is not None else None,
+            "total_ms": round((time.perf_counter() - started) * 1000, 1)
+        })
+
+    addressed = [f for f in files if f["expected"] is not None]
+    background = [f for f in files if f["expected"] is None]
+    wers = [f["wer"] for f in addressed]
+
+    return {
+        "recognizer": recognizer_name,
+        "wake": wake_name,
+        "files": len(files),
+        "wake_recall": round(sum(f["accepted"] for f in addressed) / len(addressed), 3) if addressed else None,
+        "false_accepts": sum(f["accepted"] for f in background),
+        "mean_wer": round(statistics.mean(wers), 3) if wers else None,
+        "recognizer_calls": len(recognizer.timings),
+        "recognize_ms": {"p50": _percentile(recognizer.timings, 50), "p95": _percentile(recognizer.timings, 95)},
+        "wake_ms": {
+            "p50": _percentile(detector.timings, 50) if detector else None,
+            "p95": _percentile(detector.timings, 95) if detector else None
+        },
+        "details": files
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Wake word / recognizer benchmark on WAV fixtures")
+    parser.add_argument("fixtures", help="Directory of .wav files (with optional .txt transcripts)")
+    parser.add_argument("--recognizer", nargs="+", default=["google"], help="Recognizers to compare")
+    parser.add_argument("--wake", nargs="+", default=["auto"], help="Wake engines to compare (or 'off')")
+    parser.add_argument("--wake-word", default="jarvis")
+    parser.add_argument("--json", help="Write the full results to this file")
+    args = parser.parse_args()
+
+    fixtures = sorted(glob.glob(os.path.join(args.fixtures, "*.wav")))
+    if not fixtures:
+        raise SystemExit(f"No .wav files in {args.fixtures}")
+
+    results = []
+    for recognizer_name in args.recognizer:
+        for wake_name in args.wake:
+            result = run(fixtures, recognizer_name, wake_name, args.wake_word)
+            results.append(result)
+            print(
+                f"{recognizer_name:>8} / wake={wake_name:<12} "
+                f"recall={result['wake_recall']} false_accepts={result['false_accepts']} "
+                f"wer={result['mean_wer']} calls={result['recognizer_calls']}/{len(fixtures)} "
+                f"recognize p50={result['recognize_ms']['p50']}ms wake p50={result['wake_ms']['p50']}ms"
+            )
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
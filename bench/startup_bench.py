@@ -0,0 +1,224 @@
+"""
+Cold-start benchmark for headless text mode.
+
+    python -m bench.startup_bench --runs 5 --budget-ms 400
+
+Three checks, each in a fresh interpreter:
+
+- import profile: `python -X importtime -c "import main"`, reduced to the
+  total and the slowest top-level imports. Fails if main pulls in a
+  module that text mode must not load (Qt, voice, groq, numpy).
+- registry: main.load_registry() must find tools and intents; a start-up
+  that loads no skills is fast for the wrong reason. This also writes the
+  skill manifest, so the timed runs measure the usual warm-manifest start.
+- time to prompt: `python main.py --text` until "YOU:" is printed, then
+  "exit" is sent. Fails if the median is over the budget.
+
+Exits non-zero when a check fails, so it can gate CI.
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import tempfile
+import selectors
+import statistics
+import subprocess
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Start-up budget for `main.py --text` to its first prompt
+DEFAULT_BUDGET_MS = 400
+
+# Loaded on first use only; importing any of these from main is a regression
+FORBIDDEN_MODULES = [
+    "PyQt6",
+    "speech_recognition",
+    "pyttsx3",
+    "pyaudio",
+    "groq",
+    "numpy",
+    "requests"
+]
+
+
+# Throwaway skill manifest, so runs neither depend on nor touch the user's
+_MANIFEST = os.path.join(tempfile.mkdtemp(prefix="jarvis-startup-"), "skill_manifest.json")
+
+
+def _env() -> dict:
+    env = dict(os.environ)
+    # main exits without a key; nothing here talks to the API
+    env.setdefault("GROQ_API_KEY", "bench")
+    env["JARVIS_WARMUP"] = "0"
+    env["JARVIS_SKILL_MANIFEST"] = _MANIFEST
+    env["PYTHONDONTWRITEBYTECODE"] = "1"
+    return env
+
+
+def registry_size() -> dict:
+    """Tools, intents and lazily loaded functions of the registry main builds."""
+    script = (
+        "import json, main; r = main.load_registry(); "
+        "print(json.dumps({'tools': len(r.tools_schema), 'intents': len(r.intents), "
+        "'functions': len(r.functions) + len(r.lazy_functions)}))"
+    )
+    result = subprocess.run([sys.executable, "-c", script], cwd=ROOT, env=_env(), capture_output=True, text=True)
+    if result.returncode != 0:
+        raise RuntimeError(f"main.load_registry() failed:\n{result.stderr}")
+    # Skills imported while writing the manifest print first
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def import_profile(top: int = 15) -> dict:
+    """Parse -X importtime output for `import main` (times in ms)."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import main"],
+        cwd=ROOT, env=_env(), capture_output=True, text=True
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"import main failed:\n{result.stderr}")
+
+    modules = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        # "import time:   self_us |   cumulative_us |   <indent>name"
+        head, cumulative_us, name = line.split("|", 2)
+        self_us = head.split(":", 1)[1].strip()
+        cumulative_us = cumulative_us.strip()
+        if not cumulative_us.isdigit():
+            continue
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        modules.append({
+            "module": name.strip(),
+            "depth": depth,
+            "self_ms": int(self_us) / 1000,
+            "cumulative_ms": int(cumulative_us) / 1000
+        })
+
+    # Children are listed before their parent: collect the block that
+    # ends with "main" (anything earlier was imported by site)
+    main, block = None, []
+    for module in modules:
+        block.append(module)
+        if module["depth"] == 0:
+            if module["module"] == "main":
+                main = module
+                break
+            block = []
+
+    forbidden = sorted({
+        m["module"].split(".")[0] for m in block
+        if any(m["module"] == f or m["module"].startswith(f + ".") for f in FORBIDDEN_MODULES)
+    })
+    children = [m for m in block if m["depth"] == 1]
+
+    return {
+        "total_ms": main["cumulative_ms"] if main else None,
+        "slowest": sorted(children, key=lambda m: m["cumulative_ms"], reverse=True)[:top],
+        "forbidden": forbidden
+    }
+
+
+def time_to_prompt(timeout: float = 30) -> float:
+    """Seconds from spawning `main.py --text` to its first "YOU:" prompt."""
+    started = time.perf_counter()
+    process = subprocess.Popen(
+        [sys.executable, "main.py", "--text"],
+        cwd=ROOT, env=_env(),
+        stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.STDOUT
+    )
+    selector = selectors.DefaultSelector()
+    selector.register(process.stdout, selectors.EVENT_READ)
+
+    output = b""
+    elapsed = None
+    try:
+        while time.perf_counter() - started < timeout:
+            if not selector.select(timeout=0.5):
+                continue
+            chunk = os.read(process.stdout.fileno(), 4096)
+            if not chunk:
+                break
+            output += chunk
+            if b"YOU:" in output:
+                elapsed = time.perf_counter() - started
+                break
+
+        if elapsed is None:
+            raise RuntimeError(f"No prompt within {timeout}s:\n{output.decode(errors='replace')}")
+
+        process.stdin.write(b"exit\n")
+        process.stdin.flush()
+        try:
+            process.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            pass
+    finally:
+        selector.close()
+        if process.poll() is None:
+            process.kill()
+            process.wait()
+    return elapsed
+
+
+def run(runs: int = 5, budget_ms: float = DEFAULT_BUDGET_MS) -> dict:
+    profile = import_profile()
+    registry = registry_size()
+    timings = [time_to_prompt() * 1000 for _ in range(runs)]
+    median = statistics.median(timings)
+
+    return {
+        "import_ms": profile["total_ms"],
+        "slowest_imports": profile["slowest"],
+        "forbidden_imports": profile["forbidden"],
+        "registry": registry,
+        "prompt_ms": {"median": median, "min": min(timings), "max": max(timings), "runs": timings},
+        "budget_ms": budget_ms,
+        "ok": median <= budget_ms and not profile["forbidden"] and registry["tools"] > 0
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Text-mode cold start benchmark")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument(
+        "--budget-ms", type=float,
+        default=float(os.environ.get("JARVIS_STARTUP_BUDGET_MS", DEFAULT_BUDGET_MS)),
+        help="Maximum median time to the first prompt"
+    )
+    parser.add_argument("--json", help="Write the full results to this file")
+    args = parser.parse_args()
+
+    result = run(args.runs, args.budget_ms)
+
+    print(f"import main: {result['import_ms']:.1f} ms")
+    for module in result["slowest_imports"]:
+        print(f"  {module['cumulative_ms']:8.1f} ms  {module['module']}")
+
+    registry = result["registry"]
+    print(f"registry: {registry['tools']} tools, {registry['intents']} intents, {registry['functions']} functions")
+    if not registry["tools"]:
+        print("FAIL: no skills loaded")
+
+    prompt = result["prompt_ms"]
+    print(
+        f"time to prompt: median {prompt['median']:.0f} ms "
+        f"(min {prompt['min']:.0f}, max {prompt['max']:.0f}, budget {result['budget_ms']:.0f})"
+    )
+    if result["forbidden_imports"]:
+        print(f"FAIL: text mode imports {', '.join(result['forbidden_imports'])}")
+    if prompt["median"] > result["budget_ms"]:
+        print("FAIL: over the start-up budget")
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(result, f, indent=2)
+
+    sys.exit(0 if result["ok"] else 1)
+
+
+if __name__ == "__main__":
+    main()
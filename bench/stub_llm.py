@@ -0,0 +1,248 @@
+"""
+Local OpenAI/Groq-compatible chat completions server for benchmarks.
+
+Serves POST /openai/v1/chat/completions (the Groq SDK path; /v1/... works
+too) in both plain JSON and SSE streaming form, plus GET .../models for
+the connection warm-up. Replies follow a script keyed by the user's
+query: an entry can answer with text, or with tool_calls first and its
+reply once the tool results come back. Latency is simulated as a delay
+before the first token plus a delay per streamed word.
+
+Point the engine at it with GROQ_BASE_URL=http://127.0.0.1:<port>.
+
+    python -m bench.stub_llm --port 8080 --corpus bench/corpus.jsonl --first-token-ms 300 --token-ms 20
+"""
+import json
+import time
+import uuid
+import argparse
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional, Tuple
+
+
+def _normalize(text: str) -> str:
+    return " ".join(text.lower().split())
+
+
+def _tokens(text: str) -> int:
+    return len(text) // 4 + 1 if text else 0
+
+
+class StubLLMHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    # Small SSE writes must not wait for delayed ACKs
+    disable_nagle_algorithm = True
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send_json(self, status: int, payload: Dict[str, Any]):
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _write_chunk(self, data: bytes):
+        # HTTP/1.1 chunked framing keeps the connection reusable
+        self.wfile.write(f"{len(data):x}\r\n".encode() + data + b"\r\n")
+        self.wfile.flush()
+
+    def _send_event(self, payload: Any):
+        data = payload if isinstance(payload, str) else json.dumps(payload)
+        self._write_chunk(f"data: {data}\n\n".encode())
+
+    def do_GET(self):
+        if self.path.rstrip("/").endswith("/models"):
+            self._send_json(200, {
+                "object": "list",
+                "data": [{"id": self.server.model, "object": "model", "created": 0, "owned_by": "bench"}]
+            })
+        else:
+            self._send_json(404, {"error": {"message": "not found"}})
+
+    def do_POST(self):
+        if not self.path.rstrip("/").endswith("/chat/completions"):
+            self._send_json(404, {"error": {"message": "not found"}})
+            return
+
+        length = int(self.headers.get("Content-Length", "0"))
+        request = json.loads(self.rfile.read(length) or b"{}")
+        messages = request.get("messages", [])
+        self.server.request_count += 1
+
+        content, tool_calls = self.server.plan(messages, bool(request.get("tools")))
+        prompt_tokens = sum(_tokens(m.get("content") or "") for m in messages)
+        usage = {
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": _tokens(content) + sum(_tokens(c["function"]["arguments"]) for c in tool_calls),
+        }
+        usage["total_tokens"] = usage["prompt_tokens"] + usage["completion_tokens"]
+
+        if request.get("stream"):
+            self._stream(request, content, tool_calls, usage)
+        else:
+            self._complete(request, content, tool_calls, usage)
+
+    def _complete(self, request, content: str, tool_calls: List[Dict[str, Any]], usage: Dict[str, int]):
+        words = content.split()
+        time.sleep(self.server.first_token + self.server.per_token * len(words))
+
+        message: Dict[str, Any] = {"role": "assistant", "content": content or None}
+        if tool_calls:
+            message["tool_calls"] = tool_calls
+        self._send_json(200, {
+            "id": f"chatcmpl-{uuid.uuid4().hex[:12]}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": request.get("model", self.server.model),
+            "choices": [{
+                "index": 0,
+                "message": message,
+                "finish_reason": "tool_calls" if tool_calls else "stop"
+            }],
+            "usage": usage
+        })
+
+    def _stream(self, request, content: str, tool_calls: List[Dict[str, Any]], usage: Dict[str, int]):
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+
+        completion_id = f"chatcmpl-{uuid.uuid4().hex[:12]}"
+        model = request.get("model", self.server.model)
+
+        def chunk(delta: Dict[str, Any], finish_reason: Optional[str] = None, **extra) -> Dict[str, Any]:
+            payload = {
+                "id": completion_id,
+                "object": "chat.completion.chunk",
+                "created": int(time.time()),
+                "model": model,
+                "choices": [{"index": 0, "delta": delta, "finish_reason": finish_reason}]
+            }
+            payload.update(extra)
+            return payload
+
+        try:
+            time.sleep(self.server.first_token)
+            self._send_event(chunk({"role": "assistant", "content": ""}))
+
+            words = content.split(" ") if content else []
+            for i, word in enumerate(words):
+                if i:
+                    time.sleep(self.server.per_token)
+                self._send_event(chunk({"content": word if i == 0 else " " + word}))
+
+            for index, call in enumerate(tool_calls):
+                # Arguments arrive in two pieces, like the real API
+                arguments = call["function"]["arguments"]
+                half = len(arguments) // 2
+                self._send_event(chunk({"tool_calls": [{
+                    "index": index, "id": call["id"], "type": "function",
+                    "function": {"name": call["function"]["name"], "arguments": arguments[:half]}
+                }]}))
+                self._send_event(chunk({"tool_calls": [{
+                    "index": index, "function": {"arguments": arguments[half:]}
+                }]}))
+
+            self._send_event(chunk(
+                {}, "tool_calls" if tool_calls else "stop",
+                x_groq={"id": completion_id, "usage": usage}
+            ))
+            self._send_event("[DONE]")
+            self._write_chunk(b"")
+        except (BrokenPipeError, ConnectionResetError):
+            # The client closed the stream (cancelled request)
+            self.close_connection = True
+
+
+class StubLLMServer(ThreadingHTTPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(
+        self,
+        address=("127.0.0.1", 0),
+        script: List[Dict[str, Any]] = None,
+        first_token_ms: float = 0,
+        token_ms: float = 0,
+        model: str = "stub-model"
+    ):
+        super().__init__(address, StubLLMHandler)
+        self.first_token = first_token_ms / 1000
+        self.per_token = token_ms / 1000
+        self.model = model
+        self.request_count = 0
+        self.script: Dict[str, Dict[str, Any]] = {}
+        for entry in script or []:
+            self.script[_normalize(entry["query"])] = entry
+
+    @property
+    def base_url(self) -> str:
+        return f"http://127.0.0.1:{self.server_address[1]}"
+
+    def _entry_for(self, text: str) -> Optional[Dict[str, Any]]:
+        key = _normalize(text)
+        if key in self.script:
+            return self.script[key]
+        # The engine may add context around the query
+        for query, entry in self.script.items():
+            if query in key:
+                return entry
+        return None
+
+    def plan(self, messages: List[Dict[str, Any]], tools_offered: bool) -> Tuple[str, List[Dict[str, Any]]]:
+        """(text, tool_calls) to answer messages with."""
+        user = next((m for m in reversed(messages) if m.get("role") == "user"), None)
+        query = (user or {}).get("content") or ""
+        entry = self._entry_for(query) or {}
+
+        answered_tools = bool(messages) and messages[-1].get("role") == "tool"
+        if entry.get("tool_calls") and tools_offered and not answered_tools:
+            return entry.get("preamble", ""), [
+                {
+                    "id": f"call_{uuid.uuid4().hex[:8]}",
+                    "type": "function",
+                    "function": {"name": call["name"], "arguments": json.dumps(call.get("arguments", {}))}
+                }
+                for call in entry["tool_calls"]
+            ]
+
+        return entry.get("reply") or f"This is the stub model answering: {query[:80]}", []
+
+    def start(self) -> "StubLLMServer":
+        threading.Thread(target=self.serve_forever, name="stub-llm", daemon=True).start()
+        return self
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+
+
+def load_corpus(path: str) -> List[Dict[str, Any]]:
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip() and not line.startswith("#")]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Stub OpenAI/Groq chat completions server")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--corpus", help="JSONL script (see bench/corpus.jsonl)")
+    parser.add_argument("--first-token-ms", type=float, default=0)
+    parser.add_argument("--token-ms", type=float, default=0)
+    args = parser.parse_args()
+
+    script = load_corpus(args.corpus) if args.corpus else []
+    server = StubLLMServer(("127.0.0.1", args.port), script, args.first_token_ms, args.token_ms)
+    print(f"Stub LLM at {server.base_url} ({len(script)} scripted queries)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
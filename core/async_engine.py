@@ -0,0 +1,188 @@
+import time
+import asyncio
+from typing import AsyncIterator, Dict, List, Optional
+
+from core.engine import JarvisEngine
+from core.registry import SkillRegistry
+from core.session import ConversationSession
+from core.cancel import CancelToken
+from core.pool import get_async_llm_client
+from core.metrics import atimed_stream
+from core import tracing
+
+
+async def _close_stream(stream):
+    close = getattr(stream, "close", None) or getattr(stream, "aclose", None)
+    if close is None:
+        return
+    try:
+        result = close()
+        if asyncio.iscoroutine(result):
+            await result
+    except Exception:
+        pass
+
+
+class AsyncJarvisEngine(JarvisEngine):
+    """
+    Coroutine version of JarvisEngine for the asyncio main loop.
+
+    LLM calls go through AsyncGroq. Tools run through
+    ToolExecutor.run_async: coroutine skills are awaited, sync skills run
+    on the tool thread pool. Prompt building, tool selection, caching and
+    sessions are shared with JarvisEngine; sessions still compact their
+    history with the sync client on their own thread.
+    """
+
+    def __init__(self, registry: SkillRegistry):
+        super().__init__(registry)
+        self._async_client = None
+
+    @property
+    def async_client(self):
+        if self._async_client is None:
+            self._async_client = get_async_llm_client()
+        return self._async_client
+
+    @async_client.setter
+    def async_client(self, client):
+        self._async_client = client
+
+    async def run_conversation(
+        self,
+        user_prompt: str,
+        session: Optional[ConversationSession] = None,
+        cancel_token: Optional[CancelToken] = None
+    ) -> str:
+        return "".join([text async for text in self.stream_conversation(user_prompt, session, cancel_token)])
+
+    async def stream_conversation(
+        self,
+        user_prompt: str,
+        session: Optional[ConversationSession] = None,
+        cancel_token: Optional[CancelToken] = None
+    ) -> AsyncIterator[str]:
+        """
+        Yield text chunks as they arrive. Cancelling the consuming task (or
+        calling aclose()) closes the LLM stream; whatever was yielded so far
+        is recorded in the session. cancel_token reaches the tools: skills
+        that take a cancel_token argument get it, so work running on the
+        tool pool stops too.
+        """
+        parts: List[str] = []
+        try:
+            async for text in self._stream_turn_async(user_prompt, session, cancel_token):
+                parts.append(text)
+                yield text
+        finally:
+            if session is not None and parts:
+                session.add_turn(user_prompt, "".join(parts))
+
+    async def _stream_turn_async(
+        self,
+        user_prompt: str,
+        session: Optional[ConversationSession],
+        cancel_token: Optional[CancelToken]
+    ) -> AsyncIterator[str]:
+        # ⚡ LOCAL FAST-PATH (blocking skills run on the tool pool)
+        with tracing.span("intent_route") as route_span:
+            routed = await self.router.route_async(user_prompt)
+            route_span.set(matched=routed is not None)
+        if routed is not None:
+            yield routed
+            return
+
+        use_cache = self._use_response_cache(session)
+        if use_cache:
+            found, cached_response = self.response_cache.get(self._response_key(user_prompt))
+            if found:
+                yield cached_response
+                return
+
+        messages = self._build_messages(user_prompt, session)
+
+        started = time.perf_counter()
+        llm_span = self._llm_span(messages, stream=True)
+        try:
+            stream = await self.async_client.chat.completions.create(
+                stream=True, **self._completion_kwargs(messages, self._selection_query(user_prompt, session))
+            )
+        except Exception as e:
+            llm_span.end(error=e)
+            yield "I am having trouble connecting to the brain, sir."
+            return
+
+        content_parts: List[str] = []
+        pending_calls: Dict[int, Dict[str, str]] = {}
+
+        try:
+            async for chunk in atimed_stream(tracing.atraced_stream(stream, llm_span), started):
+                if cancel_token and cancel_token.cancelled:
+                    return
+                if not chunk.choices:
+                    continue
+                delta = chunk.choices[0].delta
+
+                if delta.content:
+                    content_parts.append(delta.content)
+                    yield delta.content
+
+                for call_delta in delta.tool_calls or []:
+                    self._merge_tool_call_delta(pending_calls, call_delta)
+        except Exception:
+            if not content_parts and not (cancel_token and cancel_token.cancelled):
+                yield "I am having trouble connecting to the brain, sir."
+            return
+        finally:
+            await _close_stream(stream)
+
+        if not pending_calls:
+            if use_cache and content_parts:
+                self.response_cache.set(self._response_key(user_prompt), "".join(content_parts))
+            return
+
+        # =====================================================
+        # TOOL EXECUTION
+        tool_calls = [pending_calls[index] for index in sorted(pending_calls)]
+        messages.append(self._tool_call_message("".join(content_parts), tool_calls))
+
+        jobs, error = self._prepare_tool_jobs(tool_calls, cancel_token)
+        if not error:
+            results = await self.executor.run_async(jobs, cancel_token)
+            error = self._append_tool_results(
+                messages, tool_calls, results, session.tool_output_chars if session else None
+            )
+        if cancel_token and cancel_token.cancelled:
+            return
+        if error:
+            yield error
+            return
+
+        # =====================================================
+        # FINAL RESPONSE (NO TOOLS, NO JSON)
+        final_stream = None
+        llm_span = self._llm_span(messages, stream=True)
+        try:
+            started = time.perf_counter()
+            final_stream = await self.async_client.chat.completions.create(
+                model=self.model_name,
+                messages=messages,
+                max_tokens=200,
+                stream=True
+            )
+            async for chunk in atimed_stream(tracing.atraced_stream(final_stream, llm_span), started):
+                if cancel_token and cancel_token.cancelled:
+                    return
+                if chunk.choices and chunk.choices[0].delta.content:
+                    yield chunk.choices[0].delta.content
+        except Exception as e:
+            llm_span.end(error=e)
+            if not (cancel_token and cancel_token.cancelled):
+                yield "I encountered an error while executing the request."
+        finally:
+            if final_stream is not None:
+                await _close_stream(final_stream)
+
+    async def aclose(self):
+        """Stop the tool pool; shared clients are closed by pool.aclose_all()."""
+        self.executor.shutdown()
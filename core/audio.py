@@ -0,0 +1,465 @@
+import os
+import time
+import wave
+import queue
+import threading
+from collections import deque
+from typing import Deque, Optional
+
+import numpy as np
+
+SAMPLE_WIDTH = 2  # 16-bit PCM throughout the pipeline
+
+
+# ================== SOURCES ==================
+class MicrophoneSource:
+    """
+    Microphone opened once and kept open, read in fixed-size frames.
+
+    Uses speech_recognition's PyAudio wrapper, so it works wherever
+    sr.Microphone already does.
+    """
+
+    realtime = True
+
+    def __init__(self, sample_rate: int = 16000, frame_ms: int = 30, device_index: int = None):
+        self.sample_rate = sample_rate
+        self.frame_ms = frame_ms
+        self.frame_samples = sample_rate * frame_ms // 1000
+        self.device_index = device_index
+        self._mic = None
+
+    def open(self):
+        import speech_recognition as sr
+        self._mic = sr.Microphone(
+            device_index=self.device_index,
+            sample_rate=self.sample_rate,
+            chunk_size=self.frame_samples
+        )
+        self._mic.__enter__()
+
+    def read(self) -> Optional[bytes]:
+        return self._mic.stream.read(self.frame_samples)
+
+    def close(self):
+        if self._mic is not None:
+            self._mic.__exit__(None, None, None)
+            self._mic = None
+
+
+class WavFileSource:
+    """
+    16-bit WAV file fed through the same pipeline as the microphone.
+
+    With realtime=False frames are delivered as fast as the pipeline takes
+    them (tests, benchmarks); with realtime=True at the recording's pace.
+    Stereo files are mixed down to mono.
+    """
+
+    def __init__(self, path: str, frame_ms: int = 30, realtime: bool = False):
+        self.path = path
+        self.frame_ms = frame_ms
+        self.realtime = realtime
+        self._wav = None
+
+        with wave.open(path, "rb") as wav:
+            if wav.getsampwidth() != SAMPLE_WIDTH:
+                raise ValueError(f"{path}: only 16-bit PCM WAV files are supported")
+            self.sample_rate = wav.getframerate()
+            self.channels = wav.getnchannels()
+        self.frame_samples = self.sample_rate * frame_ms // 1000
+
+    def open(self):
+        self._wav = wave.open(self.path, "rb")
+        self._next_at = time.monotonic()
+
+    def read(self) -> Optional[bytes]:
+        data = self._wav.readframes(self.frame_samples)
+        if len(data) < self.frame_samples * SAMPLE_WIDTH * self.channels:
+            return None
+
+        if self.channels > 1:
+            samples = np.frombuffer(data, dtype=np.int16).reshape(-1, self.channels)
+            data = samples.mean(axis=1).astype(np.int16).tobytes()
+
+        if self.realtime:
+            self._next_at += self.frame_ms / 1000
+            delay = self._next_at - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+        return data
+
+    def close(self):
+        if self._wav is not None:
+            self._wav.close()
+            self._wav = None
+
+
+# ================== RING BUFFER ==================
+class RingBuffer:
+    """
+    Bounded frame buffer between the capture thread and the segmenter.
+
+    A realtime source must never stall, so when the segmenter falls behind
+    the oldest frames are overwritten (and counted). File sources block
+    instead, so no test audio is lost.
+    """
+
+    def __init__(self, capacity: int, overwrite: bool = True):
+        self._frames: Deque[Optional[bytes]] = deque()
+        self.capacity = capacity
+        self.overwrite = overwrite
+        self.dropped = 0
+        self._cond = threading.Condition()
+
+    def put(self, frame: Optional[bytes]):
+        with self._cond:
+            if len(self._frames) >= self.capacity:
+                if self.overwrite:
+                    self._frames.popleft()
+                    self.dropped += 1
+                else:
+                    self._cond.wait_for(lambda: len(self._frames) < self.capacity)
+            self._frames.append(frame)
+            self._cond.notify_all()
+
+    def get(self, timeout: float = None):
+        """Next frame; None marks the end of the source. Raises queue.Empty on timeout."""
+        with self._cond:
+            if not self._cond.wait_for(lambda: self._frames, timeout):
+                raise queue.Empty
+            frame = self._frames.popleft()
+            self._cond.notify_all()
+            return frame
+
+    def __len__(self):
+        with self._cond:
+            return len(self._frames)
+
+
+# ================== VOICE ACTIVITY DETECTION ==================
+def frame_energy(frame: bytes) -> float:
+    samples = np.frombuffer(frame, dtype=np.int16).astype(np.float32)
+    if not samples.size:
+        return 0.0
+    return float(np.sqrt(np.mean(samples * samples)))
+
+
+class EnergyVAD:
+    """
+    RMS-energy voice activity detector with an adaptive noise floor.
+
+    The floor is a low percentile of the frame energies over the last
+    window_s seconds (minimum statistics): speech is bursty and barely
+    moves it, while a fan switching on or the room going quiet is tracked
+    within a few seconds. This replaces the blocking
+    adjust_for_ambient_noise() call; the first calibration_ms of audio only
+    seeds the floor.
+    """
+
+    def __init__(
+        self,
+        frame_ms: int = 30,
+        ratio: float = 3.0,
+        min_energy: float = 300.0,
+        window_s: float = 3.0,
+        percentile: float = 10.0,
+        calibration_ms: int = 300
+    ):
+        self.ratio = ratio
+        self.min_energy = min_energy
+        self.percentile = percentile
+        self.calibration_frames = max(1, calibration_ms // frame_ms)
+
+        self.noise_floor: Optional[float] = None
+        self._energies: Deque[float] = deque(maxlen=max(self.calibration_frames, int(window_s * 1000 // frame_ms)))
+        self._seen = 0
+        # Recomputing the percentile every few frames is plenty
+        self._update_every = 5
+
+    @property
+    def threshold(self) -> float:
+        return max(self.min_energy, (self.noise_floor or 0.0) * self.ratio)
+
+    def is_speech(self, frame: bytes) -> bool:
+        energy = frame_energy(frame)
+        self._energies.append(energy)
+        self._seen += 1
+
+        if self._seen <= self.calibration_frames or self._seen % self._update_every == 0:
+            self.noise_floor = float(np.percentile(self._energies, self.percentile))
+
+        if self._seen <= self.calibration_frames:
+            return False
+        return energy > self.threshold
+
+
+class WebRTCVAD(EnergyVAD):
+    """
+    webrtcvad's classifier gated by the energy detector: the GMM rejects
+    loud non-speech (clicks, music), the energy gate rejects quiet speech-
+    like background. The noise floor keeps adapting exactly as in EnergyVAD.
+    """
+
+    SUPPORTED_RATES = (8000, 16000, 32000, 48000)
+
+    def __init__(self, sample_rate: int, frame_ms: int = 30, aggressiveness: int = 2, **kwargs):
+        import webrtcvad
+        if sample_rate not in self.SUPPORTED_RATES or frame_ms not in (10, 20, 30):
+            raise ValueError("webrtcvad needs 8/16/32/48 kHz audio in 10/20/30 ms frames")
+        # Speech must also clear a lower energy bar than with energy alone
+        kwargs.setdefault("ratio", 1.5)
+        super().__init__(frame_ms=frame_ms, **kwargs)
+        self.sample_rate = sample_rate
+        self._vad = webrtcvad.Vad(aggressiveness)
+
+    def is_speech(self, frame: bytes) -> bool:
+        loud_enough = super().is_speech(frame)
+        return loud_enough and self._vad.is_speech(frame, self.sample_rate)
+
+
+def make_vad(sample_rate: int, frame_ms: int = 30) -> EnergyVAD:
+    """WebRTC VAD when installed (and not disabled with JARVIS_VAD=energy)."""
+    if os.environ.get("JARVIS_VAD", "webrtc") != "energy":
+        try:
+            return WebRTCVAD(sample_rate, frame_ms, aggressiveness=int(os.environ.get("JARVIS_VAD_LEVEL", "2")))
+        except (ImportError, ValueError):
+            pass
+    return EnergyVAD(frame_ms=frame_ms)
+
+
+# ================== UTTERANCES ==================
+class Utterance:
+    """One segment of speech as 16-bit mono PCM."""
+
+    def __init__(self, pcm: bytes, sample_rate: int, started_at: float):
+        self.pcm = pcm
+        self.sample_rate = sample_rate
+        # Seconds from the start of the stream
+        self.started_at = started_at
+        # time.monotonic() when the pipeline finished the utterance
+        self.ended_at: Optional[float] = None
+
+    @property
+    def duration(self) -> float:
+        return len(self.pcm) / (SAMPLE_WIDTH * self.sample_rate)
+
+    def to_audio_data(self):
+        """As speech_recognition AudioData, for the recognizers."""
+        import speech_recognition as sr
+        return sr.AudioData(self.pcm, self.sample_rate, SAMPLE_WIDTH)
+
+    def save(self, path: str):
+        with wave.open(path, "wb") as wav:
+            wav.setnchannels(1)
+            wav.setsampwidth(SAMPLE_WIDTH)
+            wav.setframerate(self.sample_rate)
+            wav.writeframes(self.pcm)
+
+
+class UtteranceSegmenter:
+    """
+    Cuts a frame stream into utterances.
+
+    Speech starts after start_ms of mostly voiced frames and ends after
+    silence_ms without speech (the old pause_threshold of 0.8 s). The
+    pre-roll keeps the quiet onset of the first word.
+    """
+
+    def __init__(
+        self,
+        vad: EnergyVAD,
+        sample_rate: int,
+        frame_ms: int = 30,
+        pre_roll_ms: int = 300,
+        start_ms: int = 90,
+        silence_ms: int = 800,
+        min_speech_ms: int = 250,
+        max_utterance_s: float = 15.0
+    ):
+        self.vad = vad
+        self.sample_rate = sample_rate
+        self.frame_ms = frame_ms
+        self.start_frames = max(1, start_ms // frame_ms)
+        self.silence_frames = max(1, silence_ms // frame_ms)
+        self.min_speech_frames = max(1, min_speech_ms // frame_ms)
+        self.max_frames = int(max_utterance_s * 1000 // frame_ms)
+
+        self._pre_roll: Deque[bytes] = deque(maxlen=max(1, pre_roll_ms // frame_ms))
+        self._window: Deque[bool] = deque(maxlen=self.start_frames * 2)
+        self._frames = []
+        self._speech_frames = 0
+        self._silent_run = 0
+        self._frame_index = 0
+        self._started_at = 0.0
+
+    @property
+    def in_speech(self) -> bool:
+        return bool(self._frames)
+
+    def feed(self, frame: bytes) -> Optional[Utterance]:
+        speech = self.vad.is_speech(frame)
+        self._frame_index += 1
+
+        if not self._frames:
+            self._pre_roll.append(frame)
+            self._window.append(speech)
+            if sum(self._window) >= self.start_frames:
+                self._frames = list(self._pre_roll)
+                self._started_at = (self._frame_index - len(self._frames)) * self.frame_ms / 1000
+                self._speech_frames = sum(self._window)
+                self._silent_run = 0
+                self._pre_roll.clear()
+                self._window.clear()
+            return None
+
+        self._frames.append(frame)
+        if speech:
+            self._speech_frames += 1
+            self._silent_run = 0
+        else:
+            self._silent_run += 1
+
+        if self._silent_run >= self.silence_frames or len(self._frames) >= self.max_frames:
+            return self._finish()
+        return None
+
+    def flush(self) -> Optional[Utterance]:
+        """End of stream: return speech still in progress."""
+        return self._finish() if self._frames else None
+
+    def _finish(self) -> Optional[Utterance]:
+        # Drop the trailing silence except a short tail
+        keep_tail = min(self._silent_run, self.start_frames * 2)
+        frames = self._frames[:len(self._frames) - self._silent_run + keep_tail]
+        speech_frames = self._speech_frames
+
+        self._frames = []
+        self._speech_frames = 0
+        self._silent_run = 0
+
+        if speech_frames < self.min_speech_frames:
+            return None
+        return Utterance(b"".join(frames), self.sample_rate, self._started_at)
+
+
+# ================== PIPELINE ==================
+class AudioPipeline:
+    """
+    Continuous capture -> ring buffer -> VAD segmenter -> utterance queue.
+
+    Capture runs on its own thread and never waits for recognition, so the
+    next command is recorded while the current one is being recognized.
+    """
+
+    def __init__(self, source, vad: EnergyVAD = None, ring_seconds: float = 5.0, max_pending: int = 8, **segmenter_kwargs):
+        self.source = source
+        self.vad = vad or make_vad(source.sample_rate, source.frame_ms)
+        self.segmenter = UtteranceSegmenter(self.vad, source.sample_rate, source.frame_ms, **segmenter_kwargs)
+        self.ring = RingBuffer(
+            capacity=max(1, int(ring_seconds * 1000 // source.frame_ms)),
+            overwrite=getattr(source, "realtime", True)
+        )
+        self.utterances: "queue.Queue[Optional[Utterance]]" = queue.Queue(maxsize=max_pending)
+
+        self.frames_captured = 0
+        self.utterances_dropped = 0
+        self.finished = threading.Event()
+
+        self._stop = threading.Event()
+        self._threads = []
+
+    # ================== PUBLIC API ==================
+    def start(self) -> "AudioPipeline":
+        self.source.open()
+        self._stop.clear()
+        self._threads = [
+            threading.Thread(target=self._capture, name="jarvis-audio-capture", daemon=True),
+            threading.Thread(target=self._segment, name="jarvis-audio-vad", daemon=True)
+        ]
+        for thread in self._threads:
+            thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        for thread in self._threads:
+            thread.join(timeout=1)
+        self.source.close()
+
+    def get_utterance(self, timeout: float = None) -> Optional[Utterance]:
+        """Next utterance, or None on timeout / end of a file source."""
+        if self.finished.is_set() and self.utterances.empty():
+            return None
+        try:
+            return self.utterances.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+    def __iter__(self):
+        """Utterances until a file source is exhausted."""
+        while True:
+            utterance = self.utterances.get()
+            if utterance is None:
+                return
+            yield utterance
+
+    def stats(self) -> dict:
+        return {
+            "frames_captured": self.frames_captured,
+            "frames_dropped": self.ring.dropped,
+            "utterances_pending": self.utterances.qsize(),
+            "utterances_dropped": self.utterances_dropped,
+            "noise_floor": round(self.vad.noise_floor or 0.0, 1),
+            "threshold": round(self.vad.threshold, 1)
+        }
+
+    # ================== THREADS ==================
+    def _capture(self):
+        try:
+            while not self._stop.is_set():
+                frame = self.source.read()
+                if frame is None:
+                    break
+                self.frames_captured += 1
+                self.ring.put(frame)
+        except Exception as e:
+            print(f"Audio capture error: {e}")
+        finally:
+            self.ring.put(None)
+
+    def _segment(self):
+        while not self._stop.is_set():
+            try:
+                frame = self.ring.get(timeout=0.5)
+            except queue.Empty:
+                continue
+
+            utterance = self.segmenter.feed(frame) if frame is not None else self.segmenter.flush()
+            if utterance is not None:
+                self._emit(utterance)
+            if frame is None:
+                break
+
+        self.finished.set()
+        self._emit(None)
+
+    def _emit(self, utterance: Optional[Utterance]):
+        if utterance is not None:
+            utterance.ended_at = time.monotonic()
+        if not getattr(self.source, "realtime", True):
+            # File source: wait for the consumer, lose nothing
+            self.utterances.put(utterance)
+            return
+
+        while True:
+            try:
+                self.utterances.put_nowait(utterance)
+                return
+            except queue.Full:
+                # Nobody is listening; drop the oldest rather than stall the VAD
+                try:
+                    self.utterances.get_nowait()
+                    self.utterances_dropped += 1
+                except queue.Empty:
+                    pass
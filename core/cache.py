@@ -0,0 +1,292 @@
+import os
+import json
+import time
+import sqlite3
+import inspect
+import threading
+import functools
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from core.metrics import CACHE_HIT, get_metrics
+
+
+# Set JARVIS_CACHE_PATH to a file to keep persistent caches across restarts
+CACHE_PATH_ENV = "JARVIS_CACHE_PATH"
+# Disk rows kept across all namespaces; those closest to expiry go first
+DISK_MAX_ROWS = int(os.environ.get("JARVIS_CACHE_MAX_ROWS", "10000"))
+# Expired rows are deleted on open and then at most this often
+PRUNE_INTERVAL_S = 600
+
+
+# ================== DISK TIER ==================
+class DiskTier:
+    """SQLite-backed second tier shared by all persistent caches."""
+
+    def __init__(self, path: str, max_rows: int = None):
+        self.path = os.path.expanduser(path)
+        self.max_rows = max_rows or DISK_MAX_ROWS
+        self._conn = None
+        self._lock = threading.Lock()
+        self._pruned_at = 0.0
+
+    def _connection(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self._conn = sqlite3.connect(self.path, check_same_thread=False)
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS cache ("
+                "namespace TEXT, key TEXT, value TEXT, expires REAL, "
+                "PRIMARY KEY (namespace, key))"
+            )
+            self._conn.execute("CREATE INDEX IF NOT EXISTS cache_expires ON cache (expires)")
+            self._prune(self._conn)
+            self._conn.commit()
+        return self._conn
+
+    def _prune(self, conn: sqlite3.Connection):
+        """Delete expired rows, then the soonest-expiring ones over max_rows. Caller holds _lock."""
+        now = time.time()
+        conn.execute("DELETE FROM cache WHERE expires < ?", (now,))
+        conn.execute(
+            "DELETE FROM cache WHERE rowid IN ("
+            "SELECT rowid FROM cache ORDER BY expires DESC LIMIT -1 OFFSET ?)",
+            (self.max_rows,)
+        )
+        self._pruned_at = now
+
+    def get(self, namespace: str, key: str) -> Tuple[bool, Any, float]:
+        with self._lock:
+            row = self._connection().execute(
+                "SELECT value, expires FROM cache WHERE namespace = ? AND key = ?",
+                (namespace, key)
+            ).fetchone()
+
+        if row is None or row[1] < time.time():
+            return False, None, 0.0
+        return True, json.loads(row[0]), row[1]
+
+    def set(self, namespace: str, key: str, value: Any, expires: float):
+        with self._lock:
+            conn = self._connection()
+            conn.execute(
+                "INSERT OR REPLACE INTO cache (namespace, key, value, expires) VALUES (?, ?, ?, ?)",
+                (namespace, key, json.dumps(value), expires)
+            )
+            if time.time() - self._pruned_at >= PRUNE_INTERVAL_S:
+                self._prune(conn)
+            conn.commit()
+
+    def delete(self, namespace: str, key: str = None):
+        with self._lock:
+            conn = self._connection()
+            if key is None:
+                conn.execute("DELETE FROM cache WHERE namespace = ?", (namespace,))
+            else:
+                conn.execute("DELETE FROM cache WHERE namespace = ? AND key = ?", (namespace, key))
+            conn.commit()
+
+
+# ================== MEMORY TIER ==================
+class TTLCache:
+    """Thread-safe in-memory LRU cache with per-entry expiry."""
+
+    def __init__(self, name: str, maxsize: int = 256, ttl: float = 300, disk: DiskTier = None):
+        self.name = name
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.disk = disk
+        self._entries: "OrderedDict[str, Tuple[Any, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.disk_hits = 0
+        self.evictions = 0
+
+    def get(self, key: str) -> Tuple[bool, Any]:
+        """Return (found, value); expired entries count as misses."""
+        now = time.time()
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if entry[1] >= now:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    get_metrics().record(CACHE_HIT, 1.0)
+                    return True, entry[0]
+                del self._entries[key]
+
+        if self.disk is not None:
+            found, value, expires = self.disk.get(self.name, key)
+            if found:
+                with self._lock:
+                    self.hits += 1
+                    self.disk_hits += 1
+                    self._store(key, value, expires)
+                get_metrics().record(CACHE_HIT, 1.0)
+                return True, value
+
+        with self._lock:
+            self.misses += 1
+        get_metrics().record(CACHE_HIT, 0.0)
+        return False, None
+
+    def set(self, key: str, value: Any, ttl: float = None):
+        expires = time.time() + (ttl if ttl is not None else self.ttl)
+
+        with self._lock:
+            self._store(key, value, expires)
+
+        if self.disk is not None:
+            self.disk.set(self.name, key, value, expires)
+
+    def _store(self, key: str, value: Any, expires: float):
+        self._entries[key] = (value, expires)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def invalidate(self, key: str):
+        with self._lock:
+            self._entries.pop(key, None)
+        if self.disk is not None:
+            self.disk.delete(self.name, key)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+        if self.disk is not None:
+            self.disk.delete(self.name)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "disk_hits": self.disk_hits,
+                "evictions": self.evictions,
+                "size": len(self._entries),
+                "hit_rate": self.hits / lookups if lookups else 0.0
+            }
+
+
+# ================== SHARED CACHES ==================
+_caches: Dict[str, TTLCache] = {}
+_caches_lock = threading.Lock()
+_disk: Optional[DiskTier] = None
+
+
+def _disk_tier() -> Optional[DiskTier]:
+    global _disk
+    path = os.environ.get(CACHE_PATH_ENV)
+    if path and _disk is None:
+        _disk = DiskTier(path)
+    return _disk
+
+
+def get_cache(name: str, maxsize: int = 256, ttl: float = 300, persistent: bool = False) -> TTLCache:
+    """
+    Return the shared cache called name, creating it on first use.
+
+    Args:
+        name: Namespace of the cache (one per cached function or feature)
+        maxsize: Maximum entries kept in memory before LRU eviction
+        ttl: Default lifetime of an entry in seconds
+        persistent: Also write entries to the on-disk tier, if configured
+
+    Returns:
+        The TTLCache instance
+    """
+    with _caches_lock:
+        if name not in _caches:
+            _caches[name] = TTLCache(
+                name, maxsize=maxsize, ttl=ttl,
+                disk=_disk_tier() if persistent else None
+            )
+        return _caches[name]
+
+
+def cache_stats() -> Dict[str, Dict[str, Any]]:
+    """Hit/miss counters of every shared cache."""
+    with _caches_lock:
+        caches = list(_caches.values())
+    return {cache.name: cache.stats() for cache in caches}
+
+
+def file_signature(path: str) -> Optional[Tuple[str, int, int]]:
+    """(absolute path, mtime, size) of a file, or None if it does not exist."""
+    try:
+        path = os.path.abspath(os.path.expanduser(path))
+        stat = os.stat(path)
+    except (OSError, TypeError):
+        return None
+    return path, stat.st_mtime_ns, stat.st_size
+
+
+# ================== DECORATOR ==================
+def cached(
+    name: str = None,
+    ttl: float = 300,
+    maxsize: int = 256,
+    normalize: Dict[str, Callable[[Any], Any]] = None,
+    file_arg: str = None,
+    file_resolver: Callable[[str], str] = None,
+    cache_if: Callable[[Any], bool] = None,
+    persistent: bool = False
+):
+    """
+    Opt a skill function into the shared cache.
+
+    Args:
+        name: Cache namespace (defaults to the function's qualified name)
+        ttl: Lifetime of an entry in seconds
+        maxsize: Maximum entries kept in memory
+        normalize: Per-argument functions applied before building the key
+            (e.g. {"city": str.lower})
+        file_arg: Argument holding a file path; the file's mtime and size
+            become part of the key, so edits invalidate the entry
+        file_resolver: Maps the file_arg value to the real path on disk
+        cache_if: Predicate on the result; only matching results are stored
+        persistent: Also keep entries in the on-disk tier
+    """
+    def decorator(func):
+        signature = inspect.signature(func)
+        cache = get_cache(name or func.__qualname__, maxsize=maxsize, ttl=ttl, persistent=persistent)
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            bound = signature.bind(*args, **kwargs)
+            bound.apply_defaults()
+            # A cancel token changes how a call runs, not what it returns
+            key_args = {k: v for k, v in bound.arguments.items() if k not in ("self", "cancel_token")}
+
+            for arg_name, fn in (normalize or {}).items():
+                if key_args.get(arg_name) is not None:
+                    key_args[arg_name] = fn(key_args[arg_name])
+
+            if file_arg:
+                path = key_args.get(file_arg)
+                if file_resolver and path:
+                    path = file_resolver(path)
+                signature_of_file = file_signature(path)
+                if signature_of_file is None:
+                    # Let the function report the missing file itself
+                    return func(*args, **kwargs)
+                key_args[file_arg] = signature_of_file
+
+            key = json.dumps(key_args, sort_keys=True, default=str)
+            found, value = cache.get(key)
+            if found:
+                return value
+
+            value = func(*args, **kwargs)
+            if cache_if is None or cache_if(value):
+                cache.set(key, value)
+            return value
+
+        wrapper.cache = cache
+        return wrapper
+
+    return decorator
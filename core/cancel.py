@@ -0,0 +1,67 @@
+import threading
+from typing import Callable, List
+
+
+class Cancelled(Exception):
+    """Raised when work is abandoned because its CancelToken fired."""
+
+
+class CancelToken:
+    """
+    One-shot, thread-safe cancellation signal for a single request.
+
+    Long-running work checks `cancelled` (or calls raise_if_cancelled())
+    between steps. Work that blocks (a subprocess, an HTTP stream, the TTS
+    engine) registers an on_cancel callback that interrupts it, so
+    cancel() takes effect immediately instead of at the next check.
+    """
+
+    def __init__(self):
+        self._event = threading.Event()
+        self._lock = threading.Lock()
+        self._callbacks: List[Callable[[], None]] = []
+
+    @property
+    def cancelled(self) -> bool:
+        return self._event.is_set()
+
+    def cancel(self):
+        with self._lock:
+            if self._event.is_set():
+                return
+            self._event.set()
+            callbacks, self._callbacks = self._callbacks, []
+
+        for callback in callbacks:
+            try:
+                callback()
+            except Exception as e:
+                print(f"Cancel callback error: {e}")
+
+    def on_cancel(self, callback: Callable[[], None]) -> Callable[[], None]:
+        """
+        Run callback when cancelled (right away if already cancelled).
+
+        Returns:
+            A function that unregisters the callback once the work is done
+        """
+        with self._lock:
+            if not self._event.is_set():
+                self._callbacks.append(callback)
+                return lambda: self._remove(callback)
+
+        callback()
+        return lambda: None
+
+    def _remove(self, callback: Callable[[], None]):
+        with self._lock:
+            if callback in self._callbacks:
+                self._callbacks.remove(callback)
+
+    def raise_if_cancelled(self):
+        if self._event.is_set():
+            raise Cancelled("Request cancelled")
+
+    def wait(self, timeout: float = None) -> bool:
+        """Sleep up to timeout; returns True as soon as the token is cancelled."""
+        return self._event.wait(timeout)
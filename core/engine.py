@@ -1,14 +1,34 @@
 import os
 import json
-from groq import Groq
+import time
+import inspect
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional, Tuple
 from core.registry import SkillRegistry
+from core.executor import ToolExecutor, ToolJob, ToolTimeout
+from core.intent import IntentRouter
+from core.cache import get_cache
+from core.pool import get_llm_client
+from core.session import ConversationSession, count_message_tokens, truncate_tool_output
+from core.cancel import CancelToken
+from core.metrics import LLM_TOTAL, get_metrics, timed_stream
+from core import tracing
 
 
 class JarvisEngine:
     def __init__(self, registry: SkillRegistry):
         self.registry = registry
-        self.client = Groq(api_key=os.environ.get("GROQ_API_KEY"))
+        # Created on first use: importing groq dominates start-up time
+        self._client = None
         self.model_name = "llama-3.3-70b-versatile"
+        self.executor = ToolExecutor()
+        self.router = IntentRouter(registry, executor=self.executor)
+        self.tool_output_chars = int(os.environ.get("JARVIS_TOOL_OUTPUT_CHARS", "4000"))
+        # function name -> whether it takes a cancel_token argument
+        self._cancellable: Dict[str, bool] = {}
+
+        # Plain chat answers (no tools involved) for prompts repeated within seconds
+        self.response_cache = get_cache("responses", maxsize=64, ttl=30)
 
         self.system_instruction = (
             "You are Jarvis, a helpful AI assistant. "
@@ -27,27 +47,263 @@ class JarvisEngine:
             ""
         }
 
+    @property
+    def client(self):
+        if self._client is None:
+            self._client = get_llm_client()
+        return self._client
+
+    @client.setter
+    def client(self, client):
+        self._client = client
+
     # =====================================================
-    def run_conversation(self, user_prompt: str) -> str:
-        messages = [
+    def new_session(self, **kwargs) -> ConversationSession:
+        """A conversation session that compacts its history with this engine's model."""
+        return ConversationSession(self.client, self.model_name, **kwargs)
+
+    def _llm_span(self, messages: List[Any], stream: bool):
+        llm_span = tracing.span("llm", model=self.model_name, stream=stream, messages=len(messages))
+        if llm_span.recording:
+            # Replaced by the API's own counts when it reports usage
+            llm_span.set(prompt_tokens=count_message_tokens([m for m in messages if isinstance(m, dict)]))
+        return llm_span
+
+    def _route(self, user_prompt: str) -> Optional[str]:
+        with tracing.span("intent_route") as route_span:
+            routed = self.router.route(user_prompt)
+            route_span.set(matched=routed is not None)
+        return routed
+
+    def _build_messages(self, user_prompt: str, session: Optional[ConversationSession] = None) -> List[Dict[str, Any]]:
+        if session is not None:
+            return session.build_messages(self.system_instruction, user_prompt)
+        return [
             {"role": "system", "content": self.system_instruction},
             {"role": "user", "content": user_prompt}
         ]
 
+    @staticmethod
+    def _selection_query(user_prompt: str, session: Optional[ConversationSession]) -> str:
+        # Follow-ups ("and tomorrow?") need the previous prompt to pick tools
+        if session is None:
+            return user_prompt
+        return f"{session.recent_text()} {user_prompt}".strip()
+
+    @staticmethod
+    def _use_response_cache(session: Optional[ConversationSession]) -> bool:
+        # With history the same prompt can mean something else
+        return session is None or not session.has_history
+
+    @staticmethod
+    def _response_key(user_prompt: str) -> str:
+        return " ".join(user_prompt.lower().split())
+
+    def _completion_kwargs(self, messages: List[Dict[str, Any]], query: str) -> Dict[str, Any]:
+        tools_schema = self.registry.get_tools_schema(query)
+
+        kwargs = {
+            "model": self.model_name,
+            "messages": messages,
+            "max_tokens": 250
+        }
+
+        if tools_schema:
+            kwargs["tools"] = tools_schema
+            kwargs["tool_choice"] = "auto"
+
+        return kwargs
+
+    # =====================================================
+    # STREAMED TOOL CALLS
+    @staticmethod
+    @contextmanager
+    def _abort_on_cancel(stream, cancel_token: Optional[CancelToken]):
+        """Close the HTTP stream when the token fires, unblocking the read."""
+        close = getattr(stream, "close", None)
+        unregister = cancel_token.on_cancel(close) if cancel_token and close else None
         try:
-            tools_schema = self.registry.get_tools_schema()
+            yield
+        finally:
+            if unregister:
+                unregister()
+            if close:
+                close()
+
+    @staticmethod
+    def _merge_tool_call_delta(pending_calls: Dict[int, Dict[str, str]], call_delta):
+        """Tool calls arrive in pieces across chunks; merge one piece by index."""
+        entry = pending_calls.setdefault(
+            call_delta.index, {"id": "", "name": "", "arguments": ""}
+        )
+        if call_delta.id:
+            entry["id"] = call_delta.id
+        if call_delta.function:
+            entry["name"] += call_delta.function.name or ""
+            entry["arguments"] += call_delta.function.arguments or ""
+
+    @staticmethod
+    def _tool_call_message(content: str, tool_calls: List[Dict[str, str]]) -> Dict[str, Any]:
+        return {
+            "role": "assistant",
+            "content": content or None,
+            "tool_calls": [
+                {
+                    "id": call["id"],
+                    "type": "function",
+                    "function": {"name": call["name"], "arguments": call["arguments"]}
+                }
+                for call in tool_calls
+            ]
+        }
+
+    # =====================================================
+    # TOOL EXECUTION
+    def _execute_tool_calls(
+        self,
+        messages: List[Any],
+        tool_calls: List[Dict[str, str]],
+        max_output_chars: Optional[int] = None,
+        cancel_token: Optional[CancelToken] = None
+    ) -> Optional[str]:
+        """
+        Run the requested tools and append their results to messages.
+
+        Args:
+            messages: Conversation so far (assistant tool-call message included)
+            tool_calls: Dicts with id, name and arguments of each call
+            max_output_chars: Per-result size cap (defaults to tool_output_chars)
+            cancel_token: Stops waiting for the tools when it fires
+
+        Returns:
+            A user-facing message if the turn cannot continue, otherwise None
+        """
+        jobs, error = self._prepare_tool_jobs(tool_calls, cancel_token)
+        if error:
+            return error
+
+        # Independent calls run concurrently; results keep the model's order
+        results = self.executor.run(jobs, cancel_token)
+        return self._append_tool_results(messages, tool_calls, results, max_output_chars)
+
+    def _accepts_cancel_token(self, function_name: str, function) -> bool:
+        if function_name not in self._cancellable:
+            try:
+                self._cancellable[function_name] = "cancel_token" in inspect.signature(function).parameters
+            except (TypeError, ValueError):
+                self._cancellable[function_name] = False
+        return self._cancellable[function_name]
+
+    def _prepare_tool_jobs(
+        self,
+        tool_calls: List[Dict[str, str]],
+        cancel_token: Optional[CancelToken] = None
+    ) -> Tuple[List[ToolJob], Optional[str]]:
+        """Resolve and sanitize tool calls. Returns (jobs, user-facing error)."""
+        jobs = []
+
+        for tool_call in tool_calls:
+            function_name = tool_call["name"]
+            function_to_call = self.registry.get_function(function_name)
+
+            if not function_to_call:
+                return [], "I tried to use a tool, but it was unavailable."
+
+            try:
+                args = json.loads(tool_call["arguments"] or "{}")
+            except Exception:
+                return [], "I encountered an error while executing the request."
+
+            # 🛑 SANITIZE PLACEHOLDERS
+            for key, value in list(args.items()):
+                if (
+                    isinstance(value, str)
+                    and value.lower() in self.INVALID_PLACEHOLDERS
+                ):
+                    args[key] = None
+
+            # 🌍 WEATHER FALLBACK LOGIC
+            if function_name == "get_weather":
+                if not args.get("city") and not args.get("pincode"):
+                    default_city = os.environ.get("DEFAULT_CITY")
+                    if default_city:
+                        args["city"] = default_city
+                    else:
+                        return [], "Which city would you like the weather for?"
+
+            # Long-running skills opt in to cancellation by taking cancel_token
+            if cancel_token is not None and self._accepts_cancel_token(function_name, function_to_call):
+                args["cancel_token"] = cancel_token
+
+            meta = self.registry.get_function_meta(function_name)
+            jobs.append(ToolJob(
+                function_to_call,
+                args,
+                lock_key=None if meta.get("thread_safe", True) else meta.get("skill"),
+                timeout=meta.get("timeout")
+            ))
+
+        return jobs, None
+
+    def _append_tool_results(
+        self,
+        messages: List[Any],
+        tool_calls: List[Dict[str, str]],
+        results: List[Any],
+        max_output_chars: Optional[int]
+    ) -> Optional[str]:
+        for tool_call, result in zip(tool_calls, results):
+            if isinstance(result, ToolTimeout):
+                result = json.dumps({"status": "error", "message": str(result)})
+            elif isinstance(result, Exception):
+                return "I encountered an error while executing the request."
+
+            messages.append({
+                "role": "tool",
+                "tool_call_id": tool_call["id"],
+                "name": tool_call["name"],
+                "content": truncate_tool_output(str(result), max_output_chars or self.tool_output_chars)
+            })
 
-            kwargs = {
-                "model": self.model_name,
-                "messages": messages,
-                "max_tokens": 250
-            }
+        return None
 
-            if tools_schema:
-                kwargs["tools"] = tools_schema
-                kwargs["tool_choice"] = "auto"
+    # =====================================================
+    def run_conversation(
+        self,
+        user_prompt: str,
+        session: Optional[ConversationSession] = None,
+        cancel_token: Optional[CancelToken] = None
+    ) -> str:
+        reply = self._run_turn(user_prompt, session, cancel_token)
+        if session is not None and reply and not (cancel_token and cancel_token.cancelled):
+            session.add_turn(user_prompt, reply)
+        return reply
+
+    def _run_turn(
+        self,
+        user_prompt: str,
+        session: Optional[ConversationSession],
+        cancel_token: Optional[CancelToken]
+    ) -> str:
+        # ⚡ LOCAL FAST-PATH
+        routed = self._route(user_prompt)
+        if routed is not None:
+            return routed
+
+        use_cache = self._use_response_cache(session)
+        if use_cache:
+            found, cached_response = self.response_cache.get(self._response_key(user_prompt))
+            if found:
+                return cached_response
 
-            response = self.client.chat.completions.create(**kwargs)
+        messages = self._build_messages(user_prompt, session)
+
+        try:
+            with self._llm_span(messages, stream=False) as llm_span, get_metrics().timer(LLM_TOTAL):
+                response = self.client.chat.completions.create(
+                    **self._completion_kwargs(messages, self._selection_query(user_prompt, session))
+                )
+                tracing.record_usage(llm_span, getattr(response, "usage", None))
 
         except Exception:
             return "I am having trouble connecting to the brain, sir."
@@ -60,55 +316,156 @@ class JarvisEngine:
         if tool_calls:
             messages.append(response_message)
 
-            for tool_call in tool_calls:
-                function_name = tool_call.function.name
-                function_to_call = self.registry.get_function(function_name)
-
-                if not function_to_call:
-                    return "I tried to use a tool, but it was unavailable."
-
-                try:
-                    args = json.loads(tool_call.function.arguments or "{}")
-
-                    # 🛑 SANITIZE PLACEHOLDERS
-                    for key, value in list(args.items()):
-                        if (
-                            isinstance(value, str)
-                            and value.lower() in self.INVALID_PLACEHOLDERS
-                        ):
-                            args[key] = None
-
-                    # 🌍 WEATHER FALLBACK LOGIC
-                    if function_name == "get_weather":
-                        if not args.get("city") and not args.get("pincode"):
-                            default_city = os.environ.get("DEFAULT_CITY")
-                            if default_city:
-                                args["city"] = default_city
-                            else:
-                                return "Which city would you like the weather for?"
-
-                    result = function_to_call(**args)
-
-                except Exception:
-                    return "I encountered an error while executing the request."
-
-                messages.append({
-                    "role": "tool",
-                    "tool_call_id": tool_call.id,
-                    "name": function_name,
-                    "content": str(result)
-                })
+            error = self._execute_tool_calls(messages, [
+                {
+                    "id": tool_call.id,
+                    "name": tool_call.function.name,
+                    "arguments": tool_call.function.arguments
+                }
+                for tool_call in tool_calls
+            ], session.tool_output_chars if session else None, cancel_token)
+            if cancel_token and cancel_token.cancelled:
+                return ""
+            if error:
+                return error
 
             # =====================================================
             # FINAL RESPONSE (NO TOOLS, NO JSON)
-            final_response = self.client.chat.completions.create(
-                model=self.model_name,
-                messages=messages,
-                max_tokens=200
-            )
+            with self._llm_span(messages, stream=False) as llm_span, get_metrics().timer(LLM_TOTAL):
+                final_response = self.client.chat.completions.create(
+                    model=self.model_name,
+                    messages=messages,
+                    max_tokens=200
+                )
+                tracing.record_usage(llm_span, getattr(final_response, "usage", None))
 
             return final_response.choices[0].message.content
 
         # =====================================================
         # NORMAL CHAT RESPONSE
-        return response_message.content
\ No newline at end of file
+        if use_cache and response_message.content:
+            self.response_cache.set(self._response_key(user_prompt), response_message.content)
+        return response_message.content
+
+    # =====================================================
+    # STREAMING
+    def stream_conversation(
+        self,
+        user_prompt: str,
+        session: Optional[ConversationSession] = None,
+        cancel_token: Optional[CancelToken] = None
+    ) -> Iterator[str]:
+        """
+        Same flow as run_conversation, but yields text chunks as they arrive.
+
+        Tool calls are accumulated from the streamed deltas, executed, and the
+        final answer is streamed as well. Feed the output through
+        core.streaming.iter_sentences to speak it sentence by sentence.
+        Whatever was yielded (even if the caller stopped early) is recorded
+        in the session. Cancelling cancel_token aborts the HTTP stream and
+        stops waiting for tools; the generator then ends quietly.
+        """
+        parts: List[str] = []
+        try:
+            for text in self._stream_turn(user_prompt, session, cancel_token):
+                parts.append(text)
+                yield text
+        finally:
+            if session is not None and parts:
+                session.add_turn(user_prompt, "".join(parts))
+
+    def _stream_turn(
+        self,
+        user_prompt: str,
+        session: Optional[ConversationSession],
+        cancel_token: Optional[CancelToken]
+    ) -> Iterator[str]:
+        # ⚡ LOCAL FAST-PATH
+        routed = self._route(user_prompt)
+        if routed is not None:
+            yield routed
+            return
+
+        use_cache = self._use_response_cache(session)
+        if use_cache:
+            found, cached_response = self.response_cache.get(self._response_key(user_prompt))
+            if found:
+                yield cached_response
+                return
+
+        messages = self._build_messages(user_prompt, session)
+
+        started = time.perf_counter()
+        llm_span = self._llm_span(messages, stream=True)
+        try:
+            stream = self.client.chat.completions.create(
+                stream=True, **self._completion_kwargs(messages, self._selection_query(user_prompt, session))
+            )
+        except Exception as e:
+            llm_span.end(error=e)
+            yield "I am having trouble connecting to the brain, sir."
+            return
+
+        content_parts: List[str] = []
+        pending_calls: Dict[int, Dict[str, str]] = {}
+
+        try:
+            with self._abort_on_cancel(stream, cancel_token):
+                for chunk in timed_stream(tracing.traced_stream(stream, llm_span), started):
+                    if cancel_token and cancel_token.cancelled:
+                        return
+                    if not chunk.choices:
+                        continue
+                    delta = chunk.choices[0].delta
+
+                    if delta.content:
+                        content_parts.append(delta.content)
+                        yield delta.content
+
+                    for call_delta in delta.tool_calls or []:
+                        self._merge_tool_call_delta(pending_calls, call_delta)
+        except Exception:
+            if not content_parts and not (cancel_token and cancel_token.cancelled):
+                yield "I am having trouble connecting to the brain, sir."
+            return
+
+        if not pending_calls:
+            if use_cache and content_parts:
+                self.response_cache.set(self._response_key(user_prompt), "".join(content_parts))
+            return
+
+        # =====================================================
+        # TOOL EXECUTION
+        tool_calls = [pending_calls[index] for index in sorted(pending_calls)]
+        messages.append(self._tool_call_message("".join(content_parts), tool_calls))
+
+        error = self._execute_tool_calls(
+            messages, tool_calls, session.tool_output_chars if session else None, cancel_token
+        )
+        if cancel_token and cancel_token.cancelled:
+            return
+        if error:
+            yield error
+            return
+
+        # =====================================================
+        # FINAL RESPONSE (NO TOOLS, NO JSON)
+        llm_span = self._llm_span(messages, stream=True)
+        try:
+            started = time.perf_counter()
+            final_stream = self.client.chat.completions.create(
+                model=self.model_name,
+                messages=messages,
+                max_tokens=200,
+                stream=True
+            )
+            with self._abort_on_cancel(final_stream, cancel_token):
+                for chunk in timed_stream(tracing.traced_stream(final_stream, llm_span), started):
+                    if cancel_token and cancel_token.cancelled:
+                        return
+                    if chunk.choices and chunk.choices[0].delta.content:
+                        yield chunk.choices[0].delta.content
+        except Exception as e:
+            llm_span.end(error=e)
+            if not (cancel_token and cancel_token.cancelled):
+                yield "I encountered an error while executing the request."
@@ -0,0 +1,189 @@
+import os
+import json
+import time
+import asyncio
+import inspect
+import threading
+import contextvars
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Any, Callable, Dict, List, Optional
+
+from core.cancel import CancelToken, Cancelled
+from core.metrics import TOOL, get_metrics
+from core import tracing
+
+
+class ToolTimeout(Exception):
+    """Raised (as a result value) when a tool call exceeds its timeout."""
+
+
+class ToolJob:
+    """A single tool invocation queued for the executor."""
+
+    def __init__(
+        self,
+        function: Callable,
+        args: Dict[str, Any],
+        lock_key: Optional[str] = None,
+        timeout: Optional[float] = None
+    ):
+        self.function = function
+        self.args = args
+        # Jobs sharing a lock_key never run at the same time
+        self.lock_key = lock_key
+        self.timeout = timeout
+
+
+class ToolExecutor:
+    """Runs the tool calls of one model turn concurrently on a bounded pool."""
+
+    def __init__(self, max_workers: int = None, default_timeout: float = None):
+        self.max_workers = max_workers or int(os.environ.get("JARVIS_TOOL_WORKERS", "4"))
+        self.default_timeout = default_timeout or float(os.environ.get("JARVIS_TOOL_TIMEOUT", "20"))
+        self.pool = ThreadPoolExecutor(
+            max_workers=self.max_workers,
+            thread_name_prefix="jarvis-tool"
+        )
+        self._locks: Dict[str, threading.Lock] = {}
+        self._locks_guard = threading.Lock()
+        # Same role as _locks for coroutine tools (only used on the event loop)
+        self._async_locks: Dict[str, asyncio.Lock] = {}
+
+    def _lock_for(self, key: str) -> threading.Lock:
+        with self._locks_guard:
+            if key not in self._locks:
+                self._locks[key] = threading.Lock()
+            return self._locks[key]
+
+    @staticmethod
+    def _span(job: ToolJob):
+        tool_span = tracing.span("tool", function=getattr(job.function, "__name__", "?"))
+        if tool_span.recording:
+            tool_span.set(args_bytes=len(json.dumps(job.args, default=str)))
+        return tool_span
+
+    def _run(self, job: ToolJob) -> Any:
+        if job.lock_key is None:
+            with self._span(job), get_metrics().timer(TOOL):
+                return job.function(**job.args)
+
+        with self._lock_for(job.lock_key):
+            with self._span(job), get_metrics().timer(TOOL):
+                return job.function(**job.args)
+
+    def _submit(self, job: ToolJob) -> Future:
+        # Carry the caller's context (trace request id) onto the pool thread
+        return self.pool.submit(contextvars.copy_context().run, self._run, job)
+
+    def run(self, jobs: List[ToolJob], cancel_token: Optional[CancelToken] = None) -> List[Any]:
+        """
+        Execute jobs and wait for all of them.
+
+        Args:
+            jobs: Tool invocations in the order the model requested them
+            cancel_token: Stops waiting as soon as it fires; queued jobs are
+                dropped, running ones finish in the background
+
+        Returns:
+            One entry per job, in the same order. Each entry is either the
+            function's return value or the exception it raised (ToolTimeout
+            if it did not finish in time, Cancelled if the token fired).
+        """
+        futures = [self._submit(job) for job in jobs]
+        started = time.monotonic()
+        results = []
+
+        # Resolves on cancel, so waiting below wakes up immediately
+        cancelled = Future()
+        unregister = cancel_token.on_cancel(lambda: cancelled.set_result(None)) if cancel_token else None
+
+        try:
+            for job, future in zip(jobs, futures):
+                timeout = job.timeout or self.default_timeout
+                remaining = max(0.0, started + timeout - time.monotonic())
+
+                wait([future, cancelled], timeout=remaining, return_when=FIRST_COMPLETED)
+
+                if not future.done():
+                    future.cancel()
+                    if cancelled.done():
+                        results.append(Cancelled("Tool call cancelled"))
+                    else:
+                        results.append(ToolTimeout(f"Tool did not finish within {timeout:g} seconds"))
+                elif future.cancelled():
+                    results.append(Cancelled("Tool call cancelled"))
+                elif future.exception() is not None:
+                    results.append(future.exception())
+                else:
+                    results.append(future.result())
+        finally:
+            if unregister:
+                unregister()
+
+        return results
+
+    async def run_async(self, jobs: List[ToolJob], cancel_token: Optional[CancelToken] = None) -> List[Any]:
+        """
+        Same contract as run(), for use on an event loop.
+
+        Coroutine functions are awaited directly; plain functions run on the
+        thread pool (keeping their skill locks) and are awaited without
+        blocking the loop.
+        """
+        async def _one(job: ToolJob) -> Any:
+            timeout = job.timeout or self.default_timeout
+
+            if inspect.iscoroutinefunction(job.function):
+                async def _call():
+                    if job.lock_key is None:
+                        with self._span(job), get_metrics().timer(TOOL):
+                            return await job.function(**job.args)
+                    lock = self._async_locks.setdefault(job.lock_key, asyncio.Lock())
+                    async with lock:
+                        with self._span(job), get_metrics().timer(TOOL):
+                            return await job.function(**job.args)
+                awaitable = _call()
+            else:
+                awaitable = asyncio.wrap_future(self._submit(job))
+
+            try:
+                return await asyncio.wait_for(awaitable, timeout)
+            except asyncio.TimeoutError:
+                return ToolTimeout(f"Tool did not finish within {timeout:g} seconds")
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                return e
+
+        tasks = [asyncio.ensure_future(_one(job)) for job in jobs]
+        if cancel_token is None:
+            return list(await asyncio.gather(*tasks))
+
+        # The token may fire on any thread
+        loop = asyncio.get_running_loop()
+        cancelled = loop.create_future()
+
+        def _wake():
+            if not cancelled.done():
+                cancelled.set_result(None)
+
+        unregister = cancel_token.on_cancel(lambda: loop.call_soon_threadsafe(_wake))
+        finished = asyncio.gather(*tasks, return_exceptions=True)
+        try:
+            await asyncio.wait([finished, cancelled], return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            unregister()
+            cancelled.cancel()
+
+        results = []
+        for task in tasks:
+            if task.done() and not task.cancelled():
+                results.append(task.result())
+            else:
+                # Pool jobs that already started finish in the background
+                task.cancel()
+                results.append(Cancelled("Tool call cancelled"))
+        return results
+
+    def shutdown(self):
+        self.pool.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,247 @@
+import os
+import re
+import mmap
+import codecs
+from typing import Any, Dict, Optional
+
+# Defaults keep tool output small enough to go back into the prompt: a
+# default read fits the engine's per-result cap with room for the JSON around it
+DEFAULT_LIMIT_BYTES = int(os.environ.get("JARVIS_TOOL_OUTPUT_CHARS", "4000")) * 3 // 4
+DEFAULT_TAIL_LINES = 100
+MAX_GREP_MATCHES = 50
+SAMPLE_BYTES = 4096
+
+_BOMS = [
+    (codecs.BOM_UTF32_LE, "utf-32"),
+    (codecs.BOM_UTF32_BE, "utf-32"),
+    (codecs.BOM_UTF8, "utf-8-sig"),
+    (codecs.BOM_UTF16_LE, "utf-16"),
+    (codecs.BOM_UTF16_BE, "utf-16"),
+]
+
+
+# Tool schema properties for skills that expose paginated reads
+READ_WINDOW_PROPERTIES = {
+    "mode": {
+        "type": "string",
+        "enum": ["head", "tail", "grep"],
+        "description": "head: read forward from offset (default); tail: last lines of the file, or the lines before offset; grep: lines matching pattern"
+    },
+    "offset": {
+        "type": "integer",
+        "description": "Byte cursor. Pass next_offset from the previous result to continue reading"
+    },
+    "limit_bytes": {
+        "type": "integer",
+        "description": f"Maximum bytes to return (default: {DEFAULT_LIMIT_BYTES})"
+    },
+    "lines": {
+        "type": "integer",
+        "description": f"Maximum number of lines to return (tail default: {DEFAULT_TAIL_LINES})"
+    },
+    "pattern": {
+        "type": "string",
+        "description": "Regular expression to search for in grep mode"
+    }
+}
+
+
+class BinaryFileError(ValueError):
+    """Raised when a file does not look like text."""
+
+
+def detect_encoding(sample: bytes) -> str:
+    """
+    Guess the encoding of a file from its first bytes.
+
+    Raises:
+        BinaryFileError: if the sample contains NUL bytes and no UTF-16/32 BOM
+    """
+    for bom, encoding in _BOMS:
+        if sample.startswith(bom):
+            return encoding
+
+    if b"\x00" in sample:
+        raise BinaryFileError("File is not a valid text file (binary or encoding issue)")
+
+    try:
+        # Not final: the sample may end in the middle of a character
+        codecs.getincrementaldecoder("utf-8")().decode(sample, final=False)
+        return "utf-8"
+    except UnicodeDecodeError:
+        return "cp1252"
+
+
+def _decode(data: bytes, encoding: str) -> str:
+    return data.decode(encoding, errors="replace")
+
+
+def encoded_length(text: str, encoding: str, at_file_start: bool = False) -> int:
+    """
+    Bytes that decoded text took up in the file, to move a cursor past it.
+    at_file_start: the text was read from offset 0, so it followed the BOM.
+    """
+    if encoding in ("utf-16", "utf-32"):
+        # encode() writes a BOM the file only has at offset 0
+        bom = 2 if encoding == "utf-16" else 4
+        return len(text.encode(encoding)) - (0 if at_file_start else bom)
+    if encoding == "utf-8-sig":
+        return len(text.encode("utf-8")) + (len(codecs.BOM_UTF8) if at_file_start else 0)
+    return len(text.encode(encoding, errors="replace"))
+
+
+def _utf8_safe_end(mm, start: int, end: int) -> int:
+    """Move end back so it doesn't split a UTF-8 multi-byte character."""
+    while end > start and (mm[end - 1] & 0xC0) == 0x80:
+        end -= 1
+    if end > start and mm[end - 1] >= 0xC0:
+        end -= 1
+    return end
+
+
+def read_window(
+    path: str,
+    mode: str = "head",
+    offset: int = 0,
+    limit_bytes: int = None,
+    lines: int = None,
+    pattern: str = None
+) -> Dict[str, Any]:
+    """
+    Read a bounded window of a file through mmap; cost is O(result).
+
+    Args:
+        path: File to read
+        mode: "head" reads forward from offset, "tail" reads the lines
+            ending at offset (or at end of file when offset is 0), "grep"
+            returns lines matching pattern from offset onwards
+        offset: Byte cursor (use next_offset from a previous result)
+        limit_bytes: Maximum bytes of content returned
+        lines: Maximum number of lines returned
+        pattern: Regular expression for grep mode
+
+    Returns:
+        Dict with content, encoding, byte range, file size and next_offset
+        (None when there is nothing more in that direction)
+    """
+    limit_bytes = max(1, int(limit_bytes or DEFAULT_LIMIT_BYTES))
+    offset = max(0, int(offset or 0))
+    size = os.path.getsize(path)
+
+    result = {"mode": mode, "size": size, "start": 0, "end": 0, "content": "", "next_offset": None}
+    if size == 0:
+        result["encoding"] = "utf-8"
+        return result
+
+    with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        encoding = detect_encoding(mm[:SAMPLE_BYTES])
+        result["encoding"] = encoding
+        offset = min(offset, size)
+
+        if mode == "tail":
+            result.update(_tail(mm, size, offset, limit_bytes, lines, encoding))
+        elif mode == "grep":
+            if not pattern:
+                raise ValueError("grep mode needs a pattern")
+            result.update(_grep(mm, size, offset, limit_bytes, lines, pattern, encoding))
+        else:
+            result.update(_head(mm, size, offset, limit_bytes, lines, encoding))
+
+    return result
+
+
+def _head(mm, size: int, start: int, limit_bytes: int, lines: Optional[int], encoding: str) -> Dict[str, Any]:
+    end = min(size, start + limit_bytes)
+
+    if lines:
+        position = start
+        for _ in range(lines):
+            newline = mm.find(b"\n", position, end)
+            if newline == -1:
+                break
+            position = newline + 1
+        else:
+            end = position
+
+    if end < size:
+        # Prefer ending on a line break; otherwise don't split a character
+        newline = mm.rfind(b"\n", start, end)
+        if newline != -1:
+            end = newline + 1
+        elif encoding.startswith("utf-8"):
+            end = _utf8_safe_end(mm, start, end)
+
+    return {
+        "start": start,
+        "end": end,
+        "content": _decode(mm[start:end], encoding),
+        "next_offset": end if end < size else None
+    }
+
+
+def _tail(mm, size: int, end: int, limit_bytes: int, lines: Optional[int], encoding: str) -> Dict[str, Any]:
+    end = end or size
+    lines = lines or DEFAULT_TAIL_LINES
+
+    # Walk back over `lines` line breaks; a trailing newline doesn't count
+    start = end - 1 if mm[end - 1] == ord("\n") else end
+    for _ in range(lines):
+        newline = mm.rfind(b"\n", 0, start)
+        if newline == -1:
+            start = 0
+            break
+        start = newline
+    else:
+        start += 1
+
+    if end - start > limit_bytes:
+        start = end - limit_bytes
+        newline = mm.find(b"\n", start, end)
+        if newline != -1 and newline + 1 < end:
+            start = newline + 1
+
+    return {
+        "start": start,
+        "end": end,
+        "content": _decode(mm[start:end], encoding),
+        # Continue backwards with mode="tail" and offset=next_offset
+        "next_offset": start if start > 0 else None
+    }
+
+
+def _grep(mm, size: int, start: int, limit_bytes: int, lines: Optional[int], pattern: str, encoding: str) -> Dict[str, Any]:
+    if encoding in ("utf-16", "utf-32"):
+        raise ValueError("grep mode is not supported for UTF-16/32 files")
+
+    regex = re.compile(pattern.encode("utf-8" if encoding.startswith("utf-8") else encoding, errors="replace"), re.IGNORECASE | re.MULTILINE)
+    max_matches = lines or MAX_GREP_MATCHES
+    matches = []
+    used = 0
+    position = start
+    next_offset = None
+
+    while position < size:
+        found = regex.search(mm, position)
+        if not found:
+            break
+
+        line_start = mm.rfind(b"\n", 0, found.start()) + 1
+        line_end = mm.find(b"\n", found.start())
+        line_end = size if line_end == -1 else line_end + 1
+
+        line = _decode(mm[line_start:line_end], encoding).rstrip("\r\n")
+        if matches and (len(matches) >= max_matches or used + len(line) > limit_bytes):
+            next_offset = line_start
+            break
+
+        matches.append({"offset": line_start, "line": line})
+        used += len(line)
+        position = line_end
+
+    return {
+        "start": start,
+        "end": next_offset or size,
+        "content": "\n".join(match["line"] for match in matches),
+        "matches": matches,
+        "next_offset": next_offset
+    }
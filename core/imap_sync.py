@@ -0,0 +1,315 @@
+import os
+import re
+import email
+import sqlite3
+import threading
+from email.header import decode_header, make_header
+from typing import Any, Dict, List, Optional, Tuple
+
+
+HEADER_FIELDS = "BODY.PEEK[HEADER.FIELDS (FROM SUBJECT DATE)]"
+
+_UID_RE = re.compile(rb"UID (\d+)")
+_FLAGS_RE = re.compile(rb"FLAGS \(([^)]*)\)")
+_MODSEQ_RE = re.compile(rb"HIGHESTMODSEQ (\d+)")
+
+
+def decode_mime_header(value: Optional[str]) -> str:
+    if not value:
+        return ""
+    try:
+        return str(make_header(decode_header(value)))
+    except Exception:
+        return value
+
+
+def parse_fetch_response(data: List[Any]) -> List[Dict[str, Any]]:
+    """
+    Turn imaplib FETCH data into {uid, flags, header} records.
+
+    imaplib returns literals as (meta, bytes) tuples and any trailing
+    attributes (e.g. FLAGS after the header literal) as separate bytes items.
+    """
+    records: List[Tuple[bytes, bytes]] = []
+
+    for item in data or []:
+        if isinstance(item, tuple):
+            records.append((item[0], item[1]))
+        elif isinstance(item, bytes):
+            if re.match(rb"^\d+ \(", item):
+                records.append((item, b""))
+            elif records:
+                meta, literal = records[-1]
+                records[-1] = (meta + item, literal)
+
+    parsed = []
+    for meta, literal in records:
+        uid = _UID_RE.search(meta)
+        if not uid:
+            continue
+        flags = _FLAGS_RE.search(meta)
+        parsed.append({
+            "uid": int(uid.group(1)),
+            "flags": flags.group(1).decode(errors="replace").split() if flags else None,
+            "header": literal
+        })
+    return parsed
+
+
+# ================== HEADER CACHE ==================
+class HeaderCache:
+    """SQLite cache of message headers keyed by (mailbox, UIDVALIDITY, UID)."""
+
+    def __init__(self, path: str):
+        self.path = os.path.expanduser(path)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        with self._conn:
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS mailbox_state ("
+                "mailbox TEXT PRIMARY KEY, uidvalidity INTEGER, uidnext INTEGER, "
+                "highestmodseq INTEGER, exists_count INTEGER)"
+            )
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS headers ("
+                "mailbox TEXT, uid INTEGER, sender TEXT, subject TEXT, date TEXT, flags TEXT, "
+                "PRIMARY KEY (mailbox, uid))"
+            )
+
+    def get_state(self, mailbox: str) -> Optional[Dict[str, int]]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT uidvalidity, uidnext, highestmodseq, exists_count "
+                "FROM mailbox_state WHERE mailbox = ?", (mailbox,)
+            ).fetchone()
+        if row is None:
+            return None
+        return {"uidvalidity": row[0], "uidnext": row[1], "highestmodseq": row[2], "exists": row[3]}
+
+    def save_state(self, mailbox: str, state: Dict[str, int]):
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO mailbox_state VALUES (?, ?, ?, ?, ?)",
+                (mailbox, state["uidvalidity"], state["uidnext"], state.get("highestmodseq"), state["exists"])
+            )
+
+    def reset(self, mailbox: str):
+        """Forget everything about a mailbox (UIDVALIDITY changed)."""
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM headers WHERE mailbox = ?", (mailbox,))
+            self._conn.execute("DELETE FROM mailbox_state WHERE mailbox = ?", (mailbox,))
+
+    def store_headers(self, mailbox: str, records: List[Dict[str, Any]]):
+        rows = []
+        for record in records:
+            message = email.message_from_bytes(record["header"] or b"")
+            rows.append((
+                mailbox,
+                record["uid"],
+                decode_mime_header(message["from"]),
+                decode_mime_header(message["subject"]),
+                message["date"] or "",
+                " ".join(record["flags"] or [])
+            ))
+        with self._lock, self._conn:
+            self._conn.executemany("INSERT OR REPLACE INTO headers VALUES (?, ?, ?, ?, ?, ?)", rows)
+
+    def update_flags(self, mailbox: str, flags_by_uid: Dict[int, List[str]]):
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "UPDATE headers SET flags = ? WHERE mailbox = ? AND uid = ?",
+                [(" ".join(flags), mailbox, uid) for uid, flags in flags_by_uid.items()]
+            )
+
+    def remove_uids(self, mailbox: str, uids: List[int]):
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "DELETE FROM headers WHERE mailbox = ? AND uid = ?",
+                [(mailbox, uid) for uid in uids]
+            )
+
+    def uids(self, mailbox: str) -> List[int]:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT uid FROM headers WHERE mailbox = ? ORDER BY uid", (mailbox,)
+            ).fetchall()
+        return [row[0] for row in rows]
+
+    def recent(self, mailbox: str, count: int) -> List[Dict[str, Any]]:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT uid, sender, subject, date, flags FROM headers "
+                "WHERE mailbox = ? ORDER BY uid DESC LIMIT ?", (mailbox, count)
+            ).fetchall()
+        return [
+            {
+                "uid": uid,
+                "from": sender,
+                "subject": subject or "(No Subject)",
+                "date": date,
+                "unread": "\\Seen" not in flags.split()
+            }
+            for uid, sender, subject, date, flags in rows
+        ]
+
+
+# ================== INCREMENTAL SYNC ==================
+class IMAPSync:
+    """
+    Keeps a HeaderCache in step with one mailbox using cheap IMAP commands:
+
+    - UIDVALIDITY change -> drop the cache
+    - UIDNEXT moved -> one UID FETCH of only the new messages' headers
+    - HIGHESTMODSEQ moved (CONDSTORE) -> FLAGS of changed messages only
+    - EXISTS lower than expected -> prune expunged UIDs
+    """
+
+    def __init__(self, cache: HeaderCache, mailbox: str = "INBOX", window: int = 50):
+        self.cache = cache
+        self.mailbox = mailbox
+        # How many of the newest messages to fetch on a cold cache
+        self.window = window
+        # The mailbox watcher and tool calls (several server sessions) sync
+        # the same cache: without this two syncs could fetch the same range
+        # and save a stale UIDNEXT/HIGHESTMODSEQ. Reentrant for recent().
+        self._lock = threading.RLock()
+
+    @staticmethod
+    def _response_int(mail, name: str) -> Optional[int]:
+        _, data = mail.response(name)
+        if data and data[0]:
+            try:
+                return int(data[0])
+            except (TypeError, ValueError):
+                return None
+        return None
+
+    def _fetch_headers(self, mail, uid_range: str) -> List[Dict[str, Any]]:
+        status, data = mail.uid("FETCH", uid_range, f"(UID FLAGS {HEADER_FIELDS})")
+        if status != "OK":
+            return []
+        return parse_fetch_response(data)
+
+    def sync(self, mail) -> Dict[str, int]:
+        """
+        Bring the cache up to date over an authenticated connection.
+
+        Returns:
+            The mailbox state after syncing (uidvalidity, uidnext, exists, ...)
+        """
+        with self._lock:
+            return self._sync(mail)
+
+    def _sync(self, mail) -> Dict[str, int]:
+        status, data = mail.select(self.mailbox, readonly=True)
+        if status != "OK":
+            raise RuntimeError(f"Could not open mailbox {self.mailbox}")
+
+        exists = int(data[0] or 0)
+        uidvalidity = self._response_int(mail, "UIDVALIDITY") or 0
+        uidnext = self._response_int(mail, "UIDNEXT")
+        _, modseq_data = mail.response("HIGHESTMODSEQ")
+        highestmodseq = int(modseq_data[0]) if modseq_data and modseq_data[0] else None
+
+        state = self.cache.get_state(self.mailbox)
+        if state and state["uidvalidity"] != uidvalidity:
+            self.cache.reset(self.mailbox)
+            state = None
+
+        new_records: List[Dict[str, Any]] = []
+
+        if state is None:
+            # Cold cache: headers of the newest `window` messages by sequence number
+            if exists:
+                first = max(1, exists - self.window + 1)
+                status, fetched = mail.fetch(f"{first}:{exists}", f"(UID FLAGS {HEADER_FIELDS})")
+                if status == "OK":
+                    new_records = parse_fetch_response(fetched)
+        elif uidnext is None or uidnext > state["uidnext"]:
+            # "n:*" always returns at least the last message, so filter
+            new_records = [
+                record for record in self._fetch_headers(mail, f"{state['uidnext']}:*")
+                if record["uid"] >= state["uidnext"]
+            ]
+
+        if new_records:
+            self.cache.store_headers(self.mailbox, new_records)
+
+        if state is not None:
+            cached_uids = self.cache.uids(self.mailbox)
+
+            # Flag changes since the last sync (CONDSTORE servers only)
+            if (
+                cached_uids and highestmodseq and state.get("highestmodseq")
+                and highestmodseq != state["highestmodseq"]
+            ):
+                status, changed = mail.uid(
+                    "FETCH", f"{cached_uids[0]}:*", f"(UID FLAGS) (CHANGEDSINCE {state['highestmodseq']})"
+                )
+                if status == "OK":
+                    self.cache.update_flags(self.mailbox, {
+                        record["uid"]: record["flags"]
+                        for record in parse_fetch_response(changed)
+                        if record["flags"] is not None
+                    })
+
+            # Fewer messages than expected means something was expunged
+            if cached_uids and exists < state["exists"] + len(new_records):
+                self.prune(mail, cached_uids)
+
+        new_state = {
+            "uidvalidity": uidvalidity,
+            "uidnext": uidnext or (max(self.cache.uids(self.mailbox) or [0]) + 1),
+            "highestmodseq": highestmodseq,
+            "exists": exists
+        }
+        self.cache.save_state(self.mailbox, new_state)
+        return new_state
+
+    def prune(self, mail, cached_uids: List[int] = None):
+        """Drop cached headers whose UIDs no longer exist on the server."""
+        cached_uids = cached_uids or self.cache.uids(self.mailbox)
+        if not cached_uids:
+            return
+
+        status, data = mail.uid("SEARCH", None, f"UID {cached_uids[0]}:*")
+        if status != "OK":
+            return
+
+        alive = {int(uid) for uid in (data[0] or b"").split()}
+        gone = [uid for uid in cached_uids if uid not in alive]
+        if gone:
+            self.cache.remove_uids(self.mailbox, gone)
+
+    def refresh_flags(self, mail):
+        """Re-read FLAGS of every cached message (servers without CONDSTORE)."""
+        cached_uids = self.cache.uids(self.mailbox)
+        if not cached_uids:
+            return
+
+        status, data = mail.uid("FETCH", f"{cached_uids[0]}:*", "(UID FLAGS)")
+        if status == "OK":
+            self.cache.update_flags(self.mailbox, {
+                record["uid"]: record["flags"]
+                for record in parse_fetch_response(data)
+                if record["flags"] is not None
+            })
+
+    def recent(self, mail, count: int) -> List[Dict[str, Any]]:
+        """
+        Newest `count` headers, syncing first and backfilling older ones if
+        the cache holds fewer than requested.
+        """
+        with self._lock:
+            state = self.sync(mail)
+            cached = self.cache.recent(self.mailbox, count)
+
+            if len(cached) < count and state["exists"] > len(cached):
+                first = max(1, state["exists"] - count + 1)
+                status, fetched = mail.fetch(f"{first}:{state['exists']}", f"(UID FLAGS {HEADER_FIELDS})")
+                if status == "OK":
+                    self.cache.store_headers(self.mailbox, parse_fetch_response(fetched))
+                    cached = self.cache.recent(self.mailbox, count)
+
+            return cached
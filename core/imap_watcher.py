@@ -0,0 +1,242 @@
+import re
+import time
+import select
+import threading
+from typing import Any, Callable, Dict, List, Optional
+
+from core.imap_sync import IMAPSync
+
+
+_EVENT_RE = re.compile(rb"^\* (\d+) (EXISTS|EXPUNGE|FETCH)\b(.*)")
+_EVENT_UID_RE = re.compile(rb"UID (\d+)")
+_EVENT_FLAGS_RE = re.compile(rb"FLAGS \(([^)]*)\)")
+_STATUS_UNSEEN_RE = re.compile(rb"UNSEEN (\d+)")
+
+
+class _SocketLines:
+    """
+    Line reader straight off the IMAP socket with a timeout.
+
+    imaplib's buffered file cannot be read with a timeout, so while IDLE is
+    active responses are read here instead. imaplib's own buffer is empty at
+    that point because every earlier command was read to its tagged reply.
+    """
+
+    def __init__(self, sock):
+        self.sock = sock
+        self.buffer = b""
+
+    def readline(self, timeout: float) -> Optional[bytes]:
+        deadline = time.monotonic() + timeout
+
+        while b"\n" not in self.buffer:
+            pending = getattr(self.sock, "pending", None)
+            if not (pending and pending()):
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return None
+                readable, _, _ = select.select([self.sock], [], [], remaining)
+                if not readable:
+                    return None
+
+            data = self.sock.recv(4096)
+            if not data:
+                raise ConnectionError("IMAP server closed the connection")
+            self.buffer += data
+
+        line, _, self.buffer = self.buffer.partition(b"\n")
+        return line.rstrip(b"\r")
+
+
+class MailboxWatcher:
+    """
+    Background, long-lived IMAP session that keeps the unread count and the
+    newest headers in memory.
+
+    Uses IDLE when the server supports it (refreshing on EXISTS, EXPUNGE and
+    FETCH pushes) and cheap polling otherwise. Reconnects with exponential
+    backoff.
+    """
+
+    def __init__(
+        self,
+        connect: Callable[[], Any],
+        sync: IMAPSync,
+        recent_size: int = 20,
+        poll_interval: float = 60,
+        idle_timeout: float = 25 * 60
+    ):
+        self.connect = connect
+        self.sync = sync
+        self.recent_size = recent_size
+        self.poll_interval = poll_interval
+        # RFC 2177: re-issue IDLE before the server's 30 minute timeout
+        self.idle_timeout = idle_timeout
+
+        self.unread_count: Optional[int] = None
+        self.recent: List[Dict[str, Any]] = []
+        self.last_update = 0.0
+        self.connected = False
+
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._ready = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    # ================== PUBLIC API ==================
+    def start(self):
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="jarvis-mail", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def wait_ready(self, timeout: float) -> bool:
+        """Block until the first refresh completed (or timeout)."""
+        return self._ready.wait(timeout)
+
+    def snapshot(self) -> Optional[Dict[str, Any]]:
+        """Cached unread count and recent headers, or None if not fresh."""
+        with self._lock:
+            if not self.connected or self.unread_count is None:
+                return None
+            return {
+                "unread_count": self.unread_count,
+                "recent": list(self.recent),
+                "last_update": self.last_update
+            }
+
+    # ================== SESSION LOOP ==================
+    def _run(self):
+        backoff = 1.0
+
+        while not self._stop.is_set():
+            mail = None
+            try:
+                mail = self.connect()
+                self._refresh(mail, [])
+                backoff = 1.0
+
+                supports_idle = "IDLE" in getattr(mail, "capabilities", ())
+
+                while not self._stop.is_set():
+                    if supports_idle:
+                        events = self._idle(mail)
+                    else:
+                        self._stop.wait(self.poll_interval)
+                        mail.noop()
+                        events = []
+
+                    if not self._stop.is_set():
+                        self._refresh(mail, events)
+
+            except Exception as e:
+                with self._lock:
+                    self.connected = False
+                print(f"Mail watcher error: {e}")
+                self._stop.wait(backoff)
+                backoff = min(backoff * 2, 300)
+
+            finally:
+                if mail is not None:
+                    try:
+                        mail.logout()
+                    except Exception:
+                        pass
+
+        with self._lock:
+            self.connected = False
+
+    def _idle(self, mail) -> List[Dict[str, Any]]:
+        """Run one IDLE cycle and return the untagged events it produced."""
+        tag = mail._new_tag()
+        mail.send(tag + b" IDLE\r\n")
+        lines = _SocketLines(mail.sock)
+
+        continuation = lines.readline(timeout=30)
+        if continuation is None or not continuation.startswith(b"+"):
+            raise ConnectionError(f"IDLE rejected: {continuation!r}")
+
+        events = []
+        deadline = time.monotonic() + self.idle_timeout
+
+        # Short reads so stop() and the IDLE deadline are noticed quickly
+        while not events and not self._stop.is_set() and time.monotonic() < deadline:
+            line = lines.readline(timeout=1.0)
+            if line is not None:
+                events.extend(self._parse_event(line))
+
+        mail.send(b"DONE\r\n")
+
+        while True:
+            line = lines.readline(timeout=30)
+            if line is None:
+                raise ConnectionError("No reply to IDLE DONE")
+            if line.startswith(tag):
+                break
+            events.extend(self._parse_event(line))
+
+        return events
+
+    @staticmethod
+    def _parse_event(line: bytes) -> List[Dict[str, Any]]:
+        match = _EVENT_RE.match(line)
+        if not match:
+            return []
+
+        event = {"seq": int(match.group(1)), "type": match.group(2).decode()}
+        uid = _EVENT_UID_RE.search(match.group(3))
+        flags = _EVENT_FLAGS_RE.search(match.group(3))
+        if uid:
+            event["uid"] = int(uid.group(1))
+        if flags:
+            event["flags"] = flags.group(1).decode(errors="replace").split()
+        return [event]
+
+    def _refresh(self, mail, events: List[Dict[str, Any]]):
+        """Apply pushed changes, then update the in-memory counters."""
+        state = self.sync.sync(mail)
+        types = {event["type"] for event in events}
+
+        if "EXPUNGE" in types:
+            # Sequence numbers don't identify the message; re-check cached UIDs
+            self.sync.prune(mail)
+
+        if "FETCH" in types:
+            fetch_events = [event for event in events if event["type"] == "FETCH"]
+            by_uid = {
+                event["uid"]: event["flags"]
+                for event in fetch_events
+                if "uid" in event and "flags" in event
+            }
+            if by_uid:
+                self.sync.cache.update_flags(self.sync.mailbox, by_uid)
+
+            # Pushes without a UID can't be applied directly; CONDSTORE
+            # servers were already covered by sync(), others need a re-read
+            if len(by_uid) < len(fetch_events) and not state.get("highestmodseq"):
+                self.sync.refresh_flags(mail)
+
+        unread = self._unread_count(mail)
+        recent = self.sync.cache.recent(self.sync.mailbox, self.recent_size)
+
+        with self._lock:
+            self.unread_count = unread
+            self.recent = recent
+            self.last_update = time.time()
+            self.connected = True
+        self._ready.set()
+
+    def _unread_count(self, mail) -> int:
+        status, data = mail.status(self.sync.mailbox, "(UNSEEN)")
+        if status == "OK" and data and data[0]:
+            match = _STATUS_UNSEEN_RE.search(data[0])
+            if match:
+                return int(match.group(1))
+
+        # Some servers refuse STATUS on the selected mailbox
+        status, data = mail.uid("SEARCH", None, "UNSEEN")
+        return len((data[0] or b"").split()) if status == "OK" else 0
@@ -0,0 +1,168 @@
+import os
+import re
+import json
+from typing import Any, Dict, List, Optional, Tuple
+from core.registry import SkillRegistry
+from core.executor import ToolExecutor, ToolJob
+
+
+# Filler words dropped before matching ("jarvis, please open safari")
+FILLER_PREFIXES = ("hey ", "jarvis ", "please ", "can you ", "could you ")
+FILLER_SUFFIXES = (" please", " jarvis", " for me")
+
+
+class IntentRouter:
+    """
+    Local fast-path in front of the LLM for deterministic commands.
+
+    Skills declare intents (see Skill.get_intents) as regex patterns bound to
+    one of their functions. Patterns are compiled once; a query that matches
+    with enough confidence is sent straight to the registry function and the
+    reply is rendered from the intent's template, with no network round-trip.
+    The call goes through the ToolExecutor, so skill locks and timeouts
+    apply as they do for model-requested tools.
+    """
+
+    def __init__(self, registry: SkillRegistry, threshold: float = None, executor: ToolExecutor = None):
+        self.registry = registry
+        self.executor = executor or ToolExecutor()
+        self.threshold = threshold if threshold is not None else float(
+            os.environ.get("JARVIS_INTENT_THRESHOLD", "0.8")
+        )
+        self.rules: List[Tuple[re.Pattern, Dict[str, Any]]] = []
+        self._compiled_count = -1
+
+    def _compile(self):
+        intents = self.registry.get_intents()
+        if len(intents) == self._compiled_count:
+            return
+
+        self.rules = [
+            (re.compile(intent["pattern"], re.IGNORECASE), intent)
+            for intent in intents
+        ]
+        self._compiled_count = len(intents)
+
+    @staticmethod
+    def normalize(query: str) -> str:
+        text = re.sub(r"[?!]+", " ", query.lower())
+        # Commas inside the query stay: "pune, delhi" is not one city
+        text = re.sub(r"\s*,\s*", ", ", text)
+        text = re.sub(r"\s+", " ", text).strip().rstrip(".,")
+
+        changed = True
+        while changed:
+            changed = False
+            for prefix in FILLER_PREFIXES:
+                if text.startswith(prefix) or text.startswith(prefix.rstrip() + ","):
+                    text = text[len(prefix):].lstrip(", ")
+                    changed = True
+            for suffix in FILLER_SUFFIXES:
+                if text.endswith(suffix):
+                    text = text[:-len(suffix)].rstrip(", ")
+                    changed = True
+
+        return text.strip()
+
+    def match(self, query: str) -> Optional[Tuple[Dict[str, Any], Dict[str, Any], float]]:
+        """
+        Find the best intent for a query.
+
+        Returns:
+            (intent, extracted args, confidence) or None if nothing matched
+        """
+        self._compile()
+        text = self.normalize(query)
+        if not text:
+            return None
+
+        best = None
+
+        for pattern, intent in self.rules:
+            base = intent.get("confidence", 1.0)
+
+            match = pattern.fullmatch(text)
+            if match:
+                confidence = base
+            else:
+                match = pattern.search(text)
+                if not match:
+                    continue
+                # Partial hits are only as good as the share of the query they explain
+                confidence = base * (match.end() - match.start()) / len(text)
+
+            if best is None or confidence > best[2]:
+                args = dict(intent.get("args", {}))
+                for key, value in match.groupdict().items():
+                    if value is not None:
+                        value = value.strip()
+                        args[key] = int(value) if value.isdigit() else value
+                best = (intent, args, confidence)
+
+        return best
+
+    def _plan(self, query: str) -> Optional[Tuple[Dict[str, Any], Dict[str, Any], ToolJob]]:
+        found = self.match(query)
+        if not found or found[2] < self.threshold:
+            return None
+
+        intent, args, _ = found
+        function_to_call = self.registry.get_function(intent["function"])
+        if not function_to_call:
+            return None
+
+        meta = self.registry.get_function_meta(intent["function"])
+        job = ToolJob(
+            function_to_call,
+            args,
+            lock_key=None if meta.get("thread_safe", True) else meta.get("skill"),
+            timeout=meta.get("timeout")
+        )
+        return intent, args, job
+
+    def _reply(self, intent: Dict[str, Any], args: Dict[str, Any], result: Any) -> str:
+        if isinstance(result, Exception):
+            return "I encountered an error while executing the request."
+        return self.render(intent, args, result)
+
+    def route(self, query: str) -> Optional[str]:
+        """
+        Answer the query locally if a high-confidence intent matches.
+
+        Returns:
+            The reply text, or None to fall back to the LLM path
+        """
+        planned = self._plan(query)
+        if planned is None:
+            return None
+        intent, args, job = planned
+        return self._reply(intent, args, self.executor.run([job])[0])
+
+    async def route_async(self, query: str) -> Optional[str]:
+        """route() for the event loop."""
+        planned = self._plan(query)
+        if planned is None:
+            return None
+        intent, args, job = planned
+        return self._reply(intent, args, (await self.executor.run_async([job]))[0])
+
+    @staticmethod
+    def render(intent: Dict[str, Any], args: Dict[str, Any], result: Any) -> str:
+        values = dict(args)
+        values["result"] = result
+
+        try:
+            parsed = json.loads(result) if isinstance(result, str) else None
+        except ValueError:
+            parsed = None
+
+        if isinstance(parsed, dict):
+            # The function already ran, so report failures instead of retrying via the LLM
+            if parsed.get("status") == "error" or "error" in parsed:
+                return parsed.get("message") or parsed.get("error") or "I could not complete that."
+            values.update(parsed)
+
+        try:
+            return intent.get("template", "{result}").format(**values)
+        except (KeyError, IndexError, ValueError):
+            return "Task completed."
@@ -0,0 +1,205 @@
+import os
+import json
+import time
+import sqlite3
+import threading
+from abc import ABC, abstractmethod
+from typing import Dict, Optional
+
+
+class MemoryStore(ABC):
+    """Storage backend for MemorySkill facts (key -> value)."""
+
+    @abstractmethod
+    def get(self, key: str) -> Optional[str]:
+        """Return the value stored under key, or None."""
+        pass
+
+    @abstractmethod
+    def set_many(self, items: Dict[str, str]):
+        """Insert or update several facts in one atomic write."""
+        pass
+
+    @abstractmethod
+    def delete(self, key: str) -> bool:
+        """Remove a fact. Returns True if it existed."""
+        pass
+
+    @abstractmethod
+    def all(self) -> Dict[str, str]:
+        """Every stored fact."""
+        pass
+
+    @abstractmethod
+    def count(self) -> int:
+        pass
+
+    def set(self, key: str, value: str):
+        self.set_many({key: value})
+
+    def export_json(self, path: str):
+        """Write all facts to a JSON file (the legacy memory format)."""
+        path = os.path.expanduser(path)
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(self.all(), f, indent=2)
+        os.replace(tmp_path, path)
+
+
+# ================== SQLITE ==================
+class SQLiteMemoryStore(MemoryStore):
+    """SQLite (WAL) store: indexed lookups by key and crash-safe writes."""
+
+    def __init__(self, path: str):
+        self.path = os.path.expanduser(path)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        with self._conn:
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS memories ("
+                "key TEXT PRIMARY KEY, value TEXT NOT NULL, "
+                "created_at REAL NOT NULL, updated_at REAL NOT NULL)"
+            )
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS meta (name TEXT PRIMARY KEY, value TEXT)"
+            )
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value FROM memories WHERE key = ?", (key,)
+            ).fetchone()
+        return row[0] if row else None
+
+    def set_many(self, items: Dict[str, str]):
+        now = time.time()
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT INTO memories (key, value, created_at, updated_at) VALUES (?, ?, ?, ?) "
+                "ON CONFLICT(key) DO UPDATE SET value = excluded.value, updated_at = excluded.updated_at",
+                [(key, str(value), now, now) for key, value in items.items()]
+            )
+
+    def delete(self, key: str) -> bool:
+        with self._lock, self._conn:
+            cursor = self._conn.execute("DELETE FROM memories WHERE key = ?", (key,))
+        return cursor.rowcount > 0
+
+    def all(self) -> Dict[str, str]:
+        with self._lock:
+            rows = self._conn.execute("SELECT key, value FROM memories ORDER BY key").fetchall()
+        return dict(rows)
+
+    def count(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM memories").fetchone()[0]
+
+    def timestamps(self, key: str) -> Optional[Dict[str, float]]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT created_at, updated_at FROM memories WHERE key = ?", (key,)
+            ).fetchone()
+        return {"created_at": row[0], "updated_at": row[1]} if row else None
+
+    def migrate_from_json(self, json_path: str) -> int:
+        """
+        Import the legacy JSON memory file once.
+
+        Args:
+            json_path: Path of the old ~/.jarvic_memory.json file
+
+        Returns:
+            Number of facts imported (0 if already migrated or no file)
+        """
+        json_path = os.path.expanduser(json_path)
+
+        with self._lock:
+            done = self._conn.execute(
+                "SELECT value FROM meta WHERE name = 'json_migrated'"
+            ).fetchone()
+        if done or not os.path.exists(json_path):
+            return 0
+
+        try:
+            with open(json_path, "r") as f:
+                legacy = json.load(f)
+        except (OSError, ValueError):
+            legacy = {}
+
+        if isinstance(legacy, dict) and legacy:
+            self.set_many({str(key): str(value) for key, value in legacy.items()})
+
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO meta (name, value) VALUES ('json_migrated', ?)",
+                (json_path,)
+            )
+        return len(legacy) if isinstance(legacy, dict) else 0
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+# ================== JSON ==================
+class JSONMemoryStore(MemoryStore):
+    """Legacy whole-file JSON store, kept for export and opt-out."""
+
+    def __init__(self, path: str):
+        self.path = os.path.expanduser(path)
+        self._lock = threading.Lock()
+
+    def _load(self) -> Dict[str, str]:
+        try:
+            with open(self.path, "r") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _save(self, memory: Dict[str, str]):
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(memory, f, indent=2)
+        os.replace(tmp_path, self.path)
+
+    def get(self, key: str) -> Optional[str]:
+        return self._load().get(key)
+
+    def set_many(self, items: Dict[str, str]):
+        with self._lock:
+            memory = self._load()
+            memory.update(items)
+            self._save(memory)
+
+    def delete(self, key: str) -> bool:
+        with self._lock:
+            memory = self._load()
+            if key not in memory:
+                return False
+            del memory[key]
+            self._save(memory)
+            return True
+
+    def all(self) -> Dict[str, str]:
+        return self._load()
+
+    def count(self) -> int:
+        return len(self._load())
+
+
+def open_memory_store(db_path: str, json_path: str) -> MemoryStore:
+    """
+    Open the configured backend (JARVIS_MEMORY_BACKEND=sqlite|json).
+
+    The SQLite backend imports the legacy JSON file on first use.
+    """
+    if os.environ.get("JARVIS_MEMORY_BACKEND", "sqlite") == "json":
+        return JSONMemoryStore(json_path)
+
+    store = SQLiteMemoryStore(db_path)
+    migrated = store.migrate_from_json(json_path)
+    if migrated:
+        print(f"Migrated {migrated} memories from {json_path}")
+    return store
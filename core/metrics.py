@@ -0,0 +1,161 @@
+import time
+import threading
+from collections import deque
+from contextlib import contextmanager
+from typing import Any, AsyncIterator, Callable, Deque, Dict, Iterator, Optional, Tuple
+
+# Pipeline stages, in milliseconds
+STT = "stt"
+LLM_FIRST_TOKEN = "llm_first_token"
+LLM_TOTAL = "llm_total"
+TOOL = "tool"
+TTS = "tts"
+STAGES = (STT, LLM_FIRST_TOKEN, LLM_TOTAL, TOOL, TTS)
+
+# 1.0 per cache hit, 0.0 per miss: the window mean is the hit rate
+CACHE_HIT = "cache_hit"
+
+# Gauges: items waiting
+COMMAND_QUEUE = "command_queue"
+TTS_QUEUE = "tts_queue"
+
+# Tool-schema tokens per LLM request: sent, and left out by tool selection
+SCHEMA_TOKENS_SENT = "schema_tokens_sent"
+SCHEMA_TOKENS_SAVED = "schema_tokens_saved"
+
+
+def _percentile(values, pct: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+
+class MetricsBus:
+    """
+    Process-wide sink for stage latencies, cache lookups and queue depths.
+
+    Producers call record() (or timer()) from any thread. Each metric keeps
+    its last `window` samples in a bounded deque; appends are atomic, so
+    recording never takes a lock. Subscribers are called on the producer's
+    thread and must not block. The GUI's subscriber only emits a Qt signal,
+    which Qt queues to the GUI thread.
+    """
+
+    def __init__(self, window: int = 200):
+        self.window = window
+        self._series: Dict[str, Deque[float]] = {}
+        # Replaced, never mutated, so record() can iterate it without a lock
+        self._subscribers: Tuple[Callable[[str, float], None], ...] = ()
+        self._lock = threading.Lock()
+
+    def record(self, name: str, value: float):
+        series = self._series.get(name)
+        if series is None:
+            with self._lock:
+                series = self._series.setdefault(name, deque(maxlen=self.window))
+        series.append(value)
+
+        for callback in self._subscribers:
+            try:
+                callback(name, value)
+            except Exception as e:
+                print(f"Metrics subscriber error: {e}")
+
+    def record_since(self, name: str, started: float):
+        """Record the milliseconds elapsed since a time.perf_counter() reading."""
+        self.record(name, (time.perf_counter() - started) * 1000)
+
+    @contextmanager
+    def timer(self, name: str):
+        """Record how long the block took, in milliseconds (also if it raised)."""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record_since(name, started)
+
+    def subscribe(self, callback: Callable[[str, float], None]) -> Callable[[], None]:
+        """
+        Call callback(name, value) for every new sample.
+
+        Returns:
+            A function that unsubscribes the callback
+        """
+        with self._lock:
+            self._subscribers = self._subscribers + (callback,)
+
+        def unsubscribe():
+            with self._lock:
+                self._subscribers = tuple(c for c in self._subscribers if c is not callback)
+        return unsubscribe
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        """Window statistics of every metric: count, last, mean, p50, p95, max."""
+        with self._lock:
+            series = {name: list(values) for name, values in self._series.items()}
+
+        stats = {}
+        for name, values in series.items():
+            if not values:
+                continue
+            stats[name] = {
+                "count": len(values),
+                "last": values[-1],
+                "mean": sum(values) / len(values),
+                "p50": _percentile(values, 50),
+                "p95": _percentile(values, 95),
+                "max": max(values)
+            }
+        return stats
+
+    def clear(self):
+        with self._lock:
+            self._series = {}
+
+
+def _has_output(chunk) -> bool:
+    if not chunk.choices:
+        return False
+    delta = chunk.choices[0].delta
+    return bool(delta.content or delta.tool_calls)
+
+
+def timed_stream(stream, started: float, bus: "MetricsBus" = None) -> Iterator[Any]:
+    """
+    Pass an LLM chunk stream through, recording time to the first content
+    (or tool call) chunk and, if it runs to the end, the total time.
+    started is the time.perf_counter() reading taken before the request.
+    """
+    bus = bus or get_metrics()
+    first = True
+    for chunk in stream:
+        if first and _has_output(chunk):
+            bus.record_since(LLM_FIRST_TOKEN, started)
+            first = False
+        yield chunk
+    bus.record_since(LLM_TOTAL, started)
+
+
+async def atimed_stream(stream, started: float, bus: "MetricsBus" = None) -> AsyncIterator[Any]:
+    """timed_stream() for async chunk streams."""
+    bus = bus or get_metrics()
+    first = True
+    async for chunk in stream:
+        if first and _has_output(chunk):
+            bus.record_since(LLM_FIRST_TOKEN, started)
+            first = False
+        yield chunk
+    bus.record_since(LLM_TOTAL, started)
+
+
+_bus: Optional[MetricsBus] = None
+_bus_lock = threading.Lock()
+
+
+def get_metrics() -> MetricsBus:
+    """The process-wide metrics bus."""
+    global _bus
+    if _bus is None:
+        with _bus_lock:
+            if _bus is None:
+                _bus = MetricsBus()
+    return _bus
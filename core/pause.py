@@ -0,0 +1,87 @@
+import asyncio
+import threading
+from typing import Optional
+
+
+class PauseController:
+    """
+    Pause flag shared by the GUI thread and the asyncio loop.
+
+    Threaded callers use it like a threading.Event (set / clear / is_set /
+    wait), so the GUI needs no changes. Coroutines await paused() or
+    resumed() instead of polling; state changes made from other threads are
+    forwarded to the loop with call_soon_threadsafe.
+    """
+
+    def __init__(self):
+        self._flag = threading.Event()
+        self._resumed_flag = threading.Event()
+        self._resumed_flag.set()
+
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._paused: Optional[asyncio.Event] = None
+        self._resumed: Optional[asyncio.Event] = None
+
+    def bind(self, loop: asyncio.AbstractEventLoop = None):
+        """Attach to the event loop that awaits the flag (call from that loop)."""
+        self._loop = loop or asyncio.get_running_loop()
+        self._paused = asyncio.Event()
+        self._resumed = asyncio.Event()
+        self._sync()
+
+    # ================== threading.Event interface ==================
+    def set(self):
+        self._flag.set()
+        self._resumed_flag.clear()
+        self._notify()
+
+    def clear(self):
+        self._flag.clear()
+        self._resumed_flag.set()
+        self._notify()
+
+    def is_set(self) -> bool:
+        return self._flag.is_set()
+
+    def wait(self, timeout: float = None) -> bool:
+        """Block until paused."""
+        return self._flag.wait(timeout)
+
+    def wait_resumed(self, timeout: float = None) -> bool:
+        """Block until not paused (for plain threads)."""
+        return self._resumed_flag.wait(timeout)
+
+    # ================== asyncio interface ==================
+    async def paused(self):
+        await self._paused.wait()
+
+    async def resumed(self):
+        await self._resumed.wait()
+
+    def _sync(self):
+        # Runs on the loop; reads the flag so out-of-order callbacks are harmless
+        if self._flag.is_set():
+            self._resumed.clear()
+            self._paused.set()
+        else:
+            self._paused.clear()
+            self._resumed.set()
+
+    def _notify(self):
+        loop = self._loop
+        if loop is None:
+            return
+
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+
+        if running is loop:
+            self._sync()
+        else:
+            try:
+                loop.call_soon_threadsafe(self._sync)
+            except RuntimeError:
+                # Loop already closed
+                pass
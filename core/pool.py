@@ -0,0 +1,112 @@
+import os
+import threading
+from typing import List, Optional
+
+
+# ================== SHARED CLIENTS ==================
+# One keep-alive HTTP session and one LLM client per process, so repeated
+# skill and engine calls reuse open TCP/TLS connections.
+_lock = threading.Lock()
+_http_session = None
+_llm_client = None
+_async_llm_client = None
+
+WARM_UP_URLS = {
+    "OPENWEATHERMAP_API_KEY": "https://api.openweathermap.org"
+}
+
+
+def get_http_session():
+    """Shared requests.Session with a pooled, keep-alive adapter."""
+    global _http_session
+    if _http_session is None:
+        with _lock:
+            if _http_session is None:
+                import requests
+                from requests.adapters import HTTPAdapter
+
+                session = requests.Session()
+                adapter = HTTPAdapter(pool_connections=8, pool_maxsize=16)
+                session.mount("https://", adapter)
+                session.mount("http://", adapter)
+                _http_session = session
+    return _http_session
+
+
+def get_llm_client():
+    """Shared Groq client used by the engine and any skill that calls the LLM."""
+    global _llm_client
+    if _llm_client is None:
+        with _lock:
+            if _llm_client is None:
+                from groq import Groq
+                _llm_client = Groq(api_key=os.environ.get("GROQ_API_KEY"))
+    return _llm_client
+
+
+def get_async_llm_client():
+    """
+    Shared AsyncGroq client for coroutine callers.
+
+    Its connection pool belongs to the event loop that first uses it, so
+    the process should run a single loop (as main.py does).
+    """
+    global _async_llm_client
+    if _async_llm_client is None:
+        with _lock:
+            if _async_llm_client is None:
+                from groq import AsyncGroq
+                _async_llm_client = AsyncGroq(api_key=os.environ.get("GROQ_API_KEY"))
+    return _async_llm_client
+
+
+def warm_up(urls: Optional[List[str]] = None, background: bool = True):
+    """
+    Open connections before the first query so it doesn't pay the handshake.
+
+    Args:
+        urls: Extra URLs to touch through the shared HTTP session
+        background: Run in a daemon thread instead of blocking startup
+    """
+    def _warm():
+        try:
+            # Cheap authenticated call that leaves a warm connection in the pool
+            get_llm_client().models.list()
+        except Exception as e:
+            print(f"LLM warm-up failed: {e}")
+
+        targets = list(urls or [])
+        targets.extend(url for env, url in WARM_UP_URLS.items() if os.environ.get(env))
+
+        for url in targets:
+            try:
+                get_http_session().head(url, timeout=5)
+            except Exception as e:
+                print(f"Warm-up failed for {url}: {e}")
+
+    if background:
+        threading.Thread(target=_warm, name="jarvis-warmup", daemon=True).start()
+    else:
+        _warm()
+
+
+def close_all():
+    """Close pooled connections (called on shutdown)."""
+    global _http_session, _llm_client
+    with _lock:
+        if _http_session is not None:
+            _http_session.close()
+            _http_session = None
+        if _llm_client is not None:
+            _llm_client.close()
+            _llm_client = None
+
+
+async def aclose_all():
+    """close_all() plus the async client; call from the loop that used it."""
+    global _async_llm_client
+    with _lock:
+        client, _async_llm_client = _async_llm_client, None
+    if client is not None:
+        await client.close()
+    close_all()
@@ -1,49 +1,223 @@
 import os
+import json
+import hashlib
+import threading
 import importlib.util
 import inspect
-from typing import Dict, List, Any, Callable
+from typing import Dict, List, Any, Callable, Optional, Tuple
 from .skill import Skill
+from .tool_index import ToolIndex, tool_text, intent_words
+from .metrics import SCHEMA_TOKENS_SAVED, SCHEMA_TOKENS_SENT, get_metrics
+
+# Tool schemas cached per skill module, keyed by the module's file hash
+DEFAULT_MANIFEST = os.path.expanduser("~/.jarvis_skill_manifest.json")
+
 
 class SkillRegistry:
     def __init__(self):
         self.skills: Dict[str, Skill] = {}
         self.tools_schema: List[Dict[str, Any]] = []
         self.functions: Dict[str, Callable] = {}
+        self.function_meta: Dict[str, Dict[str, Any]] = {}
+        self.intents: List[Dict[str, Any]] = []
+
+        # Lazy mode: function name -> (module name, file path) not imported yet
+        self.lazy_functions: Dict[str, Tuple[str, str]] = {}
+        self._lazy_lock = threading.Lock()
+
+        # Per-query tool selection (0 disables it and sends every tool)
+        self.tool_index = ToolIndex()
+        self.tool_top_k = int(os.environ.get("JARVIS_TOOL_TOP_K", "4"))
+        self.always_on_tools = {
+            name.strip()
+            for name in os.environ.get("JARVIS_ALWAYS_ON_TOOLS", "retrieve_memory").split(",")
+            if name.strip()
+        }
+        self.tool_tokens: Dict[str, int] = {}
 
-    def load_skills(self, skills_dir: str):
-        """Dynamically load skills from the specified directory."""
+    def load_skills(self, skills_dir: str, lazy: bool = False, manifest_path: str = None):
+        """
+        Dynamically load skills from the specified directory.
+
+        Args:
+            skills_dir: Directory containing skill modules
+            lazy: Serve tool schemas from the on-disk manifest and only import
+                a skill module the first time one of its functions is needed
+            manifest_path: Manifest location (defaults to JARVIS_SKILL_MANIFEST
+                or ~/.jarvis_skill_manifest.json)
+        """
         if not os.path.exists(skills_dir):
             print(f"Skills directory not found: {skills_dir}")
             return
 
-        for filename in os.listdir(skills_dir):
+        manifest_path = manifest_path or os.environ.get("JARVIS_SKILL_MANIFEST", DEFAULT_MANIFEST)
+        manifest = self._read_manifest(manifest_path) if lazy else {}
+        manifest_changed = False
+
+        for filename in sorted(os.listdir(skills_dir)):
             if filename.endswith(".py") and filename != "__init__.py":
                 module_name = filename[:-3]
-                file_path = os.path.join(skills_dir, filename)
-                self._load_skill_from_file(module_name, file_path)
+                file_path = os.path.abspath(os.path.join(skills_dir, filename))
+
+                if not lazy:
+                    self._load_skill_from_file(module_name, file_path)
+                    continue
+
+                file_hash = self._hash_file(file_path)
+                entry = manifest.get(file_path)
 
-    def _load_skill_from_file(self, module_name: str, file_path: str):
+                if entry and entry.get("hash") == file_hash:
+                    self._register_from_manifest(module_name, file_path, entry)
+                    continue
+
+                # New or changed module: import it once and record its schemas
+                skills = self._load_skill_from_file(module_name, file_path)
+                manifest[file_path] = {
+                    "hash": file_hash,
+                    "skills": [self._describe_skill(skill) for skill in skills]
+                }
+                manifest_changed = True
+
+        if manifest_changed:
+            self._write_manifest(manifest_path, manifest)
+
+    def _load_skill_from_file(self, module_name: str, file_path: str, schemas_known: bool = False) -> List[Skill]:
+        loaded = []
         spec = importlib.util.spec_from_file_location(module_name, file_path)
         if spec and spec.loader:
             module = importlib.util.module_from_spec(spec)
             spec.loader.exec_module(module)
-            
+
             for name, obj in inspect.getmembers(module):
                 if inspect.isclass(obj) and issubclass(obj, Skill) and obj is not Skill:
                     try:
                         skill_instance = obj()
-                        self.register_skill(skill_instance)
+                        self.register_skill(skill_instance, schemas_known=schemas_known)
+                        loaded.append(skill_instance)
                         print(f"Loaded skill: {skill_instance.name}")
                     except Exception as e:
                         print(f"Failed to load skill {name}: {e}")
+        return loaded
+
+    # ================== MANIFEST ==================
+    @staticmethod
+    def _hash_file(file_path: str) -> str:
+        with open(file_path, "rb") as f:
+            return hashlib.sha256(f.read()).hexdigest()
+
+    @staticmethod
+    def _read_manifest(manifest_path: str) -> Dict[str, Any]:
+        try:
+            with open(manifest_path, "r") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    @staticmethod
+    def _write_manifest(manifest_path: str, manifest: Dict[str, Any]):
+        tmp_path = manifest_path + ".tmp"
+        try:
+            with open(tmp_path, "w") as f:
+                json.dump(manifest, f)
+            os.replace(tmp_path, manifest_path)
+        except OSError as e:
+            print(f"Could not write skill manifest: {e}")
+
+    @staticmethod
+    def _describe_skill(skill: Skill) -> Dict[str, Any]:
+        return {
+            "name": skill.name,
+            "tools": skill.get_tools(),
+            "intents": skill.get_intents(),
+            "functions": list(skill.get_functions()),
+            "thread_safe": skill.thread_safe,
+            "timeout": skill.tool_timeout
+        }
 
-    def register_skill(self, skill: Skill):
+    def _register_from_manifest(self, module_name: str, file_path: str, entry: Dict[str, Any]):
+        for described in entry.get("skills", []):
+            self._add_schemas(described["tools"], described["intents"])
+
+            for function_name in described["functions"]:
+                self.lazy_functions[function_name] = (module_name, file_path)
+                self.function_meta[function_name] = {
+                    "skill": described["name"],
+                    "thread_safe": described["thread_safe"],
+                    "timeout": described["timeout"]
+                }
+
+    # ================== REGISTRATION ==================
+    def register_skill(self, skill: Skill, schemas_known: bool = False):
         self.skills[skill.name] = skill
-        self.tools_schema.extend(skill.get_tools())
-        self.functions.update(skill.get_functions())
 
-    def get_tools_schema(self) -> List[Dict[str, Any]]:
-        return self.tools_schema
+        if not schemas_known:
+            self._add_schemas(skill.get_tools(), skill.get_intents())
+
+        functions = skill.get_functions()
+        self.functions.update(functions)
+
+        for function_name in functions:
+            self.lazy_functions.pop(function_name, None)
+            self.function_meta[function_name] = {
+                "skill": skill.name,
+                "thread_safe": skill.thread_safe,
+                "timeout": skill.tool_timeout
+            }
+
+    def _add_schemas(self, tools: List[Dict[str, Any]], intents: List[Dict[str, Any]]):
+        self.tools_schema.extend(tools)
+        self.intents.extend(intents)
+
+        for tool in tools:
+            name = tool["function"]["name"]
+            self.tool_index.add(name, tool_text(tool))
+            # Rough token estimate of what this schema adds to every prompt
+            self.tool_tokens[name] = len(json.dumps(tool)) // 4
+
+        for intent in intents:
+            self.tool_index.add(intent["function"], intent_words([intent["pattern"]]))
+
+    def get_tools_schema(self, query: str = None) -> List[Dict[str, Any]]:
+        """
+        Tool schemas to send with a completion.
+
+        Args:
+            query: The user's request. When given, only the top-K relevant
+                tools plus the always-on set are returned.
+        """
+        if query is None or self.tool_top_k <= 0:
+            return self.tools_schema
+
+        selected = {name for name, _ in self.tool_index.search(query, self.tool_top_k)}
+        selected |= self.always_on_tools
+        tools = [tool for tool in self.tools_schema if tool["function"]["name"] in selected]
+
+        sent = sum(self.tool_tokens.get(tool["function"]["name"], 0) for tool in tools)
+        saved = sum(self.tool_tokens.values()) - sent
+        # Shows up in /metrics and MetricsBus.snapshot()
+        bus = get_metrics()
+        bus.record(SCHEMA_TOKENS_SENT, sent)
+        bus.record(SCHEMA_TOKENS_SAVED, saved)
+
+        return tools
+
+    def get_function(self, name: str) -> Optional[Callable]:
+        function = self.functions.get(name)
+        if function is not None or name not in self.lazy_functions:
+            return function
+
+        # First use of a manifest-only skill: import and instantiate it now
+        with self._lazy_lock:
+            if name in self.lazy_functions:
+                module_name, file_path = self.lazy_functions[name]
+                self._load_skill_from_file(module_name, file_path, schemas_known=True)
+                self.lazy_functions.pop(name, None)
+
+        return self.functions.get(name)
+
+    def get_intents(self) -> List[Dict[str, Any]]:
+        return self.intents
 
-    def get_function(self, name: str) -> Callable:
-        return self.functions.get(name)
\ No newline at end of file
+    def get_function_meta(self, name: str) -> Dict[str, Any]:
+        """Execution hints (owning skill, thread safety, timeout) for a function."""
+        return self.function_meta.get(name, {})
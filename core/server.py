@@ -0,0 +1,748 @@
+import os
+import json
+import time
+import base64
+import asyncio
+import hashlib
+import secrets
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, urlsplit
+
+from core.registry import SkillRegistry
+from core.async_engine import AsyncJarvisEngine
+from core.session import ConversationSession
+from core.cancel import CancelToken
+from core.metrics import COMMAND_QUEUE, get_metrics
+from core import tracing
+
+
+# python main.py --serve: HTTP + WebSocket API on JARVIS_SERVER_HOST:PORT
+DEFAULT_HOST = os.environ.get("JARVIS_SERVER_HOST", "127.0.0.1")
+DEFAULT_PORT = int(os.environ.get("JARVIS_SERVER_PORT", "8765"))
+
+MAX_BODY_BYTES = 64 * 1024
+MAX_WS_MESSAGE_BYTES = 1024 * 1024
+# Chunks buffered per answer before the answer waits for its reader
+OUTPUT_BUFFER = 32
+
+WS_GUID = b"258EAFA5-E914-47DA-95CA-C5AB0DC85B11"
+WS_TEXT, WS_CLOSE, WS_PING, WS_PONG = 0x1, 0x8, 0x9, 0xA
+
+_REASONS = {
+    101: "Switching Protocols", 200: "OK", 400: "Bad Request", 401: "Unauthorized",
+    403: "Forbidden", 404: "Not Found", 405: "Method Not Allowed", 413: "Payload Too Large",
+    415: "Unsupported Media Type", 429: "Too Many Requests", 500: "Internal Server Error",
+    503: "Service Unavailable"
+}
+
+_END = object()
+
+
+class Busy(Exception):
+    """The session already has as many requests queued as it may."""
+
+
+class HTTPError(Exception):
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+
+
+# ================== SESSIONS ==================
+class Turn:
+    """
+    One request of a session. The session's worker writes the answer into
+    a bounded queue; when the reader falls behind, the worker (and with it
+    the LLM stream) waits instead of buffering the whole answer.
+    """
+
+    def __init__(self, prompt: str):
+        self.prompt = prompt
+        self.token = CancelToken()
+        self.output: asyncio.Queue = asyncio.Queue(maxsize=OUTPUT_BUFFER)
+        self.task: Optional[asyncio.Task] = None
+
+    def cancel(self):
+        self.token.cancel()
+        if self.task is not None:
+            self.task.cancel()
+
+    def end_nowait(self, item=_END):
+        # Unread output of a cancelled answer is dropped, so this never blocks
+        while not self.output.empty():
+            self.output.get_nowait()
+        self.output.put_nowait(item)
+
+    async def end(self, failure: BaseException = None):
+        item = _END if failure is None else failure
+        if self.token.cancelled:
+            self.end_nowait(item)
+        else:
+            await self.output.put(item)
+
+    async def chunks(self) -> AsyncIterator[str]:
+        while True:
+            item = await self.output.get()
+            if item is _END:
+                return
+            if isinstance(item, BaseException):
+                raise item
+            yield item
+
+
+class ClientSession:
+    """
+    Conversation state of one front-end. Turns run one at a time, in
+    order (each builds on the history of the previous one), on the
+    session's own worker task; sessions run concurrently with each other.
+    """
+
+    def __init__(self, server: "JarvisServer", session_id: str):
+        self.server = server
+        self.id = session_id
+        self.conversation: ConversationSession = server.engine.new_session()
+        self.pending: asyncio.Queue = asyncio.Queue(maxsize=server.queue_size)
+        self.current: Optional[Turn] = None
+        self.last_seen = time.monotonic()
+        self._worker = asyncio.create_task(self._work(), name=f"jarvis-session-{session_id}")
+
+    @property
+    def idle(self) -> bool:
+        return self.current is None and self.pending.empty()
+
+    def submit(self, prompt: str) -> Turn:
+        """Queue a prompt; raises Busy when the queue is full."""
+        self.last_seen = time.monotonic()
+        turn = Turn(prompt)
+        try:
+            self.pending.put_nowait(turn)
+        except asyncio.QueueFull:
+            raise Busy(f"Session {self.id} has {self.pending.qsize()} requests waiting")
+        self.server.record_queue()
+        return turn
+
+    def cancel(self):
+        """Stop the answer in progress and drop everything queued."""
+        while not self.pending.empty():
+            turn = self.pending.get_nowait()
+            turn.token.cancel()
+            turn.end_nowait()
+        if self.current is not None:
+            self.current.cancel()
+        self.server.record_queue()
+
+    async def close(self):
+        self.cancel()
+        self._worker.cancel()
+        await asyncio.gather(self._worker, return_exceptions=True)
+
+    async def _work(self):
+        while True:
+            turn = await self.pending.get()
+            self.server.record_queue()
+            if turn.token.cancelled:
+                continue
+
+            # Shared limit on answers in flight across all sessions
+            async with self.server.slots:
+                self.current = turn
+                turn.task = asyncio.create_task(self._answer(turn))
+                try:
+                    await asyncio.gather(turn.task, return_exceptions=True)
+                    if turn.task.cancelled():
+                        # Cancelled before it started: nothing ended its output
+                        turn.end_nowait()
+                finally:
+                    self.current = None
+                    self.last_seen = time.monotonic()
+
+    async def _answer(self, turn: Turn):
+        # Own task, so the request id tags only this answer's spans
+        tracing.new_request()
+        request_span = tracing.span("request", chars=len(turn.prompt), session=self.id)
+        failure = None
+        try:
+            stream = self.server.engine.stream_conversation(turn.prompt, self.conversation, turn.token)
+            try:
+                async for chunk in stream:
+                    await turn.output.put(chunk)
+            finally:
+                await stream.aclose()
+        except asyncio.CancelledError:
+            request_span.set(cancelled=True)
+            turn.token.cancel()
+        except Exception as e:
+            print(f"Server session {self.id} error: {e}")
+            request_span.set(error=f"{type(e).__name__}: {e}")
+            failure = e
+        finally:
+            request_span.end()
+            await turn.end(failure)
+
+
+# ================== HTTP ==================
+class Request:
+    def __init__(self, method: str, target: str, headers: Dict[str, str], body: bytes):
+        url = urlsplit(target)
+        self.method = method
+        self.path = url.path.rstrip("/") or "/"
+        self.query = {name: values[-1] for name, values in parse_qs(url.query).items()}
+        self.headers = headers
+        self.body = body
+
+    @property
+    def keep_alive(self) -> bool:
+        return self.headers.get("connection", "").lower() != "close"
+
+    @property
+    def is_json(self) -> bool:
+        return self.headers.get("content-type", "").split(";")[0].strip().lower() == "application/json"
+
+    def json(self) -> Dict[str, Any]:
+        if not self.body:
+            return {}
+        try:
+            payload = json.loads(self.body)
+        except ValueError:
+            raise HTTPError(400, "Body is not valid JSON")
+        if not isinstance(payload, dict):
+            raise HTTPError(400, "Body must be a JSON object")
+        return payload
+
+
+async def read_request(reader: asyncio.StreamReader, prefix: bytes = b"") -> Optional[Request]:
+    """
+    Next request on a keep-alive connection, or None once the client is gone.
+    prefix: bytes of it already read off the socket (see _await_reply)
+    """
+    try:
+        head = prefix + await reader.readuntil(b"\r\n\r\n")
+    except asyncio.IncompleteReadError:
+        return None
+    except asyncio.LimitOverrunError:
+        raise HTTPError(413, "Headers too large")
+
+    lines = head.decode("latin-1").split("\r\n")
+    try:
+        method, target, _ = lines[0].split(" ", 2)
+    except ValueError:
+        raise HTTPError(400, "Malformed request line")
+
+    headers = {}
+    for line in lines[1:]:
+        if ":" in line:
+            name, value = line.split(":", 1)
+            headers[name.strip().lower()] = value.strip()
+
+    try:
+        length = int(headers.get("content-length") or 0)
+    except ValueError:
+        raise HTTPError(400, "Content-Length is not a number")
+    if length < 0:
+        raise HTTPError(400, "Content-Length is negative")
+    if length > MAX_BODY_BYTES:
+        raise HTTPError(413, "Body too large")
+    body = await reader.readexactly(length) if length else b""
+    return Request(method.upper(), target, headers, body)
+
+
+def _head(status: int, headers: Dict[str, str]) -> bytes:
+    lines = [f"HTTP/1.1 {status} {_REASONS.get(status, 'Unknown')}"]
+    lines.extend(f"{name}: {value}" for name, value in headers.items())
+    return ("\r\n".join(lines) + "\r\n\r\n").encode("latin-1")
+
+
+async def send_json(writer: asyncio.StreamWriter, status: int, payload: Any, keep_alive: bool = True, **headers):
+    body = json.dumps(payload).encode()
+    writer.write(_head(status, {
+        "Content-Type": "application/json",
+        "Content-Length": str(len(body)),
+        "Connection": "keep-alive" if keep_alive else "close",
+        **headers
+    }) + body)
+    await writer.drain()
+
+
+# ================== WEBSOCKET ==================
+def _unmask(payload: bytes, mask: bytes) -> bytes:
+    if not payload:
+        return payload
+    key = (mask * (len(payload) // 4 + 1))[:len(payload)]
+    return (int.from_bytes(payload, "big") ^ int.from_bytes(key, "big")).to_bytes(len(payload), "big")
+
+
+class WebSocket:
+    """Server side of RFC 6455 over asyncio streams: text messages, ping/pong, close."""
+
+    def __init__(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self.reader = reader
+        self.writer = writer
+        self.closed = False
+        self._send_lock = asyncio.Lock()
+
+    @staticmethod
+    def accept_key(key: str) -> str:
+        return base64.b64encode(hashlib.sha1(key.encode() + WS_GUID).digest()).decode()
+
+    async def _send_frame(self, opcode: int, payload: bytes = b""):
+        length = len(payload)
+        if length < 126:
+            header = bytes([0x80 | opcode, length])
+        elif length < 1 << 16:
+            header = bytes([0x80 | opcode, 126]) + length.to_bytes(2, "big")
+        else:
+            header = bytes([0x80 | opcode, 127]) + length.to_bytes(8, "big")
+
+        async with self._send_lock:
+            if self.closed and opcode != WS_CLOSE:
+                raise ConnectionResetError("WebSocket closed")
+            self.writer.write(header + payload)
+            await self.writer.drain()
+
+    async def send_json(self, payload: Dict[str, Any]):
+        await self._send_frame(WS_TEXT, json.dumps(payload).encode())
+
+    async def close(self, code: int = 1000):
+        if self.closed:
+            return
+        self.closed = True
+        try:
+            await self._send_frame(WS_CLOSE, code.to_bytes(2, "big"))
+        except (ConnectionError, RuntimeError):
+            pass
+
+    async def receive(self) -> Optional[str]:
+        """Next text message, or None once the connection is closed."""
+        message, message_opcode = b"", None
+        while True:
+            try:
+                first, second = await self.reader.readexactly(2)
+                length = second & 0x7F
+                if length == 126:
+                    length = int.from_bytes(await self.reader.readexactly(2), "big")
+                elif length == 127:
+                    length = int.from_bytes(await self.reader.readexactly(8), "big")
+                if len(message) + length > MAX_WS_MESSAGE_BYTES:
+                    await self.close(1009)
+                    return None
+                mask = await self.reader.readexactly(4) if second & 0x80 else b""
+                payload = await self.reader.readexactly(length)
+            except (asyncio.IncompleteReadError, ConnectionError):
+                self.closed = True
+                return None
+
+            if mask:
+                payload = _unmask(payload, mask)
+            fin, opcode = first & 0x80, first & 0x0F
+
+            if opcode == WS_PING:
+                await self._send_frame(WS_PONG, payload)
+                continue
+            if opcode == WS_PONG:
+                continue
+            if opcode == WS_CLOSE:
+                await self.close()
+                return None
+
+            # Text, binary, or a continuation of either
+            if opcode:
+                message_opcode = opcode
+            message += payload
+            if fin:
+                if message_opcode != WS_TEXT:
+                    await self.close(1003)
+                    return None
+                return message.decode("utf-8", errors="replace")
+
+
+# ================== SERVER ==================
+class JarvisServer:
+    """
+    Serves one AsyncJarvisEngine to many front-ends over HTTP and WebSocket.
+
+    The skill registry, the engine (tool pool, caches) and the pooled LLM
+    and HTTP clients are shared; each client gets a ClientSession with its
+    own history. Backpressure comes in three places: a session refuses
+    new prompts once queue_size are waiting (HTTP 429 / a "busy" message),
+    at most max_active answers run at once across sessions, and a
+    streamed answer waits for a slow reader instead of buffering.
+
+    Every request needs the token, as a Bearer token or as ?token= on the
+    WebSocket URL. It is JARVIS_SERVER_TOKEN, or a random one printed at
+    start-up. Browsers may only connect from the server's own origin or one
+    listed in JARVIS_SERVER_ORIGINS (comma-separated), so a web page cannot
+    drive the tools; POST bodies must be application/json.
+
+    HTTP:
+        GET    /health                  status, sessions, answers in flight
+        GET    /metrics                 metrics bus snapshot
+        POST   /sessions                new session -> {"session_id"}
+        DELETE /sessions/<id>           end a session
+        POST   /sessions/<id>/cancel    stop its answer, drop queued prompts
+        POST   /sessions/<id>/reset     forget its history
+        POST   /chat                    {"message", "session_id"?} -> {"session_id", "reply"}
+        POST   /chat/stream             same, answered as server-sent events
+        GET    /ws?session_id=<id>      WebSocket, see _serve_websocket()
+    """
+
+    def __init__(
+        self,
+        registry: SkillRegistry,
+        host: str = DEFAULT_HOST,
+        port: int = DEFAULT_PORT,
+        engine: AsyncJarvisEngine = None,
+        queue_size: int = None,
+        max_active: int = None,
+        max_sessions: int = None,
+        session_ttl: float = None,
+        token: str = None,
+        origins: List[str] = None
+    ):
+        self.engine = engine or AsyncJarvisEngine(registry)
+        self.host = host
+        self.port = port
+        self.queue_size = queue_size or int(os.environ.get("JARVIS_SERVER_QUEUE", "4"))
+        self.max_active = max_active or int(os.environ.get("JARVIS_SERVER_MAX_ACTIVE", "16"))
+        self.max_sessions = max_sessions or int(os.environ.get("JARVIS_SERVER_MAX_SESSIONS", "64"))
+        self.session_ttl = session_ttl or float(os.environ.get("JARVIS_SERVER_SESSION_TTL", "1800"))
+        self.token = token or os.environ.get("JARVIS_SERVER_TOKEN")
+        # Printed by serve_forever(): a default of "no token" lets anyone in
+        self.generated_token = not self.token
+        if self.generated_token:
+            self.token = secrets.token_urlsafe(24)
+        if origins is None:
+            origins = [o for o in os.environ.get("JARVIS_SERVER_ORIGINS", "").split(",") if o.strip()]
+        self.origins = {o.strip().rstrip("/").lower() for o in origins}
+
+        self.sessions: Dict[str, ClientSession] = {}
+        self.slots: Optional[asyncio.Semaphore] = None
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._reaper: Optional[asyncio.Task] = None
+
+    # ================== SESSIONS ==================
+    def record_queue(self):
+        get_metrics().record(COMMAND_QUEUE, sum(s.pending.qsize() for s in self.sessions.values()))
+
+    def open_session(self, session_id: str = None) -> ClientSession:
+        """The session called session_id, or a new one when no id is given."""
+        if session_id:
+            session = self.sessions.get(session_id)
+            if session is None:
+                raise HTTPError(404, f"No session {session_id}")
+            session.last_seen = time.monotonic()
+            return session
+
+        if len(self.sessions) >= self.max_sessions:
+            self._evict_idle()
+            if len(self.sessions) >= self.max_sessions:
+                raise HTTPError(503, "Too many sessions")
+
+        session = ClientSession(self, secrets.token_hex(8))
+        self.sessions[session.id] = session
+        return session
+
+    async def close_session(self, session_id: str) -> bool:
+        session = self.sessions.pop(session_id, None)
+        if session is None:
+            return False
+        await session.close()
+        return True
+
+    def _evict_idle(self, older_than: float = 0):
+        now = time.monotonic()
+        for session in list(self.sessions.values()):
+            if session.idle and now - session.last_seen >= older_than:
+                del self.sessions[session.id]
+                asyncio.create_task(session.close())
+
+    async def _reap(self):
+        while True:
+            await asyncio.sleep(min(60, self.session_ttl))
+            self._evict_idle(self.session_ttl)
+
+    # ================== LIFECYCLE ==================
+    async def start(self) -> "JarvisServer":
+        self.slots = asyncio.Semaphore(self.max_active)
+        self._server = await asyncio.start_server(self._handle_connection, self.host, self.port)
+        # Port 0 picks a free port
+        self.port = self._server.sockets[0].getsockname()[1]
+        self._reaper = asyncio.create_task(self._reap())
+        return self
+
+    async def serve_forever(self):
+        if self._server is None:
+            await self.start()
+        print(f"Jarvis server listening on http://{self.host}:{self.port}")
+        if self.generated_token:
+            print(f"Token (set JARVIS_SERVER_TOKEN to choose one): {self.token}")
+        await self._server.serve_forever()
+
+    async def aclose(self):
+        if self._reaper is not None:
+            self._reaper.cancel()
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+        sessions, self.sessions = list(self.sessions.values()), {}
+        await asyncio.gather(*(session.close() for session in sessions), return_exceptions=True)
+        await self.engine.aclose()
+
+    # ================== CONNECTIONS ==================
+    def _allowed_origin(self, request: Request) -> bool:
+        # Only browsers send Origin; other clients are covered by the token
+        origin = request.headers.get("origin")
+        if origin is None:
+            return True
+        origin = origin.rstrip("/").lower()
+        own = {f"http://{host}:{self.port}" for host in (self.host, "127.0.0.1", "localhost")}
+        return origin in own or origin in self.origins
+
+    def _authorized(self, request: Request) -> bool:
+        supplied = request.headers.get("authorization", "")
+        if supplied.startswith("Bearer "):
+            supplied = supplied[7:]
+        else:
+            supplied = request.query.get("token", "")
+        return secrets.compare_digest(supplied, self.token)
+
+    async def _handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        pipelined = b""
+        try:
+            while True:
+                try:
+                    request = await read_request(reader, pipelined)
+                    if request is None:
+                        break
+                    if not self._allowed_origin(request):
+                        raise HTTPError(403, "Origin not allowed")
+                    if not self._authorized(request):
+                        raise HTTPError(401, "Missing or wrong token")
+                    if request.method == "POST" and request.body and not request.is_json:
+                        # text/plain and form posts need no CORS preflight
+                        raise HTTPError(415, "Content-Type must be application/json")
+                    if request.headers.get("upgrade", "").lower() == "websocket":
+                        await self._serve_websocket(request, reader, writer)
+                        break
+                    pipelined = await self._dispatch(request, reader, writer)
+                except HTTPError as e:
+                    await send_json(writer, e.status, {"error": str(e)}, keep_alive=False)
+                    break
+                except Busy as e:
+                    await send_json(writer, 429, {"error": str(e)}, **{"Retry-After": "1"})
+                if not request.keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        except Exception as e:
+            print(f"Server connection error: {e}")
+        finally:
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except (ConnectionError, OSError):
+                pass
+
+    async def _dispatch(self, request: Request, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> bytes:
+        """Answer one request. Returns the start of a pipelined next request, if one was read."""
+        method, parts = request.method, request.path.strip("/").split("/")
+        keep_alive = request.keep_alive
+
+        if request.path == "/health" and method == "GET":
+            await send_json(writer, 200, {
+                "status": "ok",
+                "sessions": len(self.sessions),
+                "active": sum(1 for s in self.sessions.values() if s.current is not None),
+                "queued": sum(s.pending.qsize() for s in self.sessions.values())
+            }, keep_alive)
+        elif request.path == "/metrics" and method == "GET":
+            await send_json(writer, 200, get_metrics().snapshot(), keep_alive)
+        elif request.path == "/sessions" and method == "POST":
+            await send_json(writer, 200, {"session_id": self.open_session().id}, keep_alive)
+        elif parts[0] == "sessions" and len(parts) == 2 and method == "DELETE":
+            if not await self.close_session(parts[1]):
+                raise HTTPError(404, f"No session {parts[1]}")
+            await send_json(writer, 200, {"closed": parts[1]}, keep_alive)
+        elif parts[0] == "sessions" and len(parts) == 3 and parts[2] in ("cancel", "reset") and method == "POST":
+            session = self.open_session(parts[1])
+            session.cancel()
+            if parts[2] == "reset":
+                session.conversation.clear()
+            await send_json(writer, 200, {"session_id": session.id}, keep_alive)
+        elif request.path in ("/chat", "/chat/stream") and method == "POST":
+            payload = request.json()
+            message = str(payload.get("message") or "").strip()
+            if not message:
+                raise HTTPError(400, "message is required")
+            session = self.open_session(payload.get("session_id"))
+            turn = session.submit(message)
+            if request.path == "/chat":
+                reply, pipelined = await self._await_reply(turn, reader)
+                if reply is None:
+                    raise ConnectionResetError("Client hung up")
+                await send_json(writer, 200, {"session_id": session.id, "reply": reply}, keep_alive)
+                return pipelined
+            else:
+                await self._stream_answer(session, turn, writer, keep_alive)
+        elif request.path in ("/health", "/metrics", "/sessions", "/chat", "/chat/stream"):
+            raise HTTPError(405, f"{method} not allowed on {request.path}")
+        else:
+            raise HTTPError(404, f"Nothing at {request.path}")
+        return b""
+
+    @staticmethod
+    async def _await_reply(turn: Turn, reader: asyncio.StreamReader) -> Tuple[Optional[str], bytes]:
+        """
+        The whole answer, watching the socket meanwhile: a client that hangs
+        up cancels its turn instead of holding a slot until the answer ends.
+
+        Returns:
+            (reply, or None if the client hung up; bytes of a pipelined next request)
+        """
+        async def join() -> str:
+            return "".join([chunk async for chunk in turn.chunks()])
+
+        reply = asyncio.create_task(join())
+        hangup = asyncio.create_task(reader.read(1))
+        try:
+            await asyncio.wait({reply, hangup}, return_when=asyncio.FIRST_COMPLETED)
+            if not reply.done():
+                try:
+                    pipelined = hangup.result()
+                except ConnectionError:
+                    pipelined = b""
+                if not pipelined:
+                    turn.cancel()
+                    return None, b""
+                # Not a hang-up: the client sent its next request early
+                return await reply, pipelined
+
+            pipelined = b""
+            if hangup.done() and not hangup.cancelled() and hangup.exception() is None:
+                pipelined = hangup.result()
+            return reply.result(), pipelined
+        finally:
+            # Cancelling a pending read leaves unread bytes in the reader
+            for task in (reply, hangup):
+                task.cancel()
+            await asyncio.gather(reply, hangup, return_exceptions=True)
+
+    async def _stream_answer(self, session: ClientSession, turn: Turn, writer: asyncio.StreamWriter, keep_alive: bool):
+        """Server-sent events: {"delta"} per chunk, then {"done", "reply"}."""
+        writer.write(_head(200, {
+            "Content-Type": "text/event-stream",
+            "Cache-Control": "no-cache",
+            "Transfer-Encoding": "chunked",
+            "Connection": "keep-alive" if keep_alive else "close"
+        }))
+
+        def event(payload: Dict[str, Any]) -> bytes:
+            data = f"data: {json.dumps(payload)}\n\n".encode()
+            return f"{len(data):x}\r\n".encode() + data + b"\r\n"
+
+        parts = []
+        try:
+            writer.write(event({"session_id": session.id}))
+            async for chunk in turn.chunks():
+                parts.append(chunk)
+                writer.write(event({"delta": chunk}))
+                # A slow reader holds the answer back here
+                await writer.drain()
+            writer.write(event({"done": True, "reply": "".join(parts)}) + b"0\r\n\r\n")
+            await writer.drain()
+        except (ConnectionError, asyncio.CancelledError):
+            # Client went away: stop generating for it
+            turn.cancel()
+            raise
+        except Exception as e:
+            writer.write(event({"error": str(e)}) + b"0\r\n\r\n")
+            await writer.drain()
+
+    async def _serve_websocket(self, request: Request, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        """
+        Client -> server messages (JSON):
+            {"type": "message", "text": "...", "id": <any>}   ask; id is echoed back
+            {"type": "cancel"}                                stop answering, drop queued
+            {"type": "reset"}                                 forget the history
+        Server -> client:
+            {"type": "session", "session_id"}                 once, on connect
+            {"type": "delta", "id", "text"}                   answer chunks
+            {"type": "done", "id", "reply"}                   answer complete
+            {"type": "error", "id"?, "error"}                 e.g. "busy" when the queue is full
+        Reconnect with ?session_id=<id> to continue a conversation.
+        """
+        key = request.headers.get("sec-websocket-key")
+        if not key:
+            raise HTTPError(400, "Sec-WebSocket-Key is required")
+        session = self.open_session(request.query.get("session_id"))
+
+        writer.write(_head(101, {
+            "Upgrade": "websocket",
+            "Connection": "Upgrade",
+            "Sec-WebSocket-Accept": WebSocket.accept_key(key)
+        }))
+        websocket = WebSocket(reader, writer)
+        await websocket.send_json({"type": "session", "session_id": session.id})
+
+        async def forward(turn: Turn, message_id):
+            parts = []
+            try:
+                async for chunk in turn.chunks():
+                    parts.append(chunk)
+                    await websocket.send_json({"type": "delta", "id": message_id, "text": chunk})
+                await websocket.send_json({"type": "done", "id": message_id, "reply": "".join(parts)})
+            except ConnectionError:
+                turn.cancel()
+            except Exception as e:
+                try:
+                    await websocket.send_json({"type": "error", "id": message_id, "error": str(e)})
+                except ConnectionError:
+                    pass
+
+        forwarders = set()
+        try:
+            while True:
+                text = await websocket.receive()
+                if text is None:
+                    break
+                try:
+                    message = json.loads(text)
+                except ValueError:
+                    await websocket.send_json({"type": "error", "error": "Message is not valid JSON"})
+                    continue
+                if not isinstance(message, dict):
+                    await websocket.send_json({"type": "error", "error": "Message must be a JSON object"})
+                    continue
+
+                kind = message.get("type", "message")
+                if kind == "cancel":
+                    session.cancel()
+                elif kind == "reset":
+                    session.cancel()
+                    session.conversation.clear()
+                elif kind == "message" and str(message.get("text") or "").strip():
+                    try:
+                        turn = session.submit(str(message["text"]).strip())
+                    except Busy:
+                        await websocket.send_json({"type": "error", "id": message.get("id"), "error": "busy"})
+                        continue
+                    task = asyncio.create_task(forward(turn, message.get("id")))
+                    forwarders.add(task)
+                    task.add_done_callback(forwarders.discard)
+                else:
+                    await websocket.send_json({"type": "error", "id": message.get("id"), "error": f"Unknown message {kind}"})
+        finally:
+            # The session outlives the socket; its work for this socket does not
+            session.cancel()
+            for task in list(forwarders):
+                task.cancel()
+            await asyncio.gather(*forwarders, return_exceptions=True)
+            await websocket.close()
+
+
+async def serve(registry: SkillRegistry, host: str = DEFAULT_HOST, port: int = DEFAULT_PORT):
+    """Run a JarvisServer until cancelled."""
+    server = JarvisServer(registry, host, port)
+    try:
+        await server.serve_forever()
+    finally:
+        await server.aclose()
@@ -0,0 +1,328 @@
+import os
+import json
+import threading
+from typing import Any, Dict, List, Optional
+
+from core.file_reader import encoded_length
+
+# Rough characters-per-token ratio when tiktoken is not installed
+CHARS_PER_TOKEN = 4
+# Per-message overhead of the chat format (role, separators)
+MESSAGE_OVERHEAD_TOKENS = 4
+# Any string in a shrunk JSON tool result keeps at least this many characters
+MIN_FIELD_CHARS = 120
+
+_encoder = None
+
+
+def count_tokens(text: str) -> int:
+    """Token count of text: exact with tiktoken, estimated otherwise."""
+    global _encoder
+    if not text:
+        return 0
+
+    if _encoder is None:
+        try:
+            import tiktoken
+            _encoder = tiktoken.get_encoding("cl100k_base")
+        except Exception:
+            _encoder = False
+
+    if _encoder:
+        return len(_encoder.encode(text, disallowed_special=()))
+    return len(text) // CHARS_PER_TOKEN + 1
+
+
+def count_message_tokens(messages: List[Dict[str, Any]]) -> int:
+    return sum(count_tokens(message.get("content") or "") + MESSAGE_OVERHEAD_TOKENS for message in messages)
+
+
+def _cut_middle(text: str, max_chars: int) -> str:
+    """Keep the head and tail of text with a marker in between."""
+    if len(text) <= max_chars:
+        return text
+
+    omitted = len(text) - max_chars
+    marker = f" [... {omitted} characters omitted ...] "
+    keep = max(0, max_chars - len(marker))
+    head = keep * 2 // 3
+    return text[:head] + marker + text[len(text) - (keep - head):]
+
+
+def _string_fields(value: Any, path: tuple = ()) -> List[tuple]:
+    if isinstance(value, str):
+        return [(path, value)]
+    if isinstance(value, dict):
+        return [field for key in value for field in _string_fields(value[key], path + (key,))]
+    if isinstance(value, list):
+        return [field for index, item in enumerate(value) for field in _string_fields(item, path + (index,))]
+    return []
+
+
+def _set_path(value: Any, path: tuple, new: str):
+    for key in path[:-1]:
+        value = value[key]
+    value[path[-1]] = new
+
+
+def _is_window(data: Any) -> bool:
+    """A paginated file read (core.file_reader.read_window via a skill)."""
+    return (
+        isinstance(data, dict)
+        and isinstance(data.get("content"), str)
+        and data.get("mode") in ("head", "tail", "grep")
+        and "next_offset" in data
+        and isinstance(data.get("range"), list)
+        and "encoding" in data
+        and (data["mode"] != "grep" or isinstance(data.get("line_offsets"), list))
+    )
+
+
+def _cut_window(data: Dict[str, Any], keep: int) -> Dict[str, Any]:
+    """
+    data with only `keep` characters of content, cut at the end it reads
+    towards, and the cursor moved to the first byte that was dropped.
+    """
+    content, mode = data["content"], data["mode"]
+    if keep >= len(content):
+        return data
+    start, end = data["range"]
+    cut = dict(data, truncated=True, has_more=True)
+
+    if mode == "grep":
+        lines = content.split("\n")
+        kept = 0
+        while kept < len(lines) and len("\n".join(lines[:kept + 1])) <= keep:
+            kept += 1
+        offsets = data["line_offsets"]
+        cut["content"] = "\n".join(lines[:kept])
+        cut["line_offsets"] = offsets[:kept]
+        cut["next_offset"] = offsets[kept]
+        cut["range"] = [start, offsets[kept]]
+    elif mode == "tail":
+        # Read backwards: keep the end, continue before it
+        kept = content[len(content) - keep:] if keep else ""
+        newline = kept.find("\n")
+        if 0 <= newline < len(kept) - 1:
+            kept = kept[newline + 1:]
+        cut["content"] = kept
+        cut["next_offset"] = end - encoded_length(kept, data["encoding"])
+        cut["range"] = [cut["next_offset"], end]
+    else:
+        kept = content[:keep]
+        newline = kept.rfind("\n")
+        if newline > 0:
+            kept = kept[:newline + 1]
+        cut["content"] = kept
+        cut["next_offset"] = start + encoded_length(kept, data["encoding"], at_file_start=start == 0)
+        cut["range"] = [start, cut["next_offset"]]
+
+    if "length" in cut:
+        cut["length"] = len(cut["content"])
+    return cut
+
+
+def _truncate_window(data: Dict[str, Any], max_chars: int) -> Optional[str]:
+    """Shrink a file window to max_chars without skipping unread bytes."""
+    low, high = 0, len(data["content"])
+    best = None
+    # Escaping makes the JSON size non-linear in the content: search for the fit
+    while low <= high:
+        keep = (low + high) // 2
+        shrunk = json.dumps(_cut_window(data, keep))
+        if len(shrunk) <= max_chars:
+            best, low = shrunk, keep + 1
+        else:
+            high = keep - 1
+    return best
+
+
+def truncate_tool_output(text: str, max_chars: int) -> str:
+    """
+    Bound a tool result to max_chars. Same input, same output.
+
+    JSON results stay valid JSON: the longest string fields (file content,
+    email bodies, ...) are cut in the middle first, so small fields such as
+    status, next_offset or error messages survive. Anything else is cut in
+    the middle as plain text.
+
+    Paginated file reads are the exception: their content is cut at the end
+    and next_offset rewritten to the first byte left out, so following the
+    cursor never skips text the model did not see.
+    """
+    if len(text) <= max_chars:
+        return text
+
+    try:
+        data = json.loads(text)
+    except ValueError:
+        data = None
+
+    if _is_window(data):
+        shrunk = _truncate_window(data, max_chars)
+        if shrunk is not None:
+            return shrunk
+
+    if isinstance(data, (dict, list)):
+        fields = sorted(_string_fields(data), key=lambda field: (-len(field[1]), str(field[0])))
+        overflow = len(text) - max_chars
+
+        for path, value in fields:
+            if overflow <= 0:
+                break
+            # The marker itself costs about 40 characters
+            target = max(MIN_FIELD_CHARS, len(value) - overflow - 40)
+            if target >= len(value):
+                continue
+            shortened = _cut_middle(value, target)
+            overflow -= len(value) - len(shortened)
+            _set_path(data, path, shortened)
+
+        shrunk = json.dumps(data)
+        if len(shrunk) <= max_chars:
+            return shrunk
+
+    return _cut_middle(text, max_chars)
+
+
+class ConversationSession:
+    """
+    History of one conversation, bounded by a token budget.
+
+    Recent turns are replayed verbatim. When they exceed budget_tokens the
+    oldest turns are evicted and folded into a running summary by a
+    background thread, so the request that triggered the eviction never
+    waits on the summarization call. Prompt size is bounded by
+    system + summary_tokens + budget_tokens + the current prompt.
+    """
+
+    def __init__(
+        self,
+        client=None,
+        model: str = "llama-3.3-70b-versatile",
+        budget_tokens: int = None,
+        summary_tokens: int = 200,
+        tool_output_chars: int = None
+    ):
+        self.client = client
+        self.model = model
+        self.budget_tokens = budget_tokens or int(os.environ.get("JARVIS_HISTORY_TOKENS", "1200"))
+        self.summary_tokens = summary_tokens
+        self.tool_output_chars = tool_output_chars or int(os.environ.get("JARVIS_TOOL_OUTPUT_CHARS", "4000"))
+
+        self.summary = ""
+        self.turns: List[Dict[str, Any]] = []
+        self._evicted: List[Dict[str, Any]] = []
+        # Bumped by clear() so an in-flight compaction result is discarded
+        self._generation = 0
+
+        self._lock = threading.Lock()
+        self._compactor: Optional[threading.Thread] = None
+
+    # ================== READ ==================
+    @property
+    def has_history(self) -> bool:
+        with self._lock:
+            return bool(self.turns or self.summary or self._evicted)
+
+    def recent_text(self, turns: int = 1) -> str:
+        """The last user prompts, e.g. to widen tool selection on follow-ups."""
+        with self._lock:
+            return " ".join(turn["user"] for turn in self.turns[-turns:])
+
+    def build_messages(self, system_instruction: str, user_prompt: str) -> List[Dict[str, Any]]:
+        with self._lock:
+            messages = [{"role": "system", "content": system_instruction}]
+            if self.summary:
+                messages.append({
+                    "role": "system",
+                    "content": f"Summary of the earlier conversation: {self.summary}"
+                })
+            for turn in self.turns:
+                messages.append({"role": "user", "content": turn["user"]})
+                messages.append({"role": "assistant", "content": turn["assistant"]})
+
+        messages.append({"role": "user", "content": user_prompt})
+        return messages
+
+    # ================== WRITE ==================
+    def add_turn(self, user_prompt: str, reply: str):
+        """Record a finished turn and compact the history if it is over budget."""
+        # A single turn may never take more than half the budget
+        max_chars = self.budget_tokens * CHARS_PER_TOKEN // 2
+        turn = {"user": _cut_middle(user_prompt, max_chars // 2), "assistant": _cut_middle(reply or "", max_chars // 2)}
+        turn["tokens"] = count_tokens(turn["user"]) + count_tokens(turn["assistant"]) + 2 * MESSAGE_OVERHEAD_TOKENS
+
+        with self._lock:
+            self.turns.append(turn)
+            total = sum(t["tokens"] for t in self.turns)
+            while total > self.budget_tokens and len(self.turns) > 1:
+                evicted = self.turns.pop(0)
+                total -= evicted["tokens"]
+                self._evicted.append(evicted)
+
+            if self._evicted and self._compactor is None:
+                self._compactor = threading.Thread(target=self._compact, name="jarvis-compact", daemon=True)
+                self._compactor.start()
+
+    def clear(self):
+        with self._lock:
+            self.summary = ""
+            self.turns = []
+            self._evicted = []
+            self._generation += 1
+
+    def wait(self, timeout: float = None):
+        """Block until background compaction finished (tests, shutdown)."""
+        compactor = self._compactor
+        if compactor:
+            compactor.join(timeout)
+
+    # ================== COMPACTION ==================
+    def _compact(self):
+        while True:
+            with self._lock:
+                if not self._evicted:
+                    self._compactor = None
+                    return
+                evicted, self._evicted = self._evicted, []
+                summary = self.summary
+                generation = self._generation
+
+            transcript = "\n".join(f"User: {turn['user']}\nJarvis: {turn['assistant']}" for turn in evicted)
+            new_summary = self._summarize(summary, transcript)
+
+            with self._lock:
+                if self._generation == generation:
+                    self.summary = new_summary
+
+    def _summarize(self, summary: str, transcript: str) -> str:
+        max_chars = self.summary_tokens * CHARS_PER_TOKEN
+
+        if self.client is not None:
+            try:
+                response = self.client.chat.completions.create(
+                    model=self.model,
+                    messages=[
+                        {
+                            "role": "system",
+                            "content": (
+                                "You maintain the running summary of a conversation between a user and "
+                                "the assistant Jarvis. Merge the new exchanges into the summary. Keep names, "
+                                "places, numbers, preferences and open requests. Reply with the summary only, "
+                                "at most 4 sentences."
+                            )
+                        },
+                        {"role": "user", "content": f"Summary so far: {summary or '(empty)'}\n\nNew exchanges:\n{transcript}"}
+                    ],
+                    max_tokens=self.summary_tokens
+                )
+                content = response.choices[0].message.content
+                if content:
+                    return _cut_middle(content.strip(), max_chars)
+            except Exception as e:
+                print(f"History compaction error: {e}")
+
+        # Offline fallback: keep the most recent part of the raw transcript
+        combined = f"{summary}\n{transcript}".strip()
+        return combined[-max_chars:]
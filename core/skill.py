@@ -1,8 +1,16 @@
 from abc import ABC, abstractmethod
-from typing import List, Dict, Any, Callable
+from typing import List, Dict, Any, Callable, Optional
 
 class Skill(ABC):
     """Base class for all Skills."""
+
+    # Set to False if the skill's functions must never run concurrently
+    # (e.g. they read-modify-write a shared file).
+    thread_safe: bool = True
+
+    # Seconds a single tool call may take before the engine gives up on it.
+    # None uses the executor default.
+    tool_timeout: Optional[float] = None
     
     @abstractmethod
     def get_tools(self) -> List[Dict[str, Any]]:
@@ -18,4 +26,15 @@ class Skill(ABC):
     @abstractmethod
     def name(self) -> str:
         """The name of the skill."""
-        pass
\ No newline at end of file
+        pass
+
+    def get_intents(self) -> List[Dict[str, Any]]:
+        """
+        Optional local fast-path rules for core.intent.IntentRouter.
+
+        Each intent is a dict with a regex "pattern" (named groups become
+        arguments), the "function" to call, a reply "template" formatted with
+        the arguments and the function's JSON result, and an optional
+        "confidence" (default 1.0).
+        """
+        return []
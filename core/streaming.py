@@ -0,0 +1,92 @@
+import re
+from typing import AsyncIterable, AsyncIterator, Iterable, Iterator, List, Optional
+
+
+# Words that end with a period but rarely end a sentence.
+ABBREVIATIONS = {
+    "mr", "mrs", "ms", "dr", "prof", "sr", "jr", "st", "vs",
+    "etc", "e.g", "i.e", "approx", "fig"
+}
+
+# Abbreviations only before a number ("No. 5"); otherwise "no." ends a sentence.
+NUMBER_ABBREVIATIONS = {"no"}
+
+# Sentence terminator followed by whitespace (closing quotes/brackets allowed).
+_BOUNDARY = re.compile(r"[.!?]+[\"')\]]*\s+|\n+")
+
+
+class SentenceSegmenter:
+    """Accumulates streamed text and emits complete sentences."""
+
+    def __init__(self, min_length: int = 2):
+        self.buffer = ""
+        self.min_length = min_length
+
+    def feed(self, text: str) -> List[str]:
+        """
+        Add a chunk of streamed text.
+
+        Args:
+            text: Token or text fragment from the model
+
+        Returns:
+            List of sentences completed by this chunk
+        """
+        self.buffer += text
+        sentences = []
+        start = 0
+
+        for match in _BOUNDARY.finditer(self.buffer):
+            candidate = self.buffer[start:match.end()].strip()
+
+            following = self.buffer[match.end():]
+            if self._is_abbreviation(candidate, following) or len(candidate) < self.min_length:
+                continue
+
+            sentences.append(candidate)
+            start = match.end()
+
+        self.buffer = self.buffer[start:]
+        return sentences
+
+    def flush(self) -> Optional[str]:
+        """Return whatever is left in the buffer as a final sentence."""
+        remainder = self.buffer.strip()
+        self.buffer = ""
+        return remainder or None
+
+    @staticmethod
+    def _is_abbreviation(candidate: str, following: str = "") -> bool:
+        if not candidate.endswith("."):
+            return False
+        last_word = (candidate.rstrip(".").split()[-1:] or [""])[0].lower()
+        if last_word in NUMBER_ABBREVIATIONS:
+            # Until the next token arrives we cannot tell, so wait for it
+            return not following or following[0].isdigit()
+        return last_word in ABBREVIATIONS
+
+
+def iter_sentences(chunks: Iterable[str]) -> Iterator[str]:
+    """Group a stream of text chunks into sentences as soon as they complete."""
+    segmenter = SentenceSegmenter()
+
+    for chunk in chunks:
+        for sentence in segmenter.feed(chunk):
+            yield sentence
+
+    remainder = segmenter.flush()
+    if remainder:
+        yield remainder
+
+
+async def aiter_sentences(chunks: AsyncIterable[str]) -> AsyncIterator[str]:
+    """Async counterpart of iter_sentences for AsyncJarvisEngine streams."""
+    segmenter = SentenceSegmenter()
+
+    async for chunk in chunks:
+        for sentence in segmenter.feed(chunk):
+            yield sentence
+
+    remainder = segmenter.flush()
+    if remainder:
+        yield remainder
@@ -0,0 +1,244 @@
+import re
+import zlib
+import hashlib
+import itertools
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterator, List
+
+from core.cache import get_cache
+from core.cancel import CancelToken, Cancelled
+
+# Rough characters-per-token ratio used for budgeting
+CHARS_PER_TOKEN = 4
+
+_SENTENCE_END = re.compile(r"(?<=[.!?])\s+")
+_PARAGRAPH_BREAK = re.compile(r"\n\s*\n")
+
+
+def _split_oversized(text: str, max_chars: int) -> List[str]:
+    """Split one huge paragraph at sentence ends, then hard-cut if needed."""
+    pieces, current = [], ""
+    for sentence in _SENTENCE_END.split(text):
+        while len(sentence) > max_chars:
+            pieces.append(sentence[:max_chars])
+            sentence = sentence[max_chars:]
+        if current and len(current) + len(sentence) + 1 > max_chars:
+            pieces.append(current)
+            current = sentence
+        else:
+            current = f"{current} {sentence}" if current else sentence
+    if current:
+        pieces.append(current)
+    return pieces
+
+
+def _cut_point(text: str, max_chars: int) -> int:
+    """Where to cut a run of text with no paragraph break: last line or sentence end, else max_chars."""
+    cut = text.rfind("\n", 0, max_chars)
+    if cut > 0:
+        return cut
+    ends = [m.end() for m in _SENTENCE_END.finditer(text, 0, max_chars)]
+    return ends[-1] if ends else max_chars
+
+
+def iter_paragraphs(
+    path: str,
+    encoding: str = "utf-8",
+    read_size: int = 64 * 1024,
+    max_chars: int = None
+) -> Iterator[str]:
+    """
+    Yield paragraphs of a text file, reading it in fixed-size blocks.
+
+    Only the new block and the unfinished paragraph carried over from the
+    previous one are split. Once the carried text is longer than max_chars
+    (a log or CSV with no blank lines) it is cut at a line or sentence end,
+    so memory stays bounded by read_size + max_chars.
+    """
+    max_chars = max_chars or read_size
+    tail = ""
+    with open(path, "r", encoding=encoding) as f:
+        while True:
+            block = f.read(read_size)
+            if not block:
+                break
+            parts = _PARAGRAPH_BREAK.split(tail + block)
+            # The last part may continue in the next block
+            tail = parts.pop()
+            for part in parts:
+                if part.strip():
+                    yield part.strip()
+
+            while len(tail) > max_chars:
+                cut = _cut_point(tail, max_chars)
+                if tail[:cut].strip():
+                    yield tail[:cut].strip()
+                tail = tail[cut:]
+
+    if tail.strip():
+        yield tail.strip()
+
+
+def iter_chunks(path: str, chunk_tokens: int = 1500, encoding: str = "utf-8") -> Iterator[str]:
+    """
+    Group paragraphs into chunks of at most chunk_tokens.
+
+    Chunk ends are content-defined: once a chunk is a quarter full it ends
+    after any paragraph whose hash hits a fixed pattern. An edit therefore
+    only changes the chunks around it, and later chunks (and their cached
+    summaries) stay identical.
+    """
+    max_chars = chunk_tokens * CHARS_PER_TOKEN
+    min_chars = max_chars // 4
+    current: List[str] = []
+    size = 0
+
+    for paragraph in iter_paragraphs(path, encoding, max_chars=max_chars):
+        pieces = [paragraph] if len(paragraph) <= max_chars else _split_oversized(paragraph, max_chars)
+
+        for piece in pieces:
+            if current and size + len(piece) + 2 > max_chars:
+                yield "\n\n".join(current)
+                current, size = [], 0
+
+            current.append(piece)
+            size += len(piece) + 2
+
+            if size >= min_chars and zlib.crc32(piece.encode("utf-8")) % 4 == 0:
+                yield "\n\n".join(current)
+                current, size = [], 0
+
+    if current:
+        yield "\n\n".join(current)
+
+
+class MapReduceSummarizer:
+    """
+    Summarize arbitrarily large files: chunk summaries run concurrently on a
+    bounded pool (map), then partial summaries are merged level by level
+    (reduce). Every LLM call is cached by the SHA-256 of its input.
+    """
+
+    def __init__(self, client, model: str = "llama-3.3-70b-versatile", chunk_tokens: int = 1500, max_workers: int = 4):
+        self.client = client
+        self.model = model
+        self.chunk_tokens = chunk_tokens
+        self.max_workers = max_workers
+        self.cache = get_cache("chunk_summaries", maxsize=4096, ttl=7 * 24 * 3600, persistent=True)
+
+    def _complete(self, instruction: str, text: str, max_tokens: int) -> str:
+        key = hashlib.sha256(f"{self.model}\0{instruction}\0{text}".encode("utf-8")).hexdigest()
+        found, summary = self.cache.get(key)
+        if found:
+            return summary
+
+        response = self.client.chat.completions.create(
+            model=self.model,
+            messages=[
+                {"role": "system", "content": instruction},
+                {"role": "user", "content": text}
+            ],
+            max_tokens=max_tokens
+        )
+        summary = response.choices[0].message.content
+        self.cache.set(key, summary)
+        return summary
+
+    def _summarize_whole(self, text: str) -> str:
+        return self._complete(
+            "You are a helpful assistant that summarizes text concisely. Provide a clear, brief summary in 2-3 sentences.",
+            f"Please summarize the following text:\n\n{text}",
+            max_tokens=150
+        )
+
+    def _summarize_chunk(self, chunk: str) -> str:
+        return self._complete(
+            "You summarize one part of a longer document. Keep the key facts, names and numbers in 3-5 sentences.",
+            chunk,
+            max_tokens=200
+        )
+
+    def _combine(self, partials: List[str], final: bool) -> str:
+        instruction = (
+            "You are a helpful assistant that summarizes text concisely. "
+            "Combine these partial summaries of one document into a clear, brief summary in 2-3 sentences."
+            if final else
+            "Combine these partial summaries of consecutive parts of a document into one summary of 3-5 sentences."
+        )
+        return self._complete(instruction, "\n\n".join(partials), max_tokens=150 if final else 200)
+
+    def summarize(self, path: str, encoding: str = "utf-8", cancel_token: CancelToken = None) -> dict:
+        """
+        Returns:
+            Dict with the summary and how many chunks were read
+
+        Raises:
+            Cancelled: if cancel_token fires; queued chunk calls are dropped
+        """
+        chunks = iter_chunks(path, self.chunk_tokens, encoding)
+        head = list(itertools.islice(chunks, 2))
+
+        if not head:
+            return {"summary": "", "chunks": 0}
+        if len(head) == 1:
+            # Small file: one call, no reduce step
+            return {"summary": self._summarize_whole(head[0]), "chunks": 1}
+
+        # Map: only max_workers * 2 chunks are held in memory at once
+        slots = threading.BoundedSemaphore(self.max_workers * 2)
+        futures = []
+
+        def run(chunk: str) -> str:
+            try:
+                if cancel_token:
+                    cancel_token.raise_if_cancelled()
+                return self._summarize_chunk(chunk)
+            finally:
+                slots.release()
+
+        # First chunk error: the summary is lost, so stop paying for the rest
+        failures: List[BaseException] = []
+
+        def record_failure(future):
+            if not future.cancelled() and future.exception() is not None:
+                failures.append(future.exception())
+
+        with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="jarvis-summary") as pool:
+            try:
+                for chunk in itertools.chain(head, chunks):
+                    slots.acquire()
+                    if cancel_token:
+                        cancel_token.raise_if_cancelled()
+                    if failures:
+                        raise failures[0]
+                    futures.append(pool.submit(run, chunk))
+                    futures[-1].add_done_callback(record_failure)
+
+                partials = [future.result() for future in futures]
+            except BaseException:
+                for future in futures:
+                    future.cancel()
+                raise
+
+            # Reduce: merge groups that fit one prompt until one summary is left
+            budget = self.chunk_tokens * CHARS_PER_TOKEN
+            while len(partials) > 1:
+                if cancel_token:
+                    cancel_token.raise_if_cancelled()
+                groups: List[List[str]] = [[]]
+                size = 0
+                for partial in partials:
+                    # At least two per group so every level shrinks
+                    if len(groups[-1]) >= 2 and size + len(partial) > budget:
+                        groups.append([])
+                        size = 0
+                    groups[-1].append(partial)
+                    size += len(partial)
+
+                final = len(groups) == 1
+                partials = list(pool.map(lambda group: self._combine(group, final), groups))
+                if final:
+                    break
+
+        return {"summary": partials[0], "chunks": len(futures)}
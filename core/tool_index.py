@@ -0,0 +1,107 @@
+import re
+import math
+from collections import Counter
+from typing import Any, Dict, Iterable, List, Tuple
+
+
+STOPWORDS = {
+    "a", "an", "the", "to", "of", "for", "in", "on", "at", "and", "or", "is",
+    "it", "be", "me", "my", "i", "you", "your", "this", "that", "with", "from",
+    "get", "what", "whats", "please", "can", "could", "jarvis", "optional",
+    "return", "returns", "e", "g", "if", "not", "provided", "uses",
+    "tell", "about", "some", "any", "default", "do", "does", "did", "how"
+}
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase words, snake_case split, with light plural stripping."""
+    words = re.findall(r"[a-z0-9]+", text.lower().replace("_", " "))
+    tokens = []
+    for word in words:
+        if word in STOPWORDS or word.isdigit():
+            continue
+        if len(word) > 3 and word.endswith("s") and not word.endswith("ss"):
+            word = word[:-1]
+        tokens.append(word)
+    return tokens
+
+
+def tool_text(tool: Dict[str, Any]) -> str:
+    """Searchable text of a tool schema: name (twice), description and parameters."""
+    function = tool.get("function", {})
+    name = function.get("name", "")
+    parts = [name, name, function.get("description", "")]
+
+    for param_name, param in function.get("parameters", {}).get("properties", {}).items():
+        parts.append(param_name)
+        parts.append(param.get("description", ""))
+
+    return " ".join(parts)
+
+
+class ToolIndex:
+    """TF-IDF index over tool names and descriptions for per-query tool selection."""
+
+    def __init__(self):
+        self.documents: Dict[str, Counter] = {}
+        self._vectors: Dict[str, Dict[str, float]] = {}
+        self._idf: Dict[str, float] = {}
+        self._dirty = False
+
+    def add(self, name: str, text: str):
+        """Add (or extend) the searchable text of a tool."""
+        self.documents.setdefault(name, Counter()).update(tokenize(text))
+        self._dirty = True
+
+    def _build(self):
+        doc_count = len(self.documents)
+        document_frequency = Counter()
+        for terms in self.documents.values():
+            document_frequency.update(terms.keys())
+
+        self._idf = {
+            term: math.log((1 + doc_count) / (1 + df)) + 1
+            for term, df in document_frequency.items()
+        }
+
+        self._vectors = {}
+        for name, terms in self.documents.items():
+            vector = {term: (1 + math.log(count)) * self._idf[term] for term, count in terms.items()}
+            norm = math.sqrt(sum(v * v for v in vector.values())) or 1.0
+            self._vectors[name] = {term: v / norm for term, v in vector.items()}
+
+        self._dirty = False
+
+    def search(self, query: str, top_k: int) -> List[Tuple[str, float]]:
+        """
+        Rank tools by cosine similarity to the query.
+
+        Returns:
+            Up to top_k (tool name, score) pairs with a positive score
+        """
+        if self._dirty:
+            self._build()
+
+        terms = Counter(term for term in tokenize(query) if term in self._idf)
+        if not terms:
+            return []
+
+        query_vector = {term: (1 + math.log(count)) * self._idf[term] for term, count in terms.items()}
+        norm = math.sqrt(sum(v * v for v in query_vector.values())) or 1.0
+
+        scores = []
+        for name, vector in self._vectors.items():
+            score = sum(weight * vector.get(term, 0.0) for term, weight in query_vector.items()) / norm
+            if score > 0:
+                scores.append((name, score))
+
+        scores.sort(key=lambda item: item[1], reverse=True)
+        return scores[:top_k]
+
+
+def intent_words(patterns: Iterable[str]) -> str:
+    """Literal words of intent regexes, used as extra keywords for their tools."""
+    return " ".join(
+        " ".join(re.findall(r"[a-z]{3,}", re.sub(r"\(\?P<\w+>", "", pattern)))
+        for pattern in patterns
+    )
@@ -0,0 +1,314 @@
+import os
+import json
+import time
+import functools
+import itertools
+import threading
+import contextvars
+from collections import deque
+from typing import Any, Callable, Deque, Dict, List, Optional
+
+# Set JARVIS_TRACE=1 to record spans; JARVIS_TRACE_FILE exports them on exit
+TRACE_ENV = "JARVIS_TRACE"
+TRACE_FILE_ENV = "JARVIS_TRACE_FILE"
+
+_enabled = os.environ.get(TRACE_ENV, "0") == "1"
+_buffer: Deque["Span"] = deque(maxlen=int(os.environ.get("JARVIS_TRACE_BUFFER", "4096")))
+_span_ids = itertools.count(1)
+_request_ids = itertools.count(1)
+# Follows asyncio tasks and asyncio.to_thread; the tool pool copies it explicitly
+_request_id: contextvars.ContextVar[Optional[int]] = contextvars.ContextVar("jarvis_request_id", default=None)
+
+# perf_counter_ns() + offset = wall clock, for exports
+_EPOCH_OFFSET_NS = time.time_ns() - time.perf_counter_ns()
+
+
+class Span:
+    """
+    One timed stage. Ends when its `with` block exits or end() is called,
+    which may happen on another thread (e.g. speech finishes on the
+    playback thread). Finished spans go into the ring buffer.
+    """
+
+    __slots__ = ("span_id", "name", "attrs", "request_id", "thread_id", "thread_name", "start_ns", "end_ns")
+
+    recording = True
+
+    def __init__(self, name: str, attrs: Dict[str, Any]):
+        thread = threading.current_thread()
+        self.span_id = next(_span_ids)
+        self.name = name
+        self.attrs = attrs
+        self.request_id = _request_id.get()
+        self.thread_id = thread.ident
+        self.thread_name = thread.name
+        self.end_ns: Optional[int] = None
+        self.start_ns = time.perf_counter_ns()
+
+    def set(self, **attrs):
+        self.attrs.update(attrs)
+
+    def end(self, error: BaseException = None, **attrs):
+        if self.end_ns is not None:
+            return
+        self.end_ns = time.perf_counter_ns()
+        if attrs:
+            self.attrs.update(attrs)
+        if error is not None:
+            self.attrs["error"] = f"{type(error).__name__}: {error}"
+        _buffer.append(self)
+
+    @property
+    def duration_ms(self) -> Optional[float]:
+        return None if self.end_ns is None else (self.end_ns - self.start_ns) / 1e6
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "span_id": self.span_id,
+            "name": self.name,
+            "request_id": self.request_id,
+            "thread": self.thread_name,
+            "start": (self.start_ns + _EPOCH_OFFSET_NS) / 1e9,
+            "duration_ms": self.duration_ms,
+            "attrs": self.attrs
+        }
+
+    def __enter__(self) -> "Span":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> bool:
+        self.end(error=exc)
+        return False
+
+
+class _NoopSpan:
+    """What span() returns while tracing is off: every call does nothing."""
+
+    recording = False
+    duration_ms = None
+
+    def set(self, **attrs):
+        pass
+
+    def end(self, error: BaseException = None, **attrs):
+        pass
+
+    def __enter__(self) -> "_NoopSpan":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> bool:
+        return False
+
+
+_NOOP = _NoopSpan()
+
+
+# ================== RECORDING ==================
+def enabled() -> bool:
+    return _enabled
+
+
+def enable(buffer_size: int = None):
+    global _enabled, _buffer
+    if buffer_size and buffer_size != _buffer.maxlen:
+        _buffer = deque(_buffer, maxlen=buffer_size)
+    _enabled = True
+
+
+def disable():
+    global _enabled
+    _enabled = False
+
+
+def span(name: str, **attrs):
+    """
+    Start a span. Use it as a context manager, or keep it and call end()
+    when the stage spans several calls (a streamed response, queued speech).
+    Check `recording` before computing expensive attributes.
+    """
+    if not _enabled:
+        return _NOOP
+    return Span(name, attrs)
+
+
+def traced(name: str = None, sample_every: int = 1):
+    """
+    Decorator: record a span around every call of the function, or around
+    one call in sample_every for per-frame code that would otherwise push
+    everything else out of the buffer.
+    """
+    def decorator(function: Callable) -> Callable:
+        span_name = name or function.__qualname__
+        calls = itertools.count()
+
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            if not _enabled or next(calls) % sample_every:
+                return function(*args, **kwargs)
+            with Span(span_name, {"sample_every": sample_every} if sample_every > 1 else {}):
+                return function(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def new_request() -> int:
+    """Tag spans started from the current task/thread context with a fresh request id."""
+    request_id = next(_request_ids)
+    _request_id.set(request_id)
+    return request_id
+
+
+def spans() -> List[Span]:
+    """Finished spans, oldest first."""
+    return list(_buffer)
+
+
+def clear():
+    _buffer.clear()
+
+
+# ================== LLM CALLS ==================
+def record_usage(llm_span, usage):
+    """Copy token counts from an API usage object onto an LLM span."""
+    if usage is None or not llm_span.recording:
+        return
+    llm_span.set(
+        prompt_tokens=getattr(usage, "prompt_tokens", None),
+        completion_tokens=getattr(usage, "completion_tokens", None),
+        tokens_estimated=False
+    )
+
+
+def _chunk_usage(chunk):
+    # Groq reports usage on the last chunk under x_groq; OpenAI on the chunk
+    x_groq = getattr(chunk, "x_groq", None)
+    return getattr(x_groq, "usage", None) or getattr(chunk, "usage", None)
+
+
+def _finish_llm_span(llm_span, parts: List[str], usage, error: BaseException = None):
+    if usage is not None:
+        record_usage(llm_span, usage)
+    else:
+        from core.session import count_tokens
+        llm_span.set(completion_tokens=count_tokens("".join(parts)), tokens_estimated=True)
+    llm_span.end(error=error)
+
+
+def traced_stream(stream, llm_span):
+    """
+    Pass an LLM chunk stream through, ending llm_span when it is exhausted,
+    closed or fails, with time to first output and token counts (from the
+    API's usage report, else estimated). Returns stream itself when the
+    span is not recording.
+    """
+    if not llm_span.recording:
+        return stream
+    return _traced_stream(stream, llm_span)
+
+
+def _traced_stream(stream, llm_span):
+    parts: List[str] = []
+    usage, error = None, None
+    started_ns = llm_span.start_ns
+    try:
+        for chunk in stream:
+            usage = _chunk_usage(chunk) or usage
+            _observe_chunk(llm_span, chunk, parts, started_ns)
+            yield chunk
+    except GeneratorExit:
+        llm_span.set(closed_early=True)
+        raise
+    except Exception as e:
+        error = e
+        raise
+    finally:
+        _finish_llm_span(llm_span, parts, usage, error)
+
+
+def atraced_stream(stream, llm_span):
+    """traced_stream() for async chunk streams."""
+    if not llm_span.recording:
+        return stream
+    return _atraced_stream(stream, llm_span)
+
+
+async def _atraced_stream(stream, llm_span):
+    parts: List[str] = []
+    usage, error = None, None
+    started_ns = llm_span.start_ns
+    try:
+        async for chunk in stream:
+            usage = _chunk_usage(chunk) or usage
+            _observe_chunk(llm_span, chunk, parts, started_ns)
+            yield chunk
+    except GeneratorExit:
+        llm_span.set(closed_early=True)
+        raise
+    except Exception as e:
+        error = e
+        raise
+    finally:
+        _finish_llm_span(llm_span, parts, usage, error)
+
+
+def _observe_chunk(llm_span, chunk, parts: List[str], started_ns: int):
+    if not chunk.choices:
+        return
+    delta = chunk.choices[0].delta
+    if (delta.content or delta.tool_calls) and "first_token_ms" not in llm_span.attrs:
+        llm_span.set(first_token_ms=(time.perf_counter_ns() - started_ns) / 1e6)
+    if delta.content:
+        parts.append(delta.content)
+    if delta.tool_calls:
+        llm_span.set(tool_calls=True)
+
+
+# ================== EXPORT ==================
+def export_jsonl(path: str) -> int:
+    """One JSON object per span. Returns the number of spans written."""
+    finished = spans()
+    with open(path, "w", encoding="utf-8") as f:
+        for s in finished:
+            f.write(json.dumps(s.to_dict(), default=str) + "\n")
+    return len(finished)
+
+
+def export_chrome(path: str) -> int:
+    """Chrome trace event format (chrome://tracing, ui.perfetto.dev)."""
+    finished = spans()
+    pid = os.getpid()
+    events = []
+    threads = {}
+
+    for s in finished:
+        threads[s.thread_id] = s.thread_name
+        args = dict(s.attrs)
+        if s.request_id is not None:
+            args["request_id"] = s.request_id
+        events.append({
+            "name": s.name,
+            "cat": s.name.split(".")[0],
+            "ph": "X",
+            "ts": (s.start_ns + _EPOCH_OFFSET_NS) / 1000,
+            "dur": (s.end_ns - s.start_ns) / 1000,
+            "pid": pid,
+            "tid": s.thread_id,
+            "args": args
+        })
+
+    for thread_id, thread_name in threads.items():
+        events.append({
+            "name": "thread_name", "ph": "M", "pid": pid, "tid": thread_id,
+            "args": {"name": thread_name}
+        })
+
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, f, default=str)
+    return len(finished)
+
+
+def export(path: str) -> int:
+    """Chrome trace for .json files, JSONL otherwise."""
+    if path.endswith(".json"):
+        return export_chrome(path)
+    return export_jsonl(path)
@@ -0,0 +1,367 @@
+import os
+import sys
+import time
+import queue
+import shutil
+import hashlib
+import tempfile
+import itertools
+import threading
+import subprocess
+from collections import deque
+from typing import Deque, List, Optional
+
+from core.cancel import CancelToken
+from core.metrics import TTS, TTS_QUEUE, get_metrics
+from core import tracing
+
+# Queue priorities: lower is spoken first
+PRIORITY_HIGH = 0
+PRIORITY_NORMAL = 10
+PRIORITY_PRERENDER = 100
+
+# Phrases rendered to disk at start-up and played straight from the cache
+STOCK_PHRASES = [
+    "Jarvis Online. Ready for command.",
+    "Task completed.",
+    "System error.",
+    "Shutting down. Goodbye, sir.",
+    "I am having trouble connecting to the brain, sir.",
+    "I encountered an error while executing the request."
+]
+
+# Our own voice still reaches the microphone just after playback ends
+ECHO_TAIL_S = 0.5
+
+# Players that take a file argument, in order of preference
+PLAYERS = [
+    ["afplay"],
+    ["paplay"],
+    ["aplay", "-q"],
+    ["ffplay", "-nodisp", "-autoexit", "-loglevel", "quiet"]
+]
+
+
+def find_player() -> Optional[list]:
+    configured = os.environ.get("JARVIS_AUDIO_PLAYER")
+    if configured:
+        return configured.split()
+    for player in PLAYERS:
+        if shutil.which(player[0]):
+            return player
+    return None
+
+
+class SpeechItem:
+    """One queued utterance. wait() blocks until it was played or dropped."""
+
+    def __init__(self, text: str, priority: int, cancel_token: Optional[CancelToken], cache: bool):
+        self.text = text
+        self.priority = priority
+        self.cancel_token = cancel_token
+        self.cache = cache
+        self.path: Optional[str] = None
+        self.temporary = False
+        self.played = False
+        self.queued_at = time.perf_counter()
+        self.span = None
+        self._done = threading.Event()
+
+    @property
+    def cancelled(self) -> bool:
+        return self.cancel_token is not None and self.cancel_token.cancelled
+
+    def finish(self, played: bool = False):
+        self.played = played
+        if self.span is not None:
+            # Started by say() on the caller's thread, ended on the TTS threads
+            self.span.end(played=played)
+        if self.temporary and self.path:
+            try:
+                os.remove(self.path)
+            except OSError:
+                pass
+            self.temporary = False
+        self._done.set()
+
+    def wait(self, timeout: float = None) -> bool:
+        return self._done.wait(timeout)
+
+
+class TTSWorker:
+    """
+    Two-stage speech output: a synthesis thread renders queued sentences
+    to audio files while a playback thread plays the previous one, so
+    sentence N+1 is ready the moment sentence N ends.
+
+    Rendering uses `say -o` on macOS and pyttsx3's save_to_file elsewhere;
+    pyttsx3 is created on the synthesis thread and only used there. Stock
+    phrases are pre-rendered into a disk cache. Without a command-line
+    audio player, sentences are spoken directly by pyttsx3 (no overlap).
+    """
+
+    def __init__(self, cache_dir: str = None, lookahead: int = 2):
+        self.cache_dir = os.path.expanduser(
+            cache_dir or os.environ.get("JARVIS_TTS_CACHE", "~/.jarvis_tts_cache")
+        )
+        self.player = find_player()
+        self.use_say = sys.platform == "darwin" and shutil.which("say") is not None
+
+        self._queue: "queue.PriorityQueue" = queue.PriorityQueue()
+        self._ready: "queue.Queue[Optional[SpeechItem]]" = queue.Queue(maxsize=lookahead)
+        self._sequence = itertools.count()
+        self._generation = 0
+        self._lock = threading.Lock()
+        self._playing: Optional[tuple] = None  # (item, process)
+        # Recent playback intervals [start, end or None], time.monotonic()
+        self._speech: Deque[List[Optional[float]]] = deque(maxlen=16)
+        self._engine = None
+        self._stop = threading.Event()
+        self._threads = []
+
+    # ================== PUBLIC API ==================
+    def start(self) -> "TTSWorker":
+        if self._threads:
+            return self
+        os.makedirs(self.cache_dir, exist_ok=True)
+        self._threads = [
+            threading.Thread(target=self._synthesize_loop, name="jarvis-tts-synth", daemon=True),
+            threading.Thread(target=self._playback_loop, name="jarvis-tts-play", daemon=True)
+        ]
+        for thread in self._threads:
+            thread.start()
+
+        if self.player:
+            for phrase in STOCK_PHRASES:
+                if not os.path.exists(self._cache_path(phrase)):
+                    self._put(SpeechItem(phrase, PRIORITY_PRERENDER, None, cache=True))
+        return self
+
+    def say(
+        self,
+        text: str,
+        priority: int = PRIORITY_NORMAL,
+        cancel_token: Optional[CancelToken] = None,
+        cache: bool = None
+    ) -> SpeechItem:
+        """
+        Queue text and return immediately. Use the returned item's wait()
+        to block until it has been spoken. Items whose cancel_token fires are
+        skipped, and stop playing if they already started.
+        """
+        item = SpeechItem(text, priority, cancel_token, cache if cache is not None else text in STOCK_PHRASES)
+        item.span = tracing.span("speak", chars=len(text), priority=priority)
+        if cancel_token is not None:
+            cancel_token.on_cancel(lambda: self._kill_if_playing(item))
+        self._put(item)
+        self._record_depth()
+        return item
+
+    def spoke_during(self, start: float, end: float) -> bool:
+        """Whether speech was playing at any point between two time.monotonic() readings."""
+        with self._lock:
+            intervals = list(self._speech)
+        return any(
+            started <= end and (ended is None or start <= ended + ECHO_TAIL_S)
+            for started, ended in intervals
+        )
+
+    def flush(self):
+        """Drop everything queued and stop what is playing now."""
+        with self._lock:
+            self._generation += 1
+            self._drain(self._queue)
+            self._drain(self._ready)
+        self._kill_if_playing()
+
+    def stop(self):
+        self.flush()
+        self._stop.set()
+        self._put(None)
+
+    # ================== INTERNALS ==================
+    def _put(self, item: Optional[SpeechItem]):
+        priority = item.priority if item else -1
+        with self._lock:
+            self._queue.put((priority, next(self._sequence), self._generation, item))
+
+    def _record_depth(self):
+        get_metrics().record(TTS_QUEUE, self._queue.qsize() + self._ready.qsize())
+
+    @staticmethod
+    def _drain(q):
+        while True:
+            try:
+                entry = q.get_nowait()
+            except queue.Empty:
+                return
+            item = entry[-1] if isinstance(entry, tuple) else entry
+            if item is not None:
+                item.finish()
+
+    def _cache_path(self, text: str) -> str:
+        backend = "say" if self.use_say else "pyttsx3"
+        digest = hashlib.sha1(f"{backend}\0{text}".encode()).hexdigest()
+        return os.path.join(self.cache_dir, digest + (".aiff" if self.use_say else ".wav"))
+
+    def _get_engine(self):
+        # Only ever called from the synthesis thread
+        if self._engine is None:
+            import pyttsx3
+            self._engine = pyttsx3.init()
+            set_deep_male_voice(self._engine)
+        return self._engine
+
+    def _render(self, text: str, path: str):
+        with tracing.span("tts_render", chars=len(text)):
+            if self.use_say:
+                subprocess.run(["say", "-o", path, text], check=True)
+            else:
+                engine = self._get_engine()
+                engine.save_to_file(text, path)
+                engine.runAndWait()
+
+    def _speak_direct(self, item: SpeechItem):
+        """No player available: speak on the synthesis thread itself."""
+        if self.use_say:
+            process = subprocess.Popen(["say", item.text])
+            self._play_process(item, process)
+            return
+        engine = self._get_engine()
+        unregister = item.cancel_token.on_cancel(engine.stop) if item.cancel_token else None
+        get_metrics().record_since(TTS, item.queued_at)
+        interval = self._speech_started()
+        try:
+            engine.say(item.text)
+            engine.runAndWait()
+        finally:
+            interval[1] = time.monotonic()
+            if unregister:
+                unregister()
+        item.finish(played=True)
+
+    def _synthesize_loop(self):
+        while not self._stop.is_set():
+            _, _, generation, item = self._queue.get()
+            if item is None:
+                self._ready.put(None)
+                return
+            if generation != self._generation or item.cancelled:
+                item.finish()
+                continue
+
+            try:
+                if item.priority == PRIORITY_PRERENDER:
+                    self._render(item.text, self._cache_path(item.text))
+                    item.finish()
+                    continue
+
+                if not self.player:
+                    self._speak_direct(item)
+                    continue
+
+                if item.cache:
+                    item.path = self._cache_path(item.text)
+                    if not os.path.exists(item.path):
+                        self._render(item.text, item.path)
+                else:
+                    fd, item.path = tempfile.mkstemp(suffix=".aiff" if self.use_say else ".wav", prefix="jarvis-tts-")
+                    os.close(fd)
+                    item.temporary = True
+                    self._render(item.text, item.path)
+            except Exception as e:
+                print(f"TTS Error: {e}")
+                item.finish()
+                continue
+
+            if generation != self._generation or item.cancelled:
+                # Flushed while rendering
+                item.finish()
+                continue
+
+            # Blocks while `lookahead` rendered sentences are waiting
+            self._ready.put(item)
+
+    def _playback_loop(self):
+        while True:
+            item = self._ready.get()
+            if item is None:
+                return
+
+            try:
+                if not item.cancelled:
+                    self._play_process(item, subprocess.Popen(self.player + [item.path]))
+            except Exception as e:
+                print(f"TTS Playback Error: {e}")
+            finally:
+                item.finish(played=item.played)
+                self._record_depth()
+
+    def _play_process(self, item: SpeechItem, process: subprocess.Popen):
+        with self._lock:
+            self._playing = (item, process)
+        # Time from say() until the sound starts
+        get_metrics().record_since(TTS, item.queued_at)
+        interval = self._speech_started()
+        try:
+            # The token may have fired between the check and Popen
+            if item.cancelled:
+                process.kill()
+            process.wait()
+        finally:
+            interval[1] = time.monotonic()
+            with self._lock:
+                self._playing = None
+        item.finish(played=process.returncode == 0)
+
+    def _speech_started(self) -> List[Optional[float]]:
+        # The caller sets the end time when playback stops
+        interval = [time.monotonic(), None]
+        with self._lock:
+            self._speech.append(interval)
+        return interval
+
+    def _kill_if_playing(self, item: Optional[SpeechItem] = None):
+        """Stop playback now: of item only, or of anything when item is None."""
+        with self._lock:
+            playing = self._playing
+        if playing is not None and (item is None or playing[0] is item) and playing[1].poll() is None:
+            playing[1].kill()
+        if self._engine is not None and not self.player and item is None:
+            self._engine.stop()
+
+
+def set_deep_male_voice(engine):
+    voices = engine.getProperty('voices')
+    for voice in voices:
+        # Prefer "Daniel" for deep male voice on Mac
+        if "Daniel" in voice.name:
+            engine.setProperty('voice', voice.id)
+            return
+    # Fallback to any male voice if Daniel not found
+    for voice in voices:
+        if "male" in voice.name.lower() or "male" in str(voice.gender).lower():
+            engine.setProperty('voice', voice.id)
+            return
+
+
+_worker: Optional[TTSWorker] = None
+_worker_lock = threading.Lock()
+
+
+def spoke_during(start: float, end: float) -> bool:
+    """
+    Whether Jarvis was talking between two time.monotonic() readings, so a
+    recording from then may hold its own voice. False if it never spoke.
+    """
+    worker = _worker
+    return worker is not None and worker.spoke_during(start, end)
+
+
+def get_tts() -> TTSWorker:
+    """The process-wide TTS worker, started on first use."""
+    global _worker
+    with _worker_lock:
+        if _worker is None:
+            _worker = TTSWorker().start()
+    return _worker
@@ -0,0 +1,107 @@
+import re
+import zlib
+import threading
+from typing import Dict, List, Tuple
+
+import numpy as np
+
+
+class HashedNgramEmbedder:
+    """
+    Dependency-free text embedding: character n-grams and words hashed into
+    a fixed-size signed vector, L2-normalized. Close spellings ("birthday",
+    "my_birthday", "birth day") end up with high cosine similarity.
+    """
+
+    def __init__(self, dim: int = 512, ngram_sizes: Tuple[int, ...] = (3, 4)):
+        self.dim = dim
+        self.ngram_sizes = ngram_sizes
+
+    def features(self, text: str) -> List[str]:
+        words = re.findall(r"[a-z0-9]+", text.lower().replace("_", " "))
+        features = [f"w:{word}" for word in words]
+
+        for word in words:
+            padded = f" {word} "
+            for n in self.ngram_sizes:
+                features.extend(padded[i:i + n] for i in range(max(1, len(padded) - n + 1)))
+
+        return features
+
+    def embed(self, text: str) -> np.ndarray:
+        vector = np.zeros(self.dim, dtype=np.float32)
+
+        for feature in self.features(text):
+            h = zlib.crc32(feature.encode("utf-8"))
+            vector[h % self.dim] += 1.0 if (h >> 16) & 1 else -1.0
+
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+
+class VectorIndex:
+    """In-process cosine-similarity index over a growable NumPy matrix."""
+
+    def __init__(self, embedder: HashedNgramEmbedder = None, capacity: int = 64):
+        self.embedder = embedder or HashedNgramEmbedder()
+        self.matrix = np.zeros((capacity, self.embedder.dim), dtype=np.float32)
+        self.keys: List[str] = []
+        self.rows: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    def upsert(self, key: str, text: str):
+        """Add or replace the vector for key (amortized O(dim))."""
+        vector = self.embedder.embed(text)
+
+        with self._lock:
+            row = self.rows.get(key)
+            if row is None:
+                row = len(self.keys)
+                if row == self.matrix.shape[0]:
+                    grown = np.zeros((row * 2, self.embedder.dim), dtype=np.float32)
+                    grown[:row] = self.matrix
+                    self.matrix = grown
+                self.keys.append(key)
+                self.rows[key] = row
+            self.matrix[row] = vector
+
+    def remove(self, key: str):
+        """Drop key by moving the last row into its slot."""
+        with self._lock:
+            row = self.rows.pop(key, None)
+            if row is None:
+                return
+
+            last = len(self.keys) - 1
+            if row != last:
+                moved_key = self.keys[last]
+                self.matrix[row] = self.matrix[last]
+                self.keys[row] = moved_key
+                self.rows[moved_key] = row
+
+            self.keys.pop()
+            self.matrix[last] = 0.0
+
+    def search(self, text: str, top_n: int = 5) -> List[Tuple[str, float]]:
+        """
+        Rank stored keys by cosine similarity to text.
+
+        Returns:
+            Up to top_n (key, score) pairs, best first
+        """
+        query = self.embedder.embed(text)
+
+        with self._lock:
+            count = len(self.keys)
+            if count == 0:
+                return []
+            scores = self.matrix[:count] @ query
+            keys = list(self.keys)
+
+        top_n = min(top_n, count)
+        best = np.argpartition(-scores, top_n - 1)[:top_n]
+        best = best[np.argsort(-scores[best])]
+        return [(keys[i], float(scores[i])) for i in best]
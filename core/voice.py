@@ -1,64 +1,393 @@
 import os
-import sys
-import pyttsx3
+import json
+import time
+import threading
+from abc import ABC, abstractmethod
+from typing import Callable, Optional
 import speech_recognition as sr
 
-# Initialize engine globally to avoid re-initialization issues
-engine = pyttsx3.init()
-
-# Set voice to deep male voice
-def set_deep_male_voice():
-    voices = engine.getProperty('voices')
-    for voice in voices:
-        # Prefer "Daniel" for deep male voice on Mac
-        if "Daniel" in voice.name:
-            engine.setProperty('voice', voice.id)
-            return
-    # Fallback to any male voice if Daniel not found
-    for voice in voices:
-        if "male" in voice.name.lower() or "male" in str(voice.gender).lower():
-             engine.setProperty('voice', voice.id)
-             return
-
-set_deep_male_voice()
-
-def speak(text):
+from core.tts import PRIORITY_NORMAL, get_tts, spoke_during
+from core.metrics import STT, get_metrics
+from core import tracing
+
+
+# ================== SPEAKING ==================
+def speakable(text):
+    """Raw tool JSON is never read out."""
     if "{" in text and "}" in text and "status" in text:
-        text = "Task completed."
-    
+        return "Task completed."
+    return text
+
+
+def speak(text, cancel_token=None, priority=None):
+    """
+    Say text out loud and block until it has been spoken (or dropped).
+
+    Goes through the shared TTS worker: rendering happens on its synthesis
+    thread and playback stops as soon as cancel_token fires. To overlap
+    sentences, queue them with get_tts().say() and wait on the last one.
+    """
+    if cancel_token is not None and cancel_token.cancelled:
+        return
+
+    text = speakable(text)
+
     # Print first so user sees it even if audio fails
     print(f"JARVIS: {text}")
 
-    # On macOS with a GUI/Threading environment, pyttsx3's loop often conflicts 
-    # with the main thread event loop (PyQt). Default to system 'say' command on macOS
-    # to avoid hangs/crashes unless we are strictly in a non-GUI text mode.
-    if sys.platform == "darwin":
-        try:
-            # Escape quotes to prevent shell injection/errors
-            clean_text = text.replace('"', '\\"').replace("'", "")
-            os.system(f'say "{clean_text}"')
-            return
-        except Exception as e2:
-            print(f"TTS Fallback Error: {e2}")
-            # Fall through to pyttsx3 if 'say' fails (unlikely)
-
-    # Try pyttsx3
     try:
-        engine.say(text)
-        engine.runAndWait()
+        tts = get_tts()
+        tts.say(text, priority if priority is not None else PRIORITY_NORMAL, cancel_token).wait()
     except Exception as e:
         print(f"TTS Error: {e}")
 
-def listen():
-    r = sr.Recognizer()
+
+# ================== RECOGNIZERS ==================
+class Recognizer(ABC):
+    """Speech-to-text backend. Selected with JARVIS_RECOGNIZER."""
+
+    name = "base"
+
+    @abstractmethod
+    def recognize(self, audio: sr.AudioData) -> str:
+        """Transcript of audio ("" if nothing was understood)."""
+        pass
+
+
+class GoogleRecognizer(Recognizer):
+    """The Google Web Speech API (network, the original behaviour)."""
+
+    name = "google"
+
+    def __init__(self):
+        self._recognizer = sr.Recognizer()
+
+    def recognize(self, audio: sr.AudioData) -> str:
+        try:
+            return self._recognizer.recognize_google(audio)
+        except sr.UnknownValueError:
+            return ""
+
+
+_vosk_models = {}
+_vosk_lock = threading.Lock()
+
+
+def _vosk_model(model_path: str = None):
+    """Vosk models take a while to load and are shared by recognizer and wake word."""
+    model_path = model_path or os.environ.get("VOSK_MODEL_PATH")
+    with _vosk_lock:
+        if model_path not in _vosk_models:
+            from vosk import Model, SetLogLevel
+            SetLogLevel(-1)
+            _vosk_models[model_path] = Model(model_path) if model_path else Model(lang="en-us")
+        return _vosk_models[model_path]
+
+
+class VoskRecognizer(Recognizer):
+    """
+    Offline recognition on the CPU with Vosk/Kaldi (pip install vosk).
+    Uses VOSK_MODEL_PATH, or downloads the small en-us model on first use.
+    """
+
+    name = "vosk"
+    SAMPLE_RATE = 16000
+
+    def __init__(self, model_path: str = None):
+        self.model = _vosk_model(model_path)
+
+    def recognize(self, audio: sr.AudioData) -> str:
+        from vosk import KaldiRecognizer
+        recognizer = KaldiRecognizer(self.model, self.SAMPLE_RATE)
+        recognizer.AcceptWaveform(audio.get_raw_data(convert_rate=self.SAMPLE_RATE, convert_width=2))
+        return json.loads(recognizer.FinalResult()).get("text", "")
+
+
+RECOGNIZERS = {
+    "google": GoogleRecognizer,
+    "vosk": VoskRecognizer
+}
+
+
+def get_recognizer(name: str = None) -> Recognizer:
+    name = (name or os.environ.get("JARVIS_RECOGNIZER", "google")).lower()
+    if name not in RECOGNIZERS:
+        raise ValueError(f"Unknown recognizer '{name}' (choose from {', '.join(RECOGNIZERS)})")
+    return RECOGNIZERS[name]()
+
+
+# ================== WAKE WORD ==================
+class WakeWordDetector(ABC):
+    """Cheap local check for the wake word, run before any full recognition."""
+
+    name = "base"
+
+    @abstractmethod
+    def find(self, pcm: bytes, sample_rate: int) -> Optional[float]:
+        """
+        Look for the wake word in 16-bit mono PCM.
+
+        Returns:
+            Seconds from the start of pcm to the end of the wake word, or
+            None if it was not said
+        """
+        pass
+
+
+class VoskWakeWord(WakeWordDetector):
+    """
+    Vosk restricted to a two-entry grammar (the wake word or "unknown"),
+    which decodes far faster than open vocabulary. Audio is fed in short
+    blocks and scanning stops at the first hit.
+    """
+
+    name = "vosk"
+    SAMPLE_RATE = 16000
+
+    def __init__(self, wake_word: str = "jarvis", model_path: str = None):
+        self.wake_word = wake_word.lower()
+        self.model = _vosk_model(model_path)
+
+    def find(self, pcm: bytes, sample_rate: int) -> Optional[float]:
+        from vosk import KaldiRecognizer
+
+        if sample_rate != self.SAMPLE_RATE:
+            pcm = sr.AudioData(pcm, sample_rate, 2).get_raw_data(convert_rate=self.SAMPLE_RATE)
+
+        recognizer = KaldiRecognizer(self.model, self.SAMPLE_RATE, json.dumps([self.wake_word, "[unk]"]))
+        recognizer.SetWords(True)
+        block = self.SAMPLE_RATE * 2 // 4  # 250 ms
+
+        for start in range(0, len(pcm), block):
+            if recognizer.AcceptWaveform(pcm[start:start + block]):
+                end = self._wake_end(recognizer.Result())
+                if end is not None:
+                    return end
+        return self._wake_end(recognizer.FinalResult())
+
+    def _wake_end(self, result: str) -> Optional[float]:
+        for word in json.loads(result).get("result", []):
+            if word.get("word") == self.wake_word:
+                return float(word["end"])
+        return None
+
+
+class OpenWakeWord(WakeWordDetector):
+    """openWakeWord's pretrained "hey jarvis" model (pip install openwakeword)."""
+
+    name = "openwakeword"
+    SAMPLE_RATE = 16000
+    BLOCK = 1280  # 80 ms, the model's native step
+
+    def __init__(self, model_name: str = "hey_jarvis", threshold: float = 0.5):
+        from openwakeword.model import Model
+        self.model_name = model_name
+        self.threshold = threshold
+        self.model = Model(wakeword_models=[model_name])
+
+    def find(self, pcm: bytes, sample_rate: int) -> Optional[float]:
+        import numpy as np
+
+        if sample_rate != self.SAMPLE_RATE:
+            pcm = sr.AudioData(pcm, sample_rate, 2).get_raw_data(convert_rate=self.SAMPLE_RATE)
+
+        samples = np.frombuffer(pcm, dtype=np.int16)
+        self.model.reset()
+        for start in range(0, len(samples) - self.BLOCK + 1, self.BLOCK):
+            scores = self.model.predict(samples[start:start + self.BLOCK])
+            if max(scores.values()) >= self.threshold:
+                return (start + self.BLOCK) / self.SAMPLE_RATE
+        return None
+
+
+WAKE_DETECTORS = {
+    "vosk": VoskWakeWord,
+    "openwakeword": OpenWakeWord
+}
+
+
+def get_wake_detector(name: str = None) -> Optional[WakeWordDetector]:
+    """
+    JARVIS_WAKE_ENGINE: "auto" (first installed), a detector name, or "off".
+    None means no local gate: every utterance goes to the recognizer.
+    """
+    name = (name or os.environ.get("JARVIS_WAKE_ENGINE", "auto")).lower()
+    if name == "off":
+        return None
+
+    candidates = list(WAKE_DETECTORS) if name == "auto" else [name]
+    for candidate in candidates:
+        try:
+            if candidate == "vosk":
+                return VoskWakeWord(os.environ.get("JARVIS_WAKE_WORD", "jarvis"))
+            return WAKE_DETECTORS[candidate]()
+        except Exception as e:
+            if name != "auto":
+                print(f"Wake word engine '{candidate}' unavailable: {e}")
+    return None
+
+
+class WakeGate:
+    """
+    Sends audio to the recognizer only when the wake word was heard.
+
+    The part of the utterance after the wake word is recognized. If the
+    user paused after "Jarvis", the next utterance within follow_up_s is
+    taken as the command. Transcripts come back prefixed with the wake word
+    so the main loop's wake filter accepts them.
+    """
+
+    def __init__(
+        self,
+        detector: WakeWordDetector,
+        recognizer: Recognizer,
+        wake_word: str = "jarvis",
+        follow_up_s: float = 8.0,
+        min_command_s: float = 0.4
+    ):
+        self.detector = detector
+        self.recognizer = recognizer
+        self.wake_word = wake_word
+        self.follow_up_s = follow_up_s
+        self.min_command_s = min_command_s
+        self.armed_until = 0.0
+
+    def process(self, pcm: bytes, sample_rate: int) -> Optional[str]:
+        """Transcript of the command in pcm, or None if it was not meant for Jarvis."""
+        if time.monotonic() < self.armed_until:
+            self.armed_until = 0.0
+            command = pcm
+        else:
+            end = self.detector.find(pcm, sample_rate)
+            if end is None:
+                return None
+
+            command = pcm[int(end * sample_rate) * 2:]
+            if len(command) < self.min_command_s * sample_rate * 2:
+                # Just "Jarvis": the command follows in the next utterance
+                print("Wake word heard.")
+                self.armed_until = time.monotonic() + self.follow_up_s
+                return None
+
+        text = self.recognizer.recognize(sr.AudioData(command, sample_rate, 2))
+        return f"{self.wake_word} {text}".strip() if text else None
+
+
+# ================== LISTENING ==================
+# One recognizer and one always-on capture pipeline for the whole process
+_recognizer = sr.Recognizer()
+_pipeline = None
+_pipeline_lock = threading.Lock()
+_backend: Optional[Recognizer] = None
+_wake_gate = None
+
+
+def get_audio_pipeline():
+    """
+    Start the microphone pipeline on first use (None if it cannot run,
+    e.g. numpy or PyAudio missing, or JARVIS_AUDIO_PIPELINE=0).
+    """
+    global _pipeline
+    if os.environ.get("JARVIS_AUDIO_PIPELINE", "1") == "0":
+        return None
+
+    with _pipeline_lock:
+        if _pipeline is None:
+            try:
+                from core.audio import AudioPipeline, MicrophoneSource
+                _pipeline = AudioPipeline(MicrophoneSource()).start()
+            except Exception as e:
+                print(f"Audio pipeline unavailable, using per-call microphone: {e}")
+                _pipeline = False
+    return _pipeline or None
+
+
+def _listen_once():
     with sr.Microphone() as source:
         print("Listening...")
-        r.pause_threshold = 0.8
-        r.adjust_for_ambient_noise(source)
+        _recognizer.pause_threshold = 0.8
+        _recognizer.adjust_for_ambient_noise(source)
+        audio = _recognizer.listen(source, timeout=5)
+    return audio
+
+
+def _get_backend() -> Recognizer:
+    global _backend, _wake_gate
+    with _pipeline_lock:
+        if _backend is None:
+            try:
+                _backend = get_recognizer()
+            except Exception as e:
+                # Bad JARVIS_RECOGNIZER or a missing package: keep listening
+                print(f"Recognizer unavailable, using Google: {e}")
+                _backend = GoogleRecognizer()
+            detector = get_wake_detector()
+            if detector is not None:
+                _wake_gate = WakeGate(detector, _backend, os.environ.get("JARVIS_WAKE_WORD", "jarvis"))
+    return _backend
+
+
+def _heard_while_speaking(query: str) -> bool:
+    # Default filter: only the wake word may interrupt Jarvis
+    return "jarvis" in query
+
+
+def _accept(query: str, overlapped: bool, while_speaking, listen_span) -> str:
+    if overlapped and not while_speaking(query):
+        # Most likely our own TTS coming back through the microphone
+        listen_span.set(dropped="tts_echo")
+        return "none"
+    return query
+
+
+def listen(timeout: float = 5, while_speaking: Callable[[str], bool] = _heard_while_speaking):
+    """
+    Next spoken command as lower-case text, or "none".
+
+    With the pipeline, speech is captured continuously in the background:
+    this only waits for the next finished utterance, and the command after
+    it is already being recorded while this one is recognized. With a wake
+    word engine installed, utterances without the wake word are dropped
+    locally and never reach the recognizer.
+
+    The microphone also hears Jarvis's own voice. A command recorded while
+    it was speaking is returned only if while_speaking(query) accepts it.
+    """
+    pipeline = get_audio_pipeline()
+
+    with tracing.span("listen") as listen_span:
         try:
-            audio = r.listen(source, timeout=5)
+            backend = _get_backend()
+            if pipeline is not None:
+                utterance = pipeline.get_utterance(timeout=timeout)
+                if utterance is None:
+                    return "none"
+                listen_span.set(utterance_s=utterance.duration)
+                ended = utterance.ended_at or time.monotonic()
+                overlapped = spoke_during(ended - utterance.duration, ended)
+
+                if _wake_gate is not None:
+                    started = time.perf_counter()
+                    with tracing.span("wake_filter") as wake_span:
+                        query = _wake_gate.process(utterance.pcm, utterance.sample_rate)
+                        wake_span.set(accepted=bool(query))
+                    if not query:
+                        return "none"
+                    # Only commands: dropped background speech would skew it
+                    get_metrics().record_since(STT, started)
+                    return _accept(query.lower(), overlapped, while_speaking, listen_span)
+                audio = utterance.to_audio_data()
+            else:
+                started = time.monotonic()
+                audio = _listen_once()
+                overlapped = spoke_during(started, time.monotonic())
+
             print("Recognizing...")
-            query = r.recognize_google(audio)
-            return query.lower()
-        except Exception:
+            with tracing.span("stt", backend=backend.name), get_metrics().timer(STT):
+                query = backend.recognize(audio)
+            if not query:
+                return "none"
+            return _accept(query.lower(), overlapped, while_speaking, listen_span)
+        except Exception as e:
+            listen_span.set(error=f"{type(e).__name__}: {e}")
             return "none"
\ No newline at end of file
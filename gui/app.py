@@ -1,13 +1,19 @@
+import os
 import sys
-import random
+import time
 import math
-from PyQt6.QtWidgets import QApplication, QMainWindow, QWidget, QHBoxLayout
-from PyQt6.QtCore import Qt, QTimer, QPointF, QRectF
+from collections import deque
+from typing import Deque, Dict
+from PyQt6.QtWidgets import QApplication, QMainWindow, QWidget, QHBoxLayout, QLabel
+from PyQt6.QtCore import Qt, QTimer, QPointF, QRectF, QObject, QEvent, pyqtSignal
 from PyQt6.QtGui import (
     QPainter, QColor, QPen, QBrush,
-    QPolygonF
+    QPolygonF, QPixmap
 )
 
+from core import metrics, tracing
+from core.metrics import MetricsBus, get_metrics
+
 # ================== THEME ==================
 PRIMARY_COLOR = QColor("#00bfff")   # AI Blue
 ACCENT_COLOR  = QColor("#e6f7ff")   # Soft White Blue
@@ -15,164 +21,501 @@ BG_COLOR      = QColor("#000000")
 WARNING_COLOR = QColor("#ff3b3b")   # Alert Red
 
 
+# ================== FRAME CLOCK ==================
+# Frame rates in frames per second
+ACTIVE_FPS = int(os.environ.get("JARVIS_GUI_FPS", "30"))
+IDLE_FPS = int(os.environ.get("JARVIS_GUI_IDLE_FPS", "8"))
+# Paint spans kept when tracing: one frame in this many (~1/s per panel at 30 fps)
+PAINT_TRACE_EVERY = 30
+IDLE_AFTER_S = float(os.environ.get("JARVIS_GUI_IDLE_S", "30"))
+# Longest step an animation takes at once (after a stall or a resume)
+MAX_STEP_S = 0.25
+
+
+class FrameClock(QObject):
+    """
+    The one animation timer of the HUD.
+
+    Panels connect to `tick` and advance by the elapsed seconds it carries,
+    so animation speed does not depend on the frame rate. The rate drops to
+    IDLE_FPS after IDLE_AFTER_S without input and the timer stops while the
+    window is hidden or Jarvis is paused.
+    """
+
+    tick = pyqtSignal(float)
+
+    INPUT_EVENTS = {
+        QEvent.Type.MouseMove,
+        QEvent.Type.MouseButtonPress,
+        QEvent.Type.KeyPress,
+        QEvent.Type.Wheel
+    }
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.hidden = False
+        self.paused = False
+        self.fps = 0
+
+        self._last = time.monotonic()
+        self._last_input = self._last
+
+        self._timer = QTimer(self)
+        self._timer.setTimerType(Qt.TimerType.PreciseTimer)
+        self._timer.timeout.connect(self._on_timeout)
+        self._update_rate()
+
+    def set_hidden(self, hidden: bool):
+        self.hidden = hidden
+        self._update_rate()
+
+    def set_paused(self, paused: bool):
+        self.paused = paused
+        self._update_rate()
+
+    def poke(self):
+        """Activity: back to the full frame rate."""
+        self._last_input = time.monotonic()
+        if self.fps == IDLE_FPS:
+            self._update_rate()
+
+    def eventFilter(self, obj, event):
+        if event.type() in self.INPUT_EVENTS:
+            self.poke()
+        return False
+
+    def _target_fps(self) -> int:
+        if self.hidden or self.paused:
+            return 0
+        if time.monotonic() - self._last_input > IDLE_AFTER_S:
+            return IDLE_FPS
+        return ACTIVE_FPS
+
+    def _update_rate(self):
+        fps = self._target_fps()
+        if fps == self.fps:
+            return
+        self.fps = fps
+        if fps <= 0:
+            self._timer.stop()
+            return
+        self._timer.setInterval(int(1000 / fps))
+        if not self._timer.isActive():
+            # Do not replay the time spent stopped
+            self._last = time.monotonic()
+            self._timer.start()
+
+    def _on_timeout(self):
+        now = time.monotonic()
+        dt, self._last = min(now - self._last, MAX_STEP_S), now
+        self._update_rate()
+        self.tick.emit(dt)
+
+
+def render_layer(width: float, height: float, dpr: float, draw) -> QPixmap:
+    """Pre-render static geometry once into a transparent, HiDPI-aware pixmap."""
+    pixmap = QPixmap(max(1, math.ceil(width * dpr)), max(1, math.ceil(height * dpr)))
+    pixmap.setDevicePixelRatio(dpr)
+    pixmap.fill(Qt.GlobalColor.transparent)
+
+    painter = QPainter(pixmap)
+    painter.setRenderHint(QPainter.RenderHint.Antialiasing)
+    draw(painter)
+    painter.end()
+    return pixmap
+
+
 # ================== HEX PANEL ==================
+# Unit hexagon, computed once
+HEX_VERTICES = [
+    (math.cos(math.radians(60 * i)), math.sin(math.radians(60 * i)))
+    for i in range(6)
+]
+SQRT3 = math.sqrt(3)
+
+
 class HexagonPanel(QWidget):
-    def __init__(self, parent=None):
+    # Opacity pulse between 60 and 180, in alpha units per second
+    PULSE_SPEED = 50
+
+    def __init__(self, clock: FrameClock, parent=None):
         super().__init__(parent)
         self.setMinimumWidth(200)
         self.opacity = 60
         self.increasing = True
 
-        self.timer = QTimer(self)
-        self.timer.timeout.connect(self.animate)
-        self.timer.start(80)
+        size = 30
+        rows, cols = 4, 3
+        x_offset, y_offset = 20, 60
+
+        # Cells split by parity: each group shares one alpha per frame
+        self.cells = ([], [])
+        for r in range(rows):
+            for c in range(cols):
+                x = x_offset + c * (size * 1.5)
+                y = y_offset + r * (size * SQRT3)
+                if c % 2:
+                    y += size * SQRT3 / 2
+                self.cells[(r + c) % 2].append(self.hexagon(x, y, size))
+
+        self.bounds = QRectF()
+        for group in self.cells:
+            for polygon in group:
+                self.bounds = self.bounds.united(polygon.boundingRect())
+        self.bounds.adjust(-2, -2, 2, 2)
+
+        self._layers = None
+        self._layers_dpr = None
 
-    def animate(self):
+        clock.tick.connect(self.animate)
+
+    @staticmethod
+    def hexagon(x, y, size) -> QPolygonF:
+        return QPolygonF([QPointF(x + size * cos, y + size * sin) for cos, sin in HEX_VERTICES])
+
+    def animate(self, dt):
+        shown = int(self.opacity) // 4
+        step = self.PULSE_SPEED * dt
         if self.increasing:
-            self.opacity += 4
+            self.opacity += step
             if self.opacity >= 180:
+                self.opacity = 180
                 self.increasing = False
         else:
-            self.opacity -= 4
+            self.opacity -= step
             if self.opacity <= 60:
+                self.opacity = 60
                 self.increasing = True
-        self.update()
 
+        # Repaint in steps of 4 alpha units, as often as the eye can tell
+        if int(self.opacity) // 4 != shown:
+            self.update()
+
+    def layers(self):
+        dpr = self.devicePixelRatioF()
+        if self._layers is None or self._layers_dpr != dpr:
+            def draw_group(group):
+                def draw(painter):
+                    pen = QPen(PRIMARY_COLOR, 2)
+                    pen.setCapStyle(Qt.PenCapStyle.RoundCap)
+                    painter.setPen(pen)
+                    painter.translate(-self.bounds.topLeft())
+                    for polygon in group:
+                        painter.drawPolygon(polygon)
+                return draw
+
+            self._layers = [
+                render_layer(self.bounds.width(), self.bounds.height(), dpr, draw_group(group))
+                for group in self.cells
+            ]
+            self._layers_dpr = dpr
+        return self._layers
+
+    @tracing.traced(sample_every=PAINT_TRACE_EVERY)
     def paintEvent(self, event):
         painter = QPainter(self)
-        painter.setRenderHint(QPainter.RenderHint.Antialiasing)
+        even, odd = self.layers()
 
-        size = 30
-        rows, cols = 4, 3
-        x_offset, y_offset = 20, 60
+        # The pulse only changes each group's opacity
+        painter.setOpacity(max(50, self.opacity - 40) / 255)
+        painter.drawPixmap(self.bounds.topLeft(), even)
+        painter.setOpacity(self.opacity / 255)
+        painter.drawPixmap(self.bounds.topLeft(), odd)
 
-        for r in range(rows):
-            for c in range(cols):
-                color = QColor(PRIMARY_COLOR)
-                color.setAlpha(self.opacity if (r + c) % 2 else max(50, self.opacity - 40))
 
-                pen = QPen(color, 2)
-                pen.setCapStyle(Qt.PenCapStyle.RoundCap)
-                painter.setPen(pen)
+# ================== TELEMETRY PANEL ==================
+class MetricsBridge(QObject):
+    """
+    Carries metrics bus samples from worker threads into the GUI thread.
 
-                x = x_offset + c * (size * 1.5)
-                y = y_offset + r * (size * math.sqrt(3))
-                if c % 2:
-                    y += size * math.sqrt(3) / 2
+    The bus calls emit on the producer's thread; Qt queues the signal to
+    this object's (the GUI) thread, so neither side waits on the other.
+    """
 
-                self.draw_hexagon(painter, x, y, size)
+    sample = pyqtSignal(str, float)
 
-    def draw_hexagon(self, painter, x, y, size):
-        points = [
-            QPointF(
-                x + size * math.cos(math.radians(60 * i)),
-                y + size * math.sin(math.radians(60 * i))
-            )
-            for i in range(6)
-        ]
-        painter.drawPolygon(QPolygonF(points))
+    def __init__(self, bus: MetricsBus, parent=None):
+        super().__init__(parent)
+        self._unsubscribe = bus.subscribe(self.sample.emit)
+
+    def close(self):
+        self._unsubscribe()
 
 
-# ================== TELEMETRY PANEL ==================
 class TelemetryPanel(QWidget):
-    def __init__(self, parent=None):
+    """
+    Live pipeline metrics: latest latency of each stage (bar, and red when
+    over its budget), cache hit rate and queue depths. Samples arrive
+    through MetricsBridge; repaints are batched onto the frame clock.
+    """
+
+    # (label, metric, budget in ms)
+    STAGE_ROWS = [
+        ("STT", metrics.STT, 1500),
+        ("LLM 1ST", metrics.LLM_FIRST_TOKEN, 1000),
+        ("LLM", metrics.LLM_TOTAL, 4000),
+        ("TOOLS", metrics.TOOL, 2000),
+        ("TTS", metrics.TTS, 800)
+    ]
+    # (label, metric, full bar)
+    QUEUE_ROWS = [
+        ("CMD QUEUE", metrics.COMMAND_QUEUE, 5),
+        ("TTS QUEUE", metrics.TTS_QUEUE, 10)
+    ]
+    # Cache lookups averaged for the hit rate
+    CACHE_WINDOW = 100
+
+    ROW_HEIGHT = 44
+    BAR_WIDTH = 160
+    X, Y = 20, 40
+
+    def __init__(self, clock: FrameClock, bridge: MetricsBridge, parent=None):
         super().__init__(parent)
         self.setMinimumWidth(200)
-        self.bar_heights = [30, 50, 70, 40]
-
-        self.timer = QTimer(self)
-        self.timer.timeout.connect(self.animate)
-        self.timer.start(90)
-
-    def animate(self):
-        self.bar_heights = [
-            max(10, min(100, h + random.randint(-12, 12)))
-            for h in self.bar_heights
-        ]
-        self.update()
+        self.clock = clock
+        self.values: Dict[str, float] = {}
+        self.cache_lookups: Deque[float] = deque(maxlen=self.CACHE_WINDOW)
+        self._dirty = False
+        self._labels = None
+        self._labels_dpr = None
+
+        bridge.sample.connect(self.on_sample)
+        clock.tick.connect(self.animate)
+
+    def on_sample(self, name, value):
+        if name == metrics.CACHE_HIT:
+            self.cache_lookups.append(value)
+        else:
+            self.values[name] = value
+        self._dirty = True
+        # Jarvis is working: back to the full frame rate
+        self.clock.poke()
+
+    def animate(self, dt):
+        if self._dirty:
+            self._dirty = False
+            self.update()
 
+    def rows(self):
+        """(label, text, bar fill 0..1, over budget) per row, top to bottom."""
+        rows = []
+        for label, name, budget in self.STAGE_ROWS:
+            value = self.values.get(name)
+            if value is None:
+                rows.append((label, "--", 0.0, False))
+            else:
+                rows.append((label, f"{value:.0f} ms", min(1.0, value / (2 * budget)), value > budget))
+
+        if self.cache_lookups:
+            rate = sum(self.cache_lookups) / len(self.cache_lookups)
+            rows.append(("CACHE HIT", f"{100 * rate:.0f}%", rate, False))
+        else:
+            rows.append(("CACHE HIT", "--", 0.0, False))
+
+        for label, name, full in self.QUEUE_ROWS:
+            value = self.values.get(name)
+            if value is None:
+                rows.append((label, "--", 0.0, False))
+            else:
+                rows.append((label, f"{value:.0f}", min(1.0, value / full), value >= full))
+        return rows
+
+    def labels(self) -> QPixmap:
+        # Row labels and bar tracks never change: drawn once
+        dpr = self.devicePixelRatioF()
+        if self._labels is None or self._labels_dpr != dpr:
+            count = len(self.STAGE_ROWS) + 1 + len(self.QUEUE_ROWS)
+
+            def draw(painter):
+                track = QColor(PRIMARY_COLOR)
+                track.setAlpha(40)
+                painter.setFont(self.font())
+                for i, label in enumerate([r[0] for r in self.STAGE_ROWS] + ["CACHE HIT"] + [r[0] for r in self.QUEUE_ROWS]):
+                    y = i * self.ROW_HEIGHT
+                    painter.setPen(ACCENT_COLOR)
+                    painter.drawText(QRectF(0, y, self.BAR_WIDTH, 16), Qt.AlignmentFlag.AlignLeft, label)
+                    painter.fillRect(QRectF(0, y + 20, self.BAR_WIDTH, 8), track)
+
+            self._labels = render_layer(self.BAR_WIDTH, count * self.ROW_HEIGHT, dpr, draw)
+            self._labels_dpr = dpr
+        return self._labels
+
+    @tracing.traced(sample_every=PAINT_TRACE_EVERY)
     def paintEvent(self, event):
         painter = QPainter(self)
-        painter.setRenderHint(QPainter.RenderHint.Antialiasing)
-
-        painter.setBrush(QBrush(PRIMARY_COLOR))
-        painter.setPen(Qt.PenStyle.NoPen)
+        painter.drawPixmap(QPointF(self.X, self.Y), self.labels())
+        painter.setFont(self.font())
 
-        bar_width = 26
-        gap = 12
-        start_x = 20
-        base_y = 160
+        for i, (label, text, fill, over) in enumerate(self.rows()):
+            y = self.Y + i * self.ROW_HEIGHT
+            color = WARNING_COLOR if over else PRIMARY_COLOR
 
-        for i, h in enumerate(self.bar_heights):
-            x = start_x + i * (bar_width + gap)
-            painter.drawRect(QRectF(x, base_y - h, bar_width, h))
+            painter.setPen(color)
+            painter.drawText(QRectF(self.X, y, self.BAR_WIDTH, 16), Qt.AlignmentFlag.AlignRight, text)
+            # Axis-aligned rectangles: no antialiasing needed
+            if fill > 0:
+                painter.fillRect(QRectF(self.X, y + 20, self.BAR_WIDTH * fill, 8), color)
 
 
 # ================== CENTRAL REACTOR ==================
 class CentralReactor(QWidget):
-    def __init__(self, parent=None):
+    # Ring speeds in degrees per second
+    OUTER_SPEED = 33.3
+    INNER_SPEED = -200
+
+    def __init__(self, clock: FrameClock, parent=None):
         super().__init__(parent)
         self.angle_outer = 0
         self.angle_inner = 0
         self.is_paused = False
+        # (color, device pixel ratio) -> (middle ring, inner ring, arcs)
+        self._layers = {}
 
-        self.timer = QTimer(self)
-        self.timer.timeout.connect(self.animate)
-        self.timer.start(30)
+        clock.tick.connect(self.animate)
 
-    def animate(self):
+    def animate(self, dt):
         if not self.is_paused:
-            self.angle_outer = (self.angle_outer + 1) % 360
-            self.angle_inner = (self.angle_inner - 6) % 360
+            self.angle_outer = (self.angle_outer + self.OUTER_SPEED * dt) % 360
+            self.angle_inner = (self.angle_inner + self.INNER_SPEED * dt) % 360
             self.update()
 
     def set_paused(self, paused):
         self.is_paused = paused
         self.update()
 
+    def layers(self, main_color: QColor):
+        key = (main_color.name(), self.devicePixelRatioF())
+        if key not in self._layers:
+            dpr = key[1]
+
+            def ring(color, width, dash, radius):
+                extent = 2 * radius + width + 2
+
+                def draw(painter):
+                    pen = QPen(color, width)
+                    pen.setDashPattern(dash)
+                    painter.setPen(pen)
+                    painter.drawEllipse(QPointF(extent / 2, extent / 2), radius, radius)
+                return render_layer(extent, extent, dpr, draw)
+
+            def arcs(painter):
+                painter.setPen(QPen(main_color, 3))
+                rect = QRectF(2, 2, 260, 260)
+                painter.drawArc(rect, 45 * 16, 90 * 16)
+                painter.drawArc(rect, 225 * 16, 90 * 16)
+
+            self._layers[key] = (
+                ring(main_color, 12, [10, 10], 100),
+                ring(ACCENT_COLOR, 4, [6, 6], 70),
+                render_layer(264, 264, dpr, arcs)
+            )
+        return self._layers[key]
+
+    @staticmethod
+    def draw_centered(painter, pixmap, angle=0):
+        half = pixmap.width() / pixmap.devicePixelRatio() / 2
+        if angle:
+            painter.save()
+            painter.rotate(angle)
+            painter.drawPixmap(QPointF(-half, -half), pixmap)
+            painter.restore()
+        else:
+            painter.drawPixmap(QPointF(-half, -half), pixmap)
+
+    @tracing.traced(sample_every=PAINT_TRACE_EVERY)
     def paintEvent(self, event):
         painter = QPainter(self)
         painter.setRenderHint(QPainter.RenderHint.Antialiasing)
+        painter.setRenderHint(QPainter.RenderHint.SmoothPixmapTransform)
 
         cx, cy = self.width() / 2, self.height() / 2
         main_color = WARNING_COLOR if self.is_paused else PRIMARY_COLOR
+        middle_ring, inner_ring, arcs = self.layers(main_color)
+        painter.translate(cx, cy)
 
         # Core pulse
         painter.setPen(Qt.PenStyle.NoPen)
         painter.setBrush(QBrush(main_color))
         pulse = (math.sin(self.angle_outer * 0.08) + 1) * 12 if not self.is_paused else 0
-        painter.drawEllipse(QPointF(cx, cy), 22 + pulse, 22 + pulse)
-
-        painter.setBrush(Qt.BrushStyle.NoBrush)
+        painter.drawEllipse(QPointF(0, 0), 22 + pulse, 22 + pulse)
 
-        # Middle ring
-        pen = QPen(main_color, 12)
-        pen.setDashPattern([10, 10])
-        painter.setPen(pen)
+        # Rings and arcs are cached; rotating them is a pixmap blit
+        self.draw_centered(painter, middle_ring, self.angle_outer)
+        self.draw_centered(painter, inner_ring, self.angle_inner)
+        self.draw_centered(painter, arcs)
 
-        painter.save()
-        painter.translate(cx, cy)
-        painter.rotate(self.angle_outer)
-        painter.drawEllipse(QPointF(0, 0), 100, 100)
-        painter.restore()
 
-        # Inner ring
-        pen = QPen(ACCENT_COLOR, 4)
-        pen.setDashPattern([6, 6])
-        painter.setPen(pen)
+# ================== PERFORMANCE OVERLAY ==================
+class PerformanceOverlay(QLabel):
+    """
+    FPS / CPU readout in the top-left corner, toggled with F (or shown at
+    start with JARVIS_GUI_OVERLAY=1). Ticks are clock frames, paints are
+    panel repaints, CPU is the whole process (Jarvis threads included).
+    Refreshed by its own 1 s timer, so it keeps reporting while the clock
+    is stopped.
+    """
 
-        painter.save()
-        painter.translate(cx, cy)
-        painter.rotate(self.angle_inner)
-        painter.drawEllipse(QPointF(0, 0), 70, 70)
-        painter.restore()
+    def __init__(self, clock: FrameClock, panels, parent=None):
+        super().__init__(parent)
+        self.clock = clock
+        self.setStyleSheet(
+            "background-color: rgba(0, 0, 0, 160); color: #e6f7ff; "
+            "font-family: monospace; font-size: 11px; padding: 4px;"
+        )
+        self.setAttribute(Qt.WidgetAttribute.WA_TransparentForMouseEvents)
+
+        self.ticks = 0
+        self.paints = 0
+        self._window_start = time.monotonic()
+        self._cpu_start = time.process_time()
+
+        for panel in panels:
+            panel.installEventFilter(self)
+        clock.tick.connect(self.on_tick)
 
-        # Outer arcs
-        pen = QPen(main_color, 3)
-        painter.setPen(pen)
-        rect = QRectF(cx - 130, cy - 130, 260, 260)
-        painter.drawArc(rect, 45 * 16, 90 * 16)
-        painter.drawArc(rect, 225 * 16, 90 * 16)
+        self.timer = QTimer(self)
+        self.timer.timeout.connect(self.refresh)
+
+        self.setText("measuring...")
+        self.adjustSize()
+        self.setVisible(False)
+        if os.environ.get("JARVIS_GUI_OVERLAY", "0") == "1":
+            self.toggle()
+
+    def toggle(self):
+        if not self.isHidden():
+            self.timer.stop()
+            self.hide()
+            return
+        self.ticks = self.paints = 0
+        self._window_start = time.monotonic()
+        self._cpu_start = time.process_time()
+        self.timer.start(1000)
+        self.show()
+        self.raise_()
+
+    def eventFilter(self, obj, event):
+        if event.type() == QEvent.Type.Paint:
+            self.paints += 1
+        return False
+
+    def on_tick(self, dt):
+        self.ticks += 1
+
+    def refresh(self):
+        now = time.monotonic()
+        elapsed = now - self._window_start
+        cpu = time.process_time()
+        self.setText(
+            f"{self.ticks / elapsed:5.1f} fps (target {self.clock.fps})  "
+            f"{self.paints / elapsed:5.1f} paints/s  "
+            f"CPU {100 * (cpu - self._cpu_start) / elapsed:5.1f}%"
+        )
+        self.adjustSize()
+
+        self.ticks = self.paints = 0
+        self._window_start = now
+        self._cpu_start = cpu
 
 
 # ================== MAIN GUI ==================
@@ -193,17 +536,30 @@ class JarvisGUI(QMainWindow):
         layout = QHBoxLayout(central)
         layout.setContentsMargins(0, 0, 0, 0)
 
-        layout.addWidget(HexagonPanel())
-        self.reactor = CentralReactor()
+        # One clock drives every panel
+        self.clock = FrameClock(self)
+        QApplication.instance().installEventFilter(self.clock)
+
+        hexagons = HexagonPanel(self.clock)
+        self.reactor = CentralReactor(self.clock)
+        # Engine metrics reach the GUI thread through a queued signal
+        self.metrics_bridge = MetricsBridge(get_metrics(), self)
+        telemetry = TelemetryPanel(self.clock, self.metrics_bridge)
+        layout.addWidget(hexagons)
         layout.addWidget(self.reactor, stretch=2)
-        layout.addWidget(TelemetryPanel())
+        layout.addWidget(telemetry)
+
+        self.overlay = PerformanceOverlay(self.clock, [hexagons, self.reactor, telemetry], self)
+        self.overlay.move(8, 8)
 
     def mousePressEvent(self, event):
         self.toggle_pause()
 
+    @tracing.traced("gui.toggle_pause")
     def toggle_pause(self):
         self.is_paused = not self.is_paused
         self.reactor.set_paused(self.is_paused)
+        self.clock.set_paused(self.is_paused)
 
         if self.is_paused:
             self.pause_event.set()
@@ -217,6 +573,26 @@ class JarvisGUI(QMainWindow):
     def keyPressEvent(self, event):
         if event.key() == Qt.Key.Key_Escape:
             self.close()
+        elif event.key() == Qt.Key.Key_F:
+            self.overlay.toggle()
+
+    def closeEvent(self, event):
+        self.metrics_bridge.close()
+        super().closeEvent(event)
+
+    # Nothing is drawn while minimized or hidden
+    def changeEvent(self, event):
+        if event.type() == QEvent.Type.WindowStateChange:
+            self.clock.set_hidden(self.isMinimized())
+        super().changeEvent(event)
+
+    def showEvent(self, event):
+        self.clock.set_hidden(self.isMinimized())
+        super().showEvent(event)
+
+    def hideEvent(self, event):
+        self.clock.set_hidden(True)
+        super().hideEvent(event)
 
 
 # ================== RUN ==================
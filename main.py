@@ -1,16 +1,23 @@
 import os
 import sys
+import asyncio
 import argparse
 import threading
-import time
 from dotenv import load_dotenv
 
-from core.voice import speak, listen
 from core.registry import SkillRegistry
-from core.engine import JarvisEngine
-from gui.app import run_gui as run_gui_app
+from core.async_engine import AsyncJarvisEngine
+from core.pause import PauseController
+from core.cancel import CancelToken
+from core.streaming import aiter_sentences
+from core.metrics import COMMAND_QUEUE, get_metrics
+from core import tracing
+from core import pool
 
 
+# Voice (speech_recognition, pyttsx3), GUI (PyQt6) and groq are imported on
+# first use, so text mode reaches its prompt without loading any of them.
+
 # ================== ENV SETUP ==================
 load_dotenv()
 
@@ -32,104 +39,352 @@ def is_exit_command(cmd: str) -> bool:
     return cmd.strip().lower() in exit_words
 
 
-# ================== MAIN JARVIS LOOP ==================
-def jarvis_loop(pause_event, registry, args):
-    jarvis = JarvisEngine(registry)
+def is_cancel_command(cmd: str) -> bool:
+    # Only while Jarvis is answering; otherwise "stop" still exits
+    cancel_words = {
+        "stop",
+        "cancel",
+        "never mind",
+        "nevermind",
+        "quiet",
+        "be quiet",
+        "shut up",
+        "stop talking"
+    }
+    return cmd.replace("jarvis", "").strip(" ,.!").lower() in cancel_words
 
-    if args.text:
-        print("JARVIS: Jarvis Online. Ready for command (Text Mode).")
-    else:
-        speak("Jarvis Online. Ready for command.")
+
+# ================== INPUT ==================
+def enqueue_command(commands, user_query):
+    # Runs on the loop
+    commands.put_nowait(user_query)
+    get_metrics().record(COMMAND_QUEUE, commands.qsize())
+
+
+def capture_commands(loop, commands, pause, args):
+    """
+    Capture input on a daemon thread and hand it to the event loop.
+
+    Runs independently of response generation, so the next command (or a
+    barge-in) is heard while Jarvis is still talking. A daemon thread,
+    rather than the loop's executor, so a blocked input() never holds up
+    shutdown.
+    """
+    if not args.text:
+        from core.voice import listen
 
     while True:
-        # Pause handling
-        if pause_event.is_set():
-            time.sleep(0.5)
-            continue
+        pause.wait_resumed()
 
-        # Input
         if args.text:
             try:
-                user_query = input("YOU: ").strip().lower()
+                user_query = input().strip().lower()
             except EOFError:
-                break
+                user_query = None
         else:
-            user_query = listen().strip().lower()
+            # While Jarvis talks only the wake word or "stop" may barge in
+            user_query = listen(
+                while_speaking=lambda q: "jarvis" in q or is_cancel_command(q)
+            ).strip().lower()
 
-        if not user_query or user_query == "none":
+        # Heard while paused
+        if user_query is not None and pause.is_set():
             continue
 
-        # 🔴 GLOBAL EXIT (TOP PRIORITY)
-        if is_exit_command(user_query):
-            print("JARVIS: Shutting down.")
-            if not args.text:
-                speak("Shutting down. Goodbye, sir.")
-            break
+        try:
+            loop.call_soon_threadsafe(enqueue_command, commands, user_query)
+        except RuntimeError:
+            # Loop closed
+            return
 
-        # Pause check again
-        if pause_event.is_set():
-            continue
+        if user_query is None:
+            return
 
-        # Direct commands
-        direct_commands = [
-            "open", "volume", "search", "create", "write", "read", "make",
-            "who", "what", "when", "where", "how", "why", "thank", "hello"
-        ]
 
-        is_direct = any(cmd in user_query for cmd in direct_commands)
+# ================== MAIN JARVIS LOOP ==================
+async def jarvis_loop(pause, registry, args):
+    pause.bind()
+    jarvis = AsyncJarvisEngine(registry)
+    session = None
 
-        # Wake-word filter
-        if "jarvis" not in user_query and not is_direct:
-            print(f"Ignored: {user_query}")
-            continue
+    commands = asyncio.Queue()
+    loop = asyncio.get_running_loop()
+    threading.Thread(
+        target=capture_commands,
+        args=(loop, commands, pause, args),
+        name="jarvis-input",
+        daemon=True
+    ).start()
 
-        clean_query = user_query.replace("jarvis", "").strip()
+    responding = None
+    cancel_token = None
 
-        try:
-            print(f"Thinking: {clean_query}")
-            response = jarvis.run_conversation(clean_query)
+    async def say(text, priority=None):
+        if args.text:
+            print(f"JARVIS: {text}")
+        else:
+            from core.voice import speak
+            await asyncio.to_thread(speak, text, None, priority)
 
-            if pause_event.is_set():
-                continue
+    async def respond(query, token):
+        # Runs in its own task: the request id tags only this answer's spans
+        tracing.new_request()
+        request_span = tracing.span("request", chars=len(query))
+        try:
+            print(f"Thinking: {query}")
+            stream = jarvis.stream_conversation(query, session, token)
 
-            if response:
+            try:
                 if args.text:
-                    print(f"JARVIS: {response}")
+                    # Print tokens as they arrive
+                    print("JARVIS: ", end="", flush=True)
+                    async for chunk in stream:
+                        print(chunk, end="", flush=True)
+                    print()
                 else:
-                    speak(response)
+                    # Queue each sentence as soon as it is complete: the TTS
+                    # worker renders the next one while this one plays
+                    from core.voice import speakable
+                    from core.tts import get_tts
+
+                    tts = get_tts()
+                    last = None
+                    async for sentence in aiter_sentences(stream):
+                        sentence = speakable(sentence)
+                        print(f"JARVIS: {sentence}")
+                        last = tts.say(sentence, cancel_token=token)
+                    if last is not None:
+                        await asyncio.to_thread(last.wait)
+            finally:
+                await stream.aclose()
 
+        except asyncio.CancelledError:
+            print("\nJARVIS: (interrupted)")
+            request_span.set(cancelled=True)
+            raise
         except Exception as e:
             print(f"Main Loop Error: {e}")
+            request_span.set(error=f"{type(e).__name__}: {e}")
+            await say("System error.")
+        finally:
+            request_span.end()
             if args.text:
-                print("JARVIS: System error.")
-            else:
-                speak("System error.")
+                print("YOU: ", end="", flush=True)
+
+    async def interrupt():
+        nonlocal responding, cancel_token
+        if responding is not None and not responding.done():
+            # Token first: kills speech and stops tools running in threads
+            cancel_token.cancel()
+            responding.cancel()
+            await asyncio.gather(responding, return_exceptions=True)
+        responding = None
+        cancel_token = None
+
+    async def cancel_on_pause():
+        # Pausing silences the current answer too
+        while True:
+            await pause.paused()
+            await interrupt()
+            await pause.resumed()
+
+    pause_watcher = asyncio.create_task(cancel_on_pause())
+
+    try:
+        if args.text:
+            print("JARVIS: Jarvis Online. Ready for command (Text Mode).")
+            print("YOU: ", end="", flush=True)
+            # Open LLM/HTTP connections while the user is still typing
+            warm_up()
+        else:
+            warm_up()
+            await say("Jarvis Online. Ready for command.")
+
+        # Kept across turns so follow-up questions have context. Created
+        # after the prompt: it loads the LLM client
+        session = jarvis.new_session()
+
+        while True:
+            user_query = await commands.get()
+            get_metrics().record(COMMAND_QUEUE, commands.qsize())
+
+            if user_query is None:
+                break
+
+            if not user_query or user_query == "none":
+                continue
+
+            # Queued before a pause
+            if pause.is_set():
+                continue
+
+            # ✋ BARGE-IN: stop the answer in progress, keep running
+            if responding is not None and not responding.done() and is_cancel_command(user_query):
+                await interrupt()
+                if args.text:
+                    print("YOU: ", end="", flush=True)
+                continue
+
+            # 🔴 GLOBAL EXIT (TOP PRIORITY)
+            if is_exit_command(user_query):
+                await interrupt()
+                print("JARVIS: Shutting down.")
+                if not args.text:
+                    from core.tts import PRIORITY_HIGH
+                    await say("Shutting down. Goodbye, sir.", PRIORITY_HIGH)
+                break
+
+            # Direct commands
+            direct_commands = [
+                "open", "volume", "search", "create", "write", "read", "make",
+                "who", "what", "when", "where", "how", "why", "thank", "hello"
+            ]
+
+            is_direct = any(cmd in user_query for cmd in direct_commands)
+
+            # Wake-word filter
+            if "jarvis" not in user_query and not is_direct:
+                print(f"Ignored: {user_query}")
+                continue
+
+            clean_query = user_query.replace("jarvis", "").strip()
+
+            # Barge-in: a new command replaces the answer in progress
+            await interrupt()
+            cancel_token = CancelToken()
+            responding = asyncio.create_task(respond(clean_query, cancel_token))
+
+    finally:
+        # Clean shutdown: stop work in flight, then release pools
+        pause_watcher.cancel()
+        await interrupt()
+        await asyncio.gather(pause_watcher, return_exceptions=True)
+        await jarvis.aclose()
+        await pool.aclose_all()
+
+
+def warm_up():
+    if os.environ.get("JARVIS_WARMUP", "1") != "0":
+        pool.warm_up()
+
+
+def export_trace():
+    path = os.environ.get(tracing.TRACE_FILE_ENV)
+    if path and tracing.enabled():
+        count = tracing.export(path)
+        print(f"Trace: {count} spans written to {path}")
+
+
+def run_loop(loop, task):
+    try:
+        loop.run_until_complete(task)
+    except asyncio.CancelledError:
+        pass
+    finally:
+        loop.close()
+
+
+def run_headless(pause, registry, args):
+    loop = asyncio.new_event_loop()
+    task = loop.create_task(jarvis_loop(pause, registry, args))
+    try:
+        loop.run_until_complete(task)
+    except KeyboardInterrupt:
+        # Ctrl+C: cancel and let jarvis_loop clean up
+        task.cancel()
+        try:
+            loop.run_until_complete(task)
+        except asyncio.CancelledError:
+            pass
+        print()
+    finally:
+        loop.close()
+
+
+def run_server(registry, args):
+    """Serve the engine over HTTP/WebSocket (core/server.py) until Ctrl+C."""
+    from core.server import JarvisServer
+
+    async def serve():
+        server = JarvisServer(registry, args.host, args.port)
+        try:
+            warm_up()
+            await server.serve_forever()
+        finally:
+            await server.aclose()
+            await pool.aclose_all()
+
+    loop = asyncio.new_event_loop()
+    task = loop.create_task(serve())
+    try:
+        loop.run_until_complete(task)
+    except KeyboardInterrupt:
+        task.cancel()
+        try:
+            loop.run_until_complete(task)
+        except asyncio.CancelledError:
+            pass
+        print()
+    finally:
+        loop.close()
 
 
 # ================== ENTRY POINT ==================
+def load_registry():
+    """Skills from skill/, with schemas served from the manifest until first use."""
+    registry = SkillRegistry()
+    skills_dir = os.path.join(os.path.dirname(__file__), "skill")
+    registry.load_skills(skills_dir, lazy=True)
+    return registry
+
+
 def main():
     parser = argparse.ArgumentParser(description="JARVIS AI Assistant")
     parser.add_argument("--text", action="store_true", help="Run in text mode (no voice I/O)")
+    parser.add_argument("--serve", action="store_true", help="Serve an HTTP/WebSocket API for several clients")
+    parser.add_argument("--host", default=os.environ.get("JARVIS_SERVER_HOST", "127.0.0.1"))
+    parser.add_argument("--port", type=int, default=int(os.environ.get("JARVIS_SERVER_PORT", "8765")))
     args = parser.parse_args()
 
-    # Load skills
-    registry = SkillRegistry()
-    skills_dir = os.path.join(os.path.dirname(__file__), "skills")
-    registry.load_skills(skills_dir)
+    registry = load_registry()
 
-    # Pause control
-    pause_event = threading.Event()
+    # Pause control (threading.Event-compatible for the GUI)
+    pause = PauseController()
 
-    # Background Jarvis thread
+    if args.serve:
+        # No input loop, voice or GUI: clients talk to the server
+        run_server(registry, args)
+        export_trace()
+        return
+
+    if args.text:
+        # Headless: no Qt, the event loop owns the main thread
+        run_headless(pause, registry, args)
+        export_trace()
+        return
+
+    # Jarvis runs on its own event loop in a background thread
+    loop = asyncio.new_event_loop()
+    task = loop.create_task(jarvis_loop(pause, registry, args))
     t = threading.Thread(
-        target=jarvis_loop,
-        args=(pause_event, registry, args),
+        target=run_loop,
+        args=(loop, task),
+        name="jarvis-loop",
         daemon=True
     )
     t.start()
 
     # GUI must run on main thread
-    run_gui_app(pause_event)
+    from gui.app import run_gui as run_gui_app
+
+    try:
+        run_gui_app(pause)
+    finally:
+        # Window closed: cancel the loop and let it clean up
+        if not task.done():
+            loop.call_soon_threadsafe(task.cancel)
+        t.join(timeout=5)
+        export_trace()
 
 
 if __name__ == "__main__":
@@ -57,6 +57,20 @@ class DateTimeSkill(Skill):
             "get_current_date": self.get_current_date
         }
 
+    def get_intents(self) -> List[Dict[str, Any]]:
+        return [
+            {
+                "pattern": r"(?:what(?:'s| is) the )?(?:current )?time(?: is it)?(?: now)?|what time is it(?: now)?|tell me the time",
+                "function": "get_current_time",
+                "template": "It is {time}, sir."
+            },
+            {
+                "pattern": r"(?:what(?:'s| is) )?(?:the |today's )?date(?: today)?|what day is (?:it|today)",
+                "function": "get_current_date",
+                "template": "Today is {date}."
+            }
+        ]
+
     def get_current_datetime(self) -> str:
         """Get current date and time in IST."""
         try:
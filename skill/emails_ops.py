@@ -1,9 +1,11 @@
 import os
 import json
 import imaplib
-import email
-from typing import List, Dict, Any, Callable
+import threading
+from typing import List, Dict, Any, Callable, Optional
 from core.skill import Skill
+from core.imap_sync import HeaderCache, IMAPSync
+from core.imap_watcher import MailboxWatcher
 
 class EmailSkill(Skill):
     """Skill for checking emails via IMAP."""
@@ -12,6 +14,14 @@ class EmailSkill(Skill):
         self.email_address = os.environ.get("EMAIL_ADDRESS")
         self.email_password = os.environ.get("EMAIL_PASSWORD")
         self.imap_server = os.environ.get("EMAIL_IMAP_SERVER", "imap.gmail.com")
+        self.imap_port = int(os.environ.get("EMAIL_IMAP_PORT", "993"))
+        # EMAIL_IMAP_SSL=0 allows plain IMAP (e.g. a local stand-in server)
+        self.imap_ssl = os.environ.get("EMAIL_IMAP_SSL", "1") != "0"
+        self.cache_file = os.path.expanduser("~/.jarvic_mail_cache.db")
+        self._sync = None
+        self._watcher = None
+        # Tools run concurrently: one IMAPSync (and its lock) and one watcher per skill
+        self._init_lock = threading.Lock()
     
     @property
     def name(self) -> str:
@@ -61,10 +71,48 @@ class EmailSkill(Skill):
         if not self.email_address or not self.email_password:
             raise ValueError("Email credentials not configured. Please add EMAIL_ADDRESS and EMAIL_PASSWORD to .env file.")
         
-        mail = imaplib.IMAP4_SSL(self.imap_server)
+        if self.imap_ssl:
+            mail = imaplib.IMAP4_SSL(self.imap_server, self.imap_port)
+        else:
+            mail = imaplib.IMAP4(self.imap_server, self.imap_port)
         mail.login(self.email_address, self.email_password)
         return mail
 
+    def _get_sync(self) -> IMAPSync:
+        """Header cache + incremental sync, created on first use."""
+        if self._sync is None:
+            with self._init_lock:
+                if self._sync is None:
+                    self._sync = IMAPSync(HeaderCache(self.cache_file))
+        return self._sync
+
+    def _get_watcher(self) -> Optional[MailboxWatcher]:
+        """
+        Background IMAP session (IDLE) that keeps counts in memory.
+        Disabled with EMAIL_WATCH=0 or when credentials are missing.
+        """
+        if os.environ.get("EMAIL_WATCH", "1") == "0":
+            return None
+        if not self.email_address or not self.email_password:
+            return None
+
+        if self._watcher is None:
+            sync = self._get_sync()
+            with self._init_lock:
+                if self._watcher is None:
+                    watcher = MailboxWatcher(self._connect_imap, sync)
+                    watcher.start()
+                    self._watcher = watcher
+        return self._watcher
+
+    def _watcher_snapshot(self) -> Optional[Dict[str, Any]]:
+        watcher = self._get_watcher()
+        if watcher is None:
+            return None
+        # The first call may wait for the session to come up
+        watcher.wait_ready(timeout=5)
+        return watcher.snapshot()
+
     def check_unread_emails(self) -> str:
         """
         Check the number of unread emails.
@@ -73,6 +121,15 @@ class EmailSkill(Skill):
             JSON string with unread count
         """
         try:
+            snapshot = self._watcher_snapshot()
+            if snapshot is not None:
+                unread_count = snapshot["unread_count"]
+                return json.dumps({
+                    "status": "success",
+                    "unread_count": unread_count,
+                    "message": f"You have {unread_count} unread email(s)"
+                })
+            
             mail = self._connect_imap()
             mail.select('inbox')
             
@@ -120,52 +177,40 @@ class EmailSkill(Skill):
             JSON string with email list
         """
         try:
-            mail = self._connect_imap()
-            mail.select('inbox')
-            
-            # Get all emails
-            status, messages = mail.search(None, 'ALL')
+            count = max(1, int(count or 5))
             
-            if status != 'OK':
-                mail.logout()
+            snapshot = self._watcher_snapshot()
+            if snapshot is not None and count <= len(snapshot["recent"]):
+                emails = [
+                    {
+                        "from": message["from"],
+                        "subject": message["subject"],
+                        "date": message["date"],
+                        "unread": message["unread"]
+                    }
+                    for message in snapshot["recent"][:count]
+                ]
                 return json.dumps({
-                    "status": "error",
-                    "message": "Failed to fetch emails"
+                    "status": "success",
+                    "count": len(emails),
+                    "emails": emails
                 })
             
-            email_ids = messages[0].split()
-            
-            # Get the last N emails
-            recent_ids = email_ids[-count:] if len(email_ids) >= count else email_ids
-            recent_ids = reversed(recent_ids)  # Most recent first
-            
-            emails = []
-            
-            for email_id in recent_ids:
-                status, msg_data = mail.fetch(email_id, '(RFC822)')
-                
-                if status == 'OK':
-                    email_body = msg_data[0][1]
-                    message = email.message_from_bytes(email_body)
-                    
-                    subject = message['subject']
-                    sender = message['from']
-                    
-                    # Decode subject if needed
-                    if subject:
-                        decoded_subject = email.header.decode_header(subject)[0]
-                        if isinstance(decoded_subject[0], bytes):
-                            subject = decoded_subject[0].decode(decoded_subject[1] or 'utf-8')
-                        else:
-                            subject = decoded_subject[0]
-                    
-                    emails.append({
-                        "from": sender,
-                        "subject": subject or "(No Subject)"
-                    })
+            mail = self._connect_imap()
             
-            mail.close()
-            mail.logout()
+            try:
+                # Only headers of messages not seen by a previous sync are fetched
+                emails = [
+                    {
+                        "from": message["from"],
+                        "subject": message["subject"],
+                        "date": message["date"],
+                        "unread": message["unread"]
+                    }
+                    for message in self._get_sync().recent(mail, count)
+                ]
+            finally:
+                mail.logout()
             
             return json.dumps({
                 "status": "success",
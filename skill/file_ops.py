@@ -2,8 +2,12 @@ import os
 import json
 from typing import List, Dict, Any, Callable
 from core.skill import Skill
+from core.file_reader import READ_WINDOW_PROPERTIES, read_window
 
 class FileSkill(Skill):
+    # Writes and appends to the same Desktop files must not interleave
+    thread_safe = False
+
     @property
     def name(self) -> str:
         return "file_skill"
@@ -20,7 +24,8 @@ class FileSkill(Skill):
                         "properties": {
                             "action": {"type": "string", "enum": ["read", "write", "create", "append"]},
                             "filename": {"type": "string"},
-                            "content": {"type": "string"}
+                            "content": {"type": "string"},
+                            **READ_WINDOW_PROPERTIES
                         },
                         "required": ["action", "filename"]
                     }
@@ -33,16 +38,36 @@ class FileSkill(Skill):
             "manage_file": self.manage_file
         }
 
-    def manage_file(self, action: str, filename: str, content: str = ""):
+    def manage_file(
+        self,
+        action: str,
+        filename: str,
+        content: str = "",
+        mode: str = "head",
+        offset: int = 0,
+        limit_bytes: int = None,
+        lines: int = None,
+        pattern: str = None
+    ):
         try:
             desktop_path = os.path.join(os.path.expanduser("~"), "Desktop")
             filepath = os.path.join(desktop_path, filename)
             
             if action == "read":
                 if os.path.exists(filepath):
-                    with open(filepath, 'r') as f:
-                        data = f.read()
-                    return json.dumps({"status": "success", "content": data})
+                    window = read_window(filepath, mode or "head", offset, limit_bytes, lines, pattern)
+                    result = {
+                        "status": "success",
+                        "mode": window["mode"],
+                        "content": window["content"],
+                        "encoding": window["encoding"],
+                        "range": [window["start"], window["end"]],
+                        "next_offset": window["next_offset"],
+                        "has_more": window["next_offset"] is not None
+                    }
+                    if "matches" in window:
+                        result["line_offsets"] = [match["offset"] for match in window["matches"]]
+                    return json.dumps(result)
                 else:
                     return json.dumps({"error": "File not found."})
             
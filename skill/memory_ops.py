@@ -1,38 +1,73 @@
 import os
 import json
-from typing import List, Dict, Any, Callable
+import difflib
+import threading
+from typing import List, Dict, Any, Callable, Tuple
 from core.skill import Skill
+from core.memory_store import open_memory_store
+
+# Recall results scoring below this are treated as unrelated
+MIN_RECALL_SCORE = 0.3
 
 class MemorySkill(Skill):
     """Skill for persistent memory storage and retrieval."""
     
     def __init__(self):
-        # Store memory in user's home directory
+        # Store memory in user's home directory. The JSON file is the legacy
+        # format: imported once into SQLite and kept as an export target.
         self.memory_file = os.path.expanduser("~/.jarvic_memory.json")
-        self._ensure_memory_file()
+        self.memory_db = os.path.expanduser("~/.jarvic_memory.db")
+        self.store = open_memory_store(self.memory_db, self.memory_file)
+
+        # Vector indexes over keys and values, built on first recall
+        self._indexes = None
+        self._indexes_lock = threading.Lock()
     
     @property
     def name(self) -> str:
         return "memory_skill"
 
-    def _ensure_memory_file(self):
-        """Create memory file if it doesn't exist."""
-        if not os.path.exists(self.memory_file):
-            with open(self.memory_file, 'w') as f:
-                json.dump({}, f)
+    def export_memories(self, path: str = None) -> str:
+        """Write all memories to a JSON file (defaults to the legacy file)."""
+        self.store.export_json(path or self.memory_file)
+        return path or self.memory_file
 
-    def _load_memory(self) -> dict:
-        """Load memory from file."""
-        try:
-            with open(self.memory_file, 'r') as f:
-                return json.load(f)
-        except:
-            return {}
+    def _get_indexes(self):
+        """(key index, value index), or None when NumPy is unavailable."""
+        with self._indexes_lock:
+            if self._indexes is None:
+                try:
+                    from core.vector_index import VectorIndex
+                except ImportError:
+                    self._indexes = False
+                    return None
+
+                key_index, value_index = VectorIndex(), VectorIndex()
+                for key, value in self.store.all().items():
+                    key_index.upsert(key, key)
+                    value_index.upsert(key, value)
+                self._indexes = (key_index, value_index)
+
+            return self._indexes or None
+
+    def _rank_memories(self, query: str, top_n: int) -> List[Tuple[str, float]]:
+        """Best matching keys for query by fuzzy key match and value similarity."""
+        indexes = self._get_indexes()
+        scores: Dict[str, float] = {}
 
-    def _save_memory(self, memory: dict):
-        """Save memory to file."""
-        with open(self.memory_file, 'w') as f:
-            json.dump(memory, f, indent=2)
+        if indexes:
+            key_index, value_index = indexes
+            for key, score in key_index.search(query, top_n * 2):
+                scores[key] = max(scores.get(key, 0.0), score)
+            for key, score in value_index.search(query, top_n * 2):
+                # Value hits are weaker evidence than a matching key
+                scores[key] = max(scores.get(key, 0.0), score * 0.8)
+        else:
+            for key in self.store.all():
+                scores[key] = difflib.SequenceMatcher(None, query.lower(), key.lower()).ratio()
+
+        ranked = sorted(scores.items(), key=lambda item: item[1], reverse=True)
+        return [(key, score) for key, score in ranked[:top_n] if score >= MIN_RECALL_SCORE]
 
     def get_tools(self) -> List[Dict[str, Any]]:
         return [
@@ -74,6 +109,27 @@ class MemorySkill(Skill):
                     }
                 }
             },
+            {
+                "type": "function",
+                "function": {
+                    "name": "recall_memory",
+                    "description": "Search memory for facts related to a topic when the exact key is unknown. Returns only the best matches.",
+                    "parameters": {
+                        "type": "object",
+                        "properties": {
+                            "query": {
+                                "type": "string",
+                                "description": "What to look for (e.g., 'birthday', 'wife's car')"
+                            },
+                            "top_n": {
+                                "type": "integer",
+                                "description": "Maximum number of matches to return (default: 5)"
+                            }
+                        },
+                        "required": ["query"]
+                    }
+                }
+            },
             {
                 "type": "function",
                 "function": {
@@ -109,6 +165,7 @@ class MemorySkill(Skill):
         return {
             "remember_fact": self.remember_fact,
             "retrieve_memory": self.retrieve_memory,
+            "recall_memory": self.recall_memory,
             "list_all_memories": self.list_all_memories,
             "forget_fact": self.forget_fact
         }
@@ -125,9 +182,12 @@ class MemorySkill(Skill):
             JSON string with status
         """
         try:
-            memory = self._load_memory()
-            memory[key] = value
-            self._save_memory(memory)
+            self.store.set(key, value)
+
+            indexes = self._indexes
+            if indexes:
+                indexes[0].upsert(key, key)
+                indexes[1].upsert(key, value)
             
             return json.dumps({
                 "status": "success",
@@ -152,19 +212,62 @@ class MemorySkill(Skill):
             JSON string with the stored value
         """
         try:
-            memory = self._load_memory()
+            value = self.store.get(item_name)
             
-            if item_name in memory:
+            if value is not None:
                 return json.dumps({
                     "status": "success",
                     "item_name": item_name,
-                    "value": memory[item_name]
+                    "value": value
                 })
             else:
-                return json.dumps({
+                # Offer close matches instead of making the model list everything
+                suggestions = [
+                    {"key": key, "value": self.store.get(key)}
+                    for key, _ in self._rank_memories(item_name, 3)
+                ]
+                result = {
                     "status": "not_found",
                     "message": f"I don't remember anything about '{item_name}'"
+                }
+                if suggestions:
+                    result["closest_matches"] = suggestions
+                return json.dumps(result)
+        except Exception as e:
+            return json.dumps({
+                "status": "error",
+                "message": f"Failed to recall memory: {str(e)}"
+            })
+
+    def recall_memory(self, query: str, top_n: int = 5) -> str:
+        """
+        Find the memories most related to a query.
+        
+        Args:
+            query: Topic or approximate key to look for
+            top_n: Maximum number of matches
+            
+        Returns:
+            JSON string with the ranked matches
+        """
+        try:
+            top_n = max(1, min(int(top_n or 5), 20))
+            matches = [
+                {"key": key, "value": self.store.get(key), "score": round(score, 3)}
+                for key, score in self._rank_memories(query, top_n)
+            ]
+            
+            if not matches:
+                return json.dumps({
+                    "status": "not_found",
+                    "message": f"I don't remember anything related to '{query}'"
                 })
+            
+            return json.dumps({
+                "status": "success",
+                "count": len(matches),
+                "matches": matches
+            })
         except Exception as e:
             return json.dumps({
                 "status": "error",
@@ -179,7 +282,7 @@ class MemorySkill(Skill):
             JSON string with all memories
         """
         try:
-            memory = self._load_memory()
+            memory = self.store.all()
             
             if not memory:
                 return json.dumps({
@@ -210,12 +313,11 @@ class MemorySkill(Skill):
             JSON string with status
         """
         try:
-            memory = self._load_memory()
-            
-            if key in memory:
-                del memory[key]
-                self._save_memory(memory)
-                
+            if self.store.delete(key):
+                indexes = self._indexes
+                if indexes:
+                    indexes[0].remove(key)
+                    indexes[1].remove(key)
                 return json.dumps({
                     "status": "success",
                     "message": f"I have forgotten about '{key}'"
@@ -34,6 +34,28 @@ class SystemSkill(Skill):
             "open_app": self.open_app
         }
 
+    def get_intents(self) -> List[Dict[str, Any]]:
+        return [
+            {
+                "pattern": r"(?:set |change |turn )?(?:the )?volume(?: to| at)? (?P<level>\d{1,3})(?: percent| ?%)?",
+                "function": "set_volume",
+                "template": "Volume set to {level} percent."
+            },
+            {
+                # Files, mail, media and timers are not apps: leave those to the LLM
+                "pattern": (
+                    # Not "start": "start over", "start listening"
+                    r"(?:open|launch) (?:the )?"
+                    r"(?!(?:a|an|the|my|new|this|that|file|files|folder|directory|document|email|mail|inbox"
+                    r"|memory|note|notes|music|song|playlist|video|timer)\b)"
+                    r"(?P<app_name>[a-z0-9\-]+(?: [a-z0-9\-]+){0,2})(?: app)?"
+                ),
+                "function": "open_app",
+                "template": "Opening {app_name}.",
+                "confidence": 0.9
+            }
+        ]
+
     def set_volume(self, level):
         try:
             os.system(f"osascript -e 'set volume output volume {level}'")
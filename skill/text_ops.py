@@ -2,6 +2,25 @@ import os
 import json
 from typing import List, Dict, Any, Callable
 from core.skill import Skill
+from core.cache import cached
+from core.file_reader import READ_WINDOW_PROPERTIES, BinaryFileError, read_window
+
+
+def resolve_path(filepath: str) -> str:
+    """Expand ~ and fall back to the Desktop for bare filenames."""
+    filepath = os.path.expanduser(filepath)
+
+    if not os.path.exists(filepath):
+        desktop_path = os.path.join(os.path.expanduser("~"), "Desktop", filepath)
+        if os.path.exists(desktop_path):
+            filepath = desktop_path
+
+    return filepath
+
+
+def _is_success(result: str) -> bool:
+    return '"status": "success"' in result
+
 
 class TextSkill(Skill):
     """Skill for reading and summarizing text from files using Groq AI."""
@@ -36,14 +55,15 @@ class TextSkill(Skill):
                 "type": "function",
                 "function": {
                     "name": "read_file_content",
-                    "description": "Read and return the raw content of a text file",
+                    "description": "Read part of a text file (start, end or matching lines). Large files are paginated: follow next_offset to read more.",
                     "parameters": {
                         "type": "object",
                         "properties": {
                             "filepath": {
                                 "type": "string",
                                 "description": "Absolute path to the file to read"
-                            }
+                            },
+                            **READ_WINDOW_PROPERTIES
                         },
                         "required": ["filepath"]
                     }
@@ -57,25 +77,32 @@ class TextSkill(Skill):
             "read_file_content": self.read_file_content
         }
 
-    def read_file_content(self, filepath: str) -> str:
+    def read_file_content(
+        self,
+        filepath: str,
+        mode: str = "head",
+        offset: int = 0,
+        limit_bytes: int = None,
+        lines: int = None,
+        pattern: str = None
+    ) -> str:
         """
-        Read the content of a text file.
+        Read a bounded window of a text file.
         
         Args:
             filepath: Path to the file
+            mode: "head", "tail" or "grep"
+            offset: Byte cursor from a previous call's next_offset
+            limit_bytes: Maximum bytes returned
+            lines: Maximum lines returned
+            pattern: Regular expression for grep mode
             
         Returns:
-            JSON string with file content or error
+            JSON string with file content (plus continuation cursor) or error
         """
         try:
-            # Expand user path if necessary
-            filepath = os.path.expanduser(filepath)
-            
-            # Check if file exists, if not check Desktop
-            if not os.path.exists(filepath):
-                desktop_path = os.path.join(os.path.expanduser("~"), "Desktop", filepath)
-                if os.path.exists(desktop_path):
-                    filepath = desktop_path
+            # Expand user path and check the Desktop if necessary
+            filepath = resolve_path(filepath)
             
             if not os.path.exists(filepath):
                 return json.dumps({
@@ -89,17 +116,26 @@ class TextSkill(Skill):
                     "message": f"Path is not a file: {filepath}"
                 })
             
-            with open(filepath, 'r', encoding='utf-8') as f:
-                content = f.read()
+            window = read_window(filepath, mode or "head", offset, limit_bytes, lines, pattern)
             
-            return json.dumps({
+            result = {
                 "status": "success",
                 "filepath": filepath,
-                "content": content,
-                "length": len(content)
-            })
+                "mode": window["mode"],
+                "content": window["content"],
+                "length": len(window["content"]),
+                "encoding": window["encoding"],
+                "file_size": window["size"],
+                "range": [window["start"], window["end"]],
+                "next_offset": window["next_offset"],
+                "has_more": window["next_offset"] is not None
+            }
+            if "matches" in window:
+                # Lets a truncated grep result resume at the first line it dropped
+                result["line_offsets"] = [match["offset"] for match in window["matches"]]
+            return json.dumps(result)
             
-        except UnicodeDecodeError:
+        except (UnicodeDecodeError, BinaryFileError):
             return json.dumps({
                 "status": "error",
                 "message": "File is not a valid text file (binary or encoding issue)"
@@ -110,62 +146,58 @@ class TextSkill(Skill):
                 "message": f"Error reading file: {str(e)}"
             })
 
-    def summarize_file(self, filepath: str) -> str:
+    @cached("summaries", ttl=24 * 3600, file_arg="filepath", file_resolver=resolve_path,
+            cache_if=_is_success, persistent=True)
+    def summarize_file(self, filepath: str, cancel_token=None) -> str:
         """
         Read a file and generate a summary using Groq AI.
         
         Args:
             filepath: Path to the file to summarize
+            cancel_token: Set by the engine; stops the chunk calls on barge-in
             
         Returns:
             JSON string with summary or error
         """
-        # First read the file
-        read_result = json.loads(self.read_file_content(filepath))
+        filepath = resolve_path(filepath)
         
-        if read_result["status"] == "error":
-            return json.dumps(read_result)
-        
-        content = read_result["content"]
+        if not os.path.isfile(filepath):
+            return json.dumps({
+                "status": "error",
+                "message": f"File not found: {filepath}"
+            })
         
         # If file is too short, just return the content
-        if len(content) < 100:
+        if os.path.getsize(filepath) < 100:
+            read_result = json.loads(self.read_file_content(filepath))
+            if read_result["status"] == "error":
+                return json.dumps(read_result)
             return json.dumps({
                 "status": "success",
-                "summary": "File is too short to summarize. Content: " + content
+                "summary": "File is too short to summarize. Content: " + read_result["content"]
             })
         
         try:
-            from groq import Groq
-            
-            client = Groq(api_key=self.api_key)
-            
-            # Generate summary using Groq
-            response = client.chat.completions.create(
-                model="llama-3.3-70b-versatile",
-                messages=[
-                    {
-                        "role": "system",
-                        "content": "You are a helpful assistant that summarizes text concisely. Provide a clear, brief summary in 2-3 sentences."
-                    },
-                    {
-                        "role": "user",
-                        "content": f"Please summarize the following text:\n\n{content[:4000]}"  # Limit to avoid token issues
-                    }
-                ],
-                max_tokens=150
-            )
+            from core.pool import get_llm_client
+            from core.summarizer import MapReduceSummarizer
             
-            summary = response.choices[0].message.content
+            # Whole file, streamed in chunks; unchanged chunks hit the cache
+            result = MapReduceSummarizer(get_llm_client()).summarize(filepath, cancel_token=cancel_token)
             
             return json.dumps({
                 "status": "success",
                 "filepath": filepath,
-                "summary": summary
+                "summary": result["summary"],
+                "chunks": result["chunks"]
             })
             
+        except UnicodeDecodeError:
+            return json.dumps({
+                "status": "error",
+                "message": "File is not a valid text file (binary or encoding issue)"
+            })
         except Exception as e:
             return json.dumps({
                 "status": "error",
                 "message": f"Error generating summary: {str(e)}"
-            })
\ No newline at end of file
+            })
@@ -2,6 +2,15 @@ import os
 import json
 from typing import List, Dict, Any, Callable
 from core.skill import Skill
+from core.cache import cached
+
+
+# A word of a city name, but not a conjunction, date or time word
+_CITY_WORD = (
+    r"(?!(?:and|or|my|our|the|a|next|this|last|tomorrow|tonight|today|yesterday|now|right|week|weekend"
+    r"|morning|afternoon|evening|night|monday|tuesday|wednesday|thursday|friday|saturday|sunday"
+    r"|in|at|on|for|to|trip|forecast|hourly|daily)\b)[a-z.\-]+"
+)
 
 
 class WeatherSkill(Skill):
@@ -58,15 +67,37 @@ class WeatherSkill(Skill):
             "get_current_location_weather": self.get_current_location_weather
         }
 
+    def get_intents(self) -> List[Dict[str, Any]]:
+        return [
+            {
+                # One to three name words; "and", dates and "my trip to..." go to the LLM
+                "pattern": (
+                    r"(?:what(?:'s| is) the |how(?:'s| is) the )?weather (?:like )?(?:in|for|at) "
+                    rf"(?P<city>{_CITY_WORD}(?: {_CITY_WORD}){{0,2}})(?: today| now| right now)?"
+                ),
+                "function": "get_weather",
+                "template": "{result}",
+                "confidence": 0.9
+            }
+        ]
+
     # ================== WEATHER LOGIC ==================
+    @cached(
+        "weather",
+        ttl=600,
+        normalize={"city": lambda c: " ".join(str(c).lower().split()), "pincode": lambda p: str(p).strip()},
+        cache_if=lambda result: result.startswith("The current weather"),
+        persistent=True
+    )
     def get_weather(self, city: str, pincode: str = None) -> str:
         if not self.api_key:
             return "Weather service is not configured. Please add the OpenWeatherMap API key."
 
         try:
-            import requests
+            from core.pool import get_http_session
 
-            url = "https://api.openweathermap.org/data/2.5/weather"
+            # OPENWEATHERMAP_URL points at a stand-in server (bench/fake_weather.py)
+            url = os.environ.get("OPENWEATHERMAP_URL", "https://api.openweathermap.org/data/2.5/weather")
             params = {
                 "appid": self.api_key,
                 "units": "metric"
@@ -79,7 +110,7 @@ class WeatherSkill(Skill):
             else:
                 params["q"] = city
 
-            response = requests.get(url, params=params, timeout=10)
+            response = get_http_session().get(url, params=params, timeout=10)
 
             if response.status_code != 200:
                 return f"I couldn't find the weather for {city}. Please try another location."
@@ -25,6 +25,22 @@ class WebSkill(Skill):
             "google_search": self.google_search
         }
 
+    def get_intents(self) -> List[Dict[str, Any]]:
+        return [
+            {
+                # "Search my email/files/notes for ..." is a local search, not Google
+                "pattern": (
+                    r"(?:search|google)(?: google)?(?: for)? "
+                    r"(?!(?:(?:in|inside|through) )?(?:my|(?:the )?(?:emails?|mail|inbox|files?|folders?|documents?"
+                    r"|memory|memories|notes|computer|desktop|downloads))\b)"
+                    r"(?P<search_term>.+)"
+                ),
+                "function": "google_search",
+                "template": "Searching Google for {search_term}.",
+                "confidence": 0.9
+            }
+        ]
+
     def google_search(self, search_term):
         try:
             webbrowser.open(f"https://www.google.com/search?q={search_term}")
@@ -0,0 +1,5 @@
+import os
+import sys
+
+# The repo is run from its root (python main.py), not installed
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,120 @@
+import json
+
+import pytest
+
+from core.file_reader import DEFAULT_LIMIT_BYTES, read_window
+from core.session import truncate_tool_output
+
+MAX_CHARS = 4000
+WORDS = ["alpha", "beta", "gämma", "δέλτα", "日本語", 'quote"d', "tab\there"]
+
+
+@pytest.fixture
+def text_file(tmp_path):
+    lines = [
+        f"{i:05d} " + " ".join(WORDS[(i * 7 + j) % len(WORDS)] for j in range(8)) + "\n"
+        for i in range(2000)
+    ]
+    path = tmp_path / "notes.txt"
+    path.write_text("".join(lines), encoding="utf-8")
+    return path
+
+
+def as_tool_result(window):
+    """The JSON a file skill returns for a window (see TextSkill.read_file_content)."""
+    result = {
+        "status": "success",
+        "mode": window["mode"],
+        "content": window["content"],
+        "encoding": window["encoding"],
+        "range": [window["start"], window["end"]],
+        "next_offset": window["next_offset"],
+        "has_more": window["next_offset"] is not None
+    }
+    if "matches" in window:
+        result["line_offsets"] = [match["offset"] for match in window["matches"]]
+    return json.dumps(result)
+
+
+def read_all(path, mode, limit_bytes=None, max_chars=None, **kwargs):
+    """Follow next_offset to the end; returns the pieces in file order."""
+    pieces, offset = [], 0
+    while True:
+        text = as_tool_result(read_window(str(path), mode, offset, limit_bytes, **kwargs))
+        if max_chars:
+            text = truncate_tool_output(text, max_chars)
+            assert len(text) <= max_chars
+        result = json.loads(text)
+        pieces.append(result["content"])
+        offset = result["next_offset"]
+        if offset is None:
+            break
+    return pieces[::-1] if mode == "tail" else pieces
+
+
+def test_head_cursor_covers_the_file(text_file):
+    data = text_file.read_bytes()
+    window = read_window(str(text_file), limit_bytes=1000)
+    assert window["start"] == 0 and window["end"] <= 1000
+    assert window["content"].endswith("\n")
+    assert window["next_offset"] == window["end"]
+    assert "".join(read_all(text_file, "head", 1000)).encode() == data
+
+
+def test_tail_cursor_reads_backwards(text_file):
+    data = text_file.read_bytes()
+    window = read_window(str(text_file), "tail", lines=3)
+    assert window["content"].encode() == b"".join(data.splitlines(keepends=True)[-3:])
+    assert "".join(read_all(text_file, "tail", lines=50)).encode() == data
+
+
+def test_grep_cursor_finds_every_match(text_file):
+    expected = [line for line in text_file.read_text(encoding="utf-8").splitlines() if "00042" in line or "01042" in line]
+    found = "\n".join(read_all(text_file, "grep", pattern="0[01]042", lines=1)).splitlines()
+    assert found == expected
+
+
+def test_default_window_fits_the_tool_output_cap(tmp_path):
+    path = tmp_path / "plain.txt"
+    path.write_text("".join(f"line {i} of a plain ascii log file\n" for i in range(5000)))
+    text = as_tool_result(read_window(str(path)))
+    assert json.loads(text)["range"][1] <= DEFAULT_LIMIT_BYTES
+    assert truncate_tool_output(text, MAX_CHARS) == text
+
+
+@pytest.mark.parametrize("mode, kwargs", [
+    ("head", {}),
+    ("tail", {"lines": 400}),
+    ("grep", {"pattern": "日本語", "lines": 200}),
+])
+@pytest.mark.parametrize("limit_bytes", [None, 16 * 1024])
+def test_truncation_never_skips_unread_bytes(text_file, mode, kwargs, limit_bytes):
+    pieces = read_all(text_file, mode, limit_bytes, MAX_CHARS, **kwargs)
+    text = text_file.read_text(encoding="utf-8")
+    if mode == "grep":
+        assert "\n".join(pieces).splitlines() == [line for line in text.splitlines() if "日本語" in line]
+    else:
+        assert "".join(pieces) == text
+
+
+def test_truncated_window_content_matches_its_range(text_file):
+    data = text_file.read_bytes()
+    text = truncate_tool_output(as_tool_result(read_window(str(text_file), limit_bytes=16 * 1024)), MAX_CHARS)
+    result = json.loads(text)
+    start, end = result["range"]
+    assert result["truncated"] and result["has_more"]
+    assert result["next_offset"] == end
+    assert data[start:end].decode("utf-8") == result["content"]
+
+
+def test_other_json_keeps_small_fields():
+    text = json.dumps({"status": "success", "body": "x" * 10000, "next_page": 2})
+    result = json.loads(truncate_tool_output(text, 1000))
+    assert result["status"] == "success" and result["next_page"] == 2
+    assert "omitted" in result["body"]
+
+
+def test_plain_text_is_cut_in_the_middle():
+    text = "head " + "x" * 5000 + " tail"
+    cut = truncate_tool_output(text, 200)
+    assert len(cut) <= 200 and cut.startswith("head") and cut.endswith("tail")
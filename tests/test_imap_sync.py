@@ -0,0 +1,127 @@
+import imaplib
+import threading
+
+import pytest
+
+from bench.fake_imap import FakeIMAPServer, FakeMailbox, seed
+from core.imap_sync import HeaderCache, IMAPSync, parse_fetch_response
+
+
+def test_parse_fetch_response_with_literals_and_trailing_flags():
+    data = [
+        (b"1 (UID 10 BODY[HEADER.FIELDS (FROM SUBJECT DATE)] {20}", b"Subject: Hello\r\n\r\n"),
+        b" FLAGS (\\Seen))",
+        (b"2 (UID 11 FLAGS () BODY[HEADER.FIELDS (FROM SUBJECT DATE)] {20}", b"Subject: World\r\n\r\n"),
+        b")",
+        b"3 (UID 12 FLAGS (\\Seen \\Flagged))",
+    ]
+    assert parse_fetch_response(data) == [
+        {"uid": 10, "flags": ["\\Seen"], "header": b"Subject: Hello\r\n\r\n"},
+        {"uid": 11, "flags": [], "header": b"Subject: World\r\n\r\n"},
+        {"uid": 12, "flags": ["\\Seen", "\\Flagged"], "header": b""},
+    ]
+
+
+def test_parse_fetch_response_skips_records_without_uid():
+    assert parse_fetch_response([b"1 (FLAGS (\\Seen))", None]) == []
+    assert parse_fetch_response(None) == []
+
+
+@pytest.fixture
+def server():
+    server = FakeIMAPServer(mailbox=seed(FakeMailbox(), 30, unread=5)).start()
+    yield server
+    server.stop()
+
+
+@pytest.fixture
+def mail(server):
+    mail = imaplib.IMAP4("127.0.0.1", server.port)
+    mail.login("user", "password")
+    yield mail
+    mail.logout()
+
+
+@pytest.fixture
+def sync(tmp_path):
+    return IMAPSync(HeaderCache(str(tmp_path / "mail.db")), window=10)
+
+
+def subjects(headers):
+    return [header["subject"] for header in headers]
+
+
+def test_cold_sync_caches_the_newest_window(server, mail, sync):
+    state = sync.sync(mail)
+    assert state["exists"] == 30 and state["uidnext"] == 31
+    assert sync.cache.uids("INBOX") == list(range(21, 31))
+
+    recent = sync.cache.recent("INBOX", 3)
+    assert subjects(recent) == ["Message 30", "Message 29", "Message 28"]
+    assert [header["unread"] for header in recent] == [True, True, True]
+
+
+def test_warm_sync_fetches_only_new_messages(server, mail, sync):
+    sync.sync(mail)
+    server.mailbox.add("New <new@example.com>", "Fresh one")
+    server.command_log.clear()
+
+    sync.sync(mail)
+    fetches = [command for command in server.command_log if "FETCH" in command and "HEADER" in command]
+    assert fetches == ["UID FETCH 31:* (UID FLAGS BODY.PEEK[HEADER.FIELDS (FROM SUBJECT DATE)])"]
+    assert subjects(sync.cache.recent("INBOX", 1)) == ["Fresh one"]
+
+
+def test_flag_changes_and_expunges_are_applied(server, mail, sync):
+    sync.sync(mail)
+    server.mailbox.set_seen(30)
+    server.mailbox.expunge(29)
+
+    sync.sync(mail)
+    recent = sync.cache.recent("INBOX", 2)
+    assert [(header["uid"], header["unread"]) for header in recent] == [(30, False), (28, True)]
+
+
+def test_uidvalidity_change_resets_the_cache(server, mail, sync):
+    sync.sync(mail)
+    server.mailbox.uidvalidity = 2
+    server.mailbox.messages = server.mailbox.messages[:5]
+
+    sync.sync(mail)
+    assert sync.cache.uids("INBOX") == [1, 2, 3, 4, 5]
+
+
+def test_recent_backfills_older_headers(server, mail, sync):
+    recent = sync.recent(mail, 15)
+    assert subjects(recent) == [f"Message {n}" for n in range(30, 15, -1)]
+
+
+def test_concurrent_syncs_fetch_new_messages_once(server, sync):
+    connections = []
+    for _ in range(4):
+        connection = imaplib.IMAP4("127.0.0.1", server.port)
+        connection.login("user", "password")
+        connections.append(connection)
+    try:
+        sync.sync(connections[0])
+        server.mailbox.add("New <new@example.com>", "Only once")
+        server.command_log.clear()
+
+        barrier = threading.Barrier(len(connections))
+
+        def run(connection):
+            barrier.wait()
+            sync.sync(connection)
+
+        threads = [threading.Thread(target=run, args=(c,)) for c in connections]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        header_fetches = [command for command in server.command_log if "HEADER" in command]
+        assert len(header_fetches) == 1
+        assert sync.cache.get_state("INBOX")["uidnext"] == 32
+    finally:
+        for connection in connections:
+            connection.logout()
@@ -0,0 +1,109 @@
+import time
+import asyncio
+
+import pytest
+
+from core.intent import IntentRouter
+from core.executor import ToolExecutor
+from core.registry import SkillRegistry
+
+
+@pytest.fixture(scope="module")
+def router(tmp_path_factory):
+    registry = SkillRegistry()
+    manifest = str(tmp_path_factory.mktemp("manifest") / "skills.json")
+    registry.load_skills("skill", lazy=True, manifest_path=manifest)
+    router = IntentRouter(registry, threshold=0.8)
+    yield router
+    router.executor.shutdown()
+
+
+def routed_to(router, query):
+    """(function, args) the query would run locally, or None for the LLM path."""
+    found = router.match(query)
+    if not found or found[2] < router.threshold:
+        return None
+    return found[0]["function"], found[1]
+
+
+@pytest.mark.parametrize("query", [
+    "open file notes.txt",
+    "open notes.txt",
+    "start the music",
+    "start over",
+    "start listening",
+    "search my email for invoices",
+    "search files for budget",
+    "search the notes for the wifi password",
+    "weather in pune and delhi and my unread email count",
+    "weather in pune, delhi",
+    "weather in mumbai tomorrow",
+    "weather for my trip to goa next week",
+    "what should I wear given the weather",
+])
+def test_ambiguous_queries_go_to_the_llm(router, query):
+    assert routed_to(router, query) is None
+
+
+@pytest.mark.parametrize("query, function, args", [
+    ("open spotify", "open_app", {"app_name": "spotify"}),
+    ("Jarvis, launch visual studio code", "open_app", {"app_name": "visual studio code"}),
+    ("search for python tutorials", "google_search", {"search_term": "python tutorials"}),
+    ("what's the weather in new york?", "get_weather", {"city": "new york"}),
+    ("weather in paris right now", "get_weather", {"city": "paris"}),
+    ("set volume to 40 percent", "set_volume", {"level": 40}),
+    ("hey jarvis, what time is it", "get_current_time", {}),
+])
+def test_plain_commands_take_the_fast_path(router, query, function, args):
+    assert routed_to(router, query) == (function, args)
+
+
+class StubRegistry:
+    """Just enough of SkillRegistry for IntentRouter.route()."""
+
+    def __init__(self, function, meta=None):
+        self.function = function
+        self.meta = meta or {}
+
+    def get_intents(self):
+        return [{"pattern": r"ping", "function": "ping", "template": "Got {result}."}]
+
+    def get_function(self, name):
+        return self.function
+
+    def get_function_meta(self, name):
+        return self.meta
+
+
+def test_route_runs_the_function_on_the_executor():
+    executor = ToolExecutor()
+    try:
+        router = IntentRouter(StubRegistry(lambda: "pong"), executor=executor)
+        assert router.route("ping") == "Got pong."
+        assert asyncio.run(router.route_async("please ping")) == "Got pong."
+        assert router.route("something else") is None
+    finally:
+        executor.shutdown()
+
+
+def test_route_applies_the_skill_timeout():
+    executor = ToolExecutor()
+    try:
+        router = IntentRouter(StubRegistry(lambda: time.sleep(1), {"timeout": 0.05}), executor=executor)
+        started = time.monotonic()
+        assert router.route("ping") == "I encountered an error while executing the request."
+        assert time.monotonic() - started < 0.5
+    finally:
+        executor.shutdown()
+
+
+def test_route_reports_errors_from_the_function():
+    def fail():
+        raise RuntimeError("boom")
+
+    executor = ToolExecutor()
+    try:
+        router = IntentRouter(StubRegistry(fail), executor=executor)
+        assert router.route("ping") == "I encountered an error while executing the request."
+    finally:
+        executor.shutdown()
@@ -0,0 +1,288 @@
+import json
+import asyncio
+
+import pytest
+
+from core.server import MAX_BODY_BYTES, HTTPError, JarvisServer, WebSocket, read_request
+
+TOKEN = "test-token"
+WS_KEY = "dGhlIHNhbXBsZSBub25jZQ=="
+
+
+def run(coroutine):
+    return asyncio.run(coroutine)
+
+
+def reader_for(data: bytes) -> asyncio.StreamReader:
+    reader = asyncio.StreamReader()
+    reader.feed_data(data)
+    reader.feed_eof()
+    return reader
+
+
+# ================== HTTP PARSING ==================
+def test_read_request_parses_head_query_and_body():
+    body = b'{"message": "hi"}'
+
+    async def parse():
+        return await read_request(reader_for(
+            b"POST /chat/?session_id=abc HTTP/1.1\r\nContent-Type: application/json; charset=utf-8\r\n"
+            + f"Content-Length: {len(body)}\r\n\r\n".encode() + body
+        ))
+
+    request = run(parse())
+    assert request.method == "POST" and request.path == "/chat"
+    assert request.query == {"session_id": "abc"}
+    assert request.is_json and request.keep_alive
+    assert request.json() == {"message": "hi"}
+
+
+def test_read_request_keeps_the_pipelined_prefix():
+    async def parse():
+        return await read_request(reader_for(b"alth HTTP/1.1\r\nConnection: close\r\n\r\n"), prefix=b"GET /he")
+
+    request = run(parse())
+    assert request.path == "/health" and not request.keep_alive
+
+
+def test_read_request_returns_none_at_eof():
+    async def parse():
+        return await read_request(reader_for(b""))
+
+    assert run(parse()) is None
+
+
+@pytest.mark.parametrize("length, status", [
+    ("abc", 400),
+    ("-5", 400),
+    (str(MAX_BODY_BYTES + 1), 413),
+])
+def test_read_request_rejects_bad_content_length(length, status):
+    async def parse():
+        return await read_request(reader_for(f"POST /chat HTTP/1.1\r\nContent-Length: {length}\r\n\r\n".encode()))
+
+    with pytest.raises(HTTPError) as error:
+        run(parse())
+    assert error.value.status == status
+
+
+@pytest.mark.parametrize("body", [b"not json", b"[1, 2]"])
+def test_request_json_must_be_an_object(body):
+    async def parse():
+        return await read_request(reader_for(
+            f"POST /chat HTTP/1.1\r\nContent-Length: {len(body)}\r\n\r\n".encode() + body
+        ))
+
+    with pytest.raises(HTTPError) as error:
+        run(parse()).json()
+    assert error.value.status == 400
+
+
+# ================== WEBSOCKET FRAMING ==================
+def masked_frame(payload: bytes, opcode: int = 0x1, fin: bool = True) -> bytes:
+    mask = b"\x01\x02\x03\x04"
+    masked = bytes(byte ^ mask[i % 4] for i, byte in enumerate(payload))
+    length = len(payload)
+    if length < 126:
+        header = bytes([(0x80 if fin else 0) | opcode, 0x80 | length])
+    else:
+        header = bytes([(0x80 if fin else 0) | opcode, 0x80 | 126]) + length.to_bytes(2, "big")
+    return header + mask + masked
+
+
+class RecordingWriter:
+    def __init__(self):
+        self.data = b""
+
+    def write(self, data: bytes):
+        self.data += data
+
+    async def drain(self):
+        pass
+
+
+def test_accept_key_matches_rfc_6455():
+    assert WebSocket.accept_key(WS_KEY) == "s3pPLMBiTxaQ9kYGzzhZRbK+xOo="
+
+
+def test_receive_unmasks_and_joins_fragments():
+    async def receive():
+        text = "x" * 300
+        websocket = WebSocket(
+            reader_for(masked_frame(text[:100].encode(), fin=False) + masked_frame(text[100:].encode(), opcode=0)),
+            RecordingWriter()
+        )
+        return text, await websocket.receive()
+
+    text, received = run(receive())
+    assert received == text
+
+
+def test_receive_answers_ping_and_stops_at_close():
+    async def receive():
+        writer = RecordingWriter()
+        websocket = WebSocket(reader_for(masked_frame(b"hi", opcode=0x9) + masked_frame(b"", opcode=0x8)), writer)
+        return await websocket.receive(), writer.data
+
+    received, sent = run(receive())
+    assert received is None
+    # Pong echoing the ping payload, then our close frame
+    assert sent.startswith(b"\x8a\x02hi") and sent[4:5] == b"\x88"
+
+
+def test_send_json_uses_extended_length():
+    async def send():
+        writer = RecordingWriter()
+        await WebSocket(reader_for(b""), writer).send_json({"text": "y" * 200})
+        return writer.data
+
+    sent = run(send())
+    assert sent[0] == 0x81 and sent[1] == 126
+    assert json.loads(sent[4:4 + int.from_bytes(sent[2:4], "big")]) == {"text": "y" * 200}
+
+
+# ================== SERVER ==================
+class EchoSession:
+    def clear(self):
+        pass
+
+
+class EchoEngine:
+    """Answers every prompt with "echo: <prompt>" in two chunks."""
+
+    def new_session(self):
+        return EchoSession()
+
+    async def stream_conversation(self, prompt, session, cancel_token):
+        yield "echo: "
+        yield prompt
+
+    async def aclose(self):
+        pass
+
+
+async def exchange(port: int, data: bytes) -> bytes:
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    writer.write(data)
+    await writer.drain()
+    response = await asyncio.wait_for(reader.read(), 5)
+    writer.close()
+    return response
+
+
+def post(path: str, body: bytes, headers: str = "") -> bytes:
+    return (
+        f"POST {path} HTTP/1.1\r\nConnection: close\r\nContent-Length: {len(body)}\r\n{headers}\r\n"
+    ).encode() + body
+
+
+def with_server(test, **options):
+    async def main():
+        server = await JarvisServer(None, "127.0.0.1", 0, engine=EchoEngine(), token=TOKEN, **options).start()
+        try:
+            return await test(server.port)
+        finally:
+            await server.aclose()
+    return run(main())
+
+
+def status_of(response: bytes) -> int:
+    return int(response.split(b" ", 2)[1])
+
+
+def test_chat_round_trip():
+    async def test(port):
+        return await exchange(port, post(
+            "/chat", b'{"message": "hello"}',
+            f"Authorization: Bearer {TOKEN}\r\nContent-Type: application/json\r\n"
+        ))
+
+    response = with_server(test)
+    assert status_of(response) == 200
+    assert json.loads(response.split(b"\r\n\r\n", 1)[1])["reply"] == "echo: hello"
+
+
+@pytest.mark.parametrize("headers, status", [
+    ("Content-Type: application/json\r\n", 401),
+    ("Authorization: Bearer wrong\r\nContent-Type: application/json\r\n", 401),
+    (f"Authorization: Bearer {TOKEN}\r\nContent-Type: text/plain\r\n", 415),
+    (f"Authorization: Bearer {TOKEN}\r\nOrigin: https://evil.example\r\nContent-Type: application/json\r\n", 403),
+])
+def test_chat_rejects_unauthorized_and_cross_site_posts(headers, status):
+    async def test(port):
+        return await exchange(port, post("/chat", b'{"message": "hello"}', headers))
+
+    assert status_of(with_server(test)) == status
+
+
+def test_allowlisted_origin_is_accepted():
+    async def test(port):
+        return await exchange(port, post(
+            "/chat", b'{"message": "hello"}',
+            f"Authorization: Bearer {TOKEN}\r\nOrigin: https://app.example\r\nContent-Type: application/json\r\n"
+        ))
+
+    assert status_of(with_server(test, origins=["https://app.example"])) == 200
+
+
+def test_pipelined_requests_are_both_answered():
+    async def test(port):
+        headers = f"Authorization: Bearer {TOKEN}\r\nContent-Type: application/json\r\n"
+        first = post("/chat", b'{"message": "one"}', headers).replace(b"Connection: close", b"Connection: keep-alive")
+        return await exchange(port, first + post("/chat", b'{"message": "two"}', headers))
+
+    response = with_server(test)
+    assert response.count(b"200 OK") == 2
+    assert b"echo: one" in response and b"echo: two" in response
+
+
+def test_server_generates_a_token_when_none_is_configured(monkeypatch):
+    monkeypatch.delenv("JARVIS_SERVER_TOKEN", raising=False)
+    server = JarvisServer(None, engine=EchoEngine())
+    assert server.generated_token and len(server.token) >= 32
+
+
+def websocket_upgrade(query: str = f"?token={TOKEN}", headers: str = "") -> bytes:
+    return (
+        f"GET /ws{query} HTTP/1.1\r\nUpgrade: websocket\r\nConnection: Upgrade\r\n"
+        f"Sec-WebSocket-Key: {WS_KEY}\r\n{headers}\r\n"
+    ).encode()
+
+
+async def read_frame(reader: asyncio.StreamReader) -> dict:
+    _, length = await reader.readexactly(2)
+    return json.loads(await reader.readexactly(length & 0x7F))
+
+
+def test_websocket_conversation():
+    async def test(port):
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        writer.write(websocket_upgrade())
+        head = await reader.readuntil(b"\r\n\r\n")
+        messages = [await read_frame(reader)]
+
+        writer.write(masked_frame(b'"just a string"'))
+        messages.append(await read_frame(reader))
+        writer.write(masked_frame(b'{"type": "message", "text": "hi", "id": 7}'))
+        while messages[-1].get("type") != "done":
+            messages.append(await read_frame(reader))
+        writer.close()
+        return head, messages
+
+    head, messages = with_server(test)
+    assert head.startswith(b"HTTP/1.1 101")
+    assert b"Sec-WebSocket-Accept: s3pPLMBiTxaQ9kYGzzhZRbK+xOo=" in head
+    assert messages[0]["type"] == "session"
+    assert messages[1] == {"type": "error", "error": "Message must be a JSON object"}
+    assert messages[-1] == {"type": "done", "id": 7, "reply": "echo: hi"}
+
+
+@pytest.mark.parametrize("query, headers, status", [
+    ("", "", 401),
+    (f"?token={TOKEN}", "Origin: https://evil.example\r\n", 403),
+])
+def test_websocket_upgrade_is_refused(query, headers, status):
+    async def test(port):
+        return await exchange(port, websocket_upgrade(query, headers))
+
+    assert status_of(with_server(test)) == status
@@ -0,0 +1,61 @@
+import asyncio
+
+from core.streaming import SentenceSegmenter, aiter_sentences, iter_sentences
+
+
+def test_sentences_complete_across_chunks():
+    chunks = ["The weather in Pa", "ris is sunny. It is", " 21 degrees! Any", "thing else?"]
+    assert list(iter_sentences(chunks)) == [
+        "The weather in Paris is sunny.",
+        "It is 21 degrees!",
+        "Anything else?"
+    ]
+
+
+def test_sentence_is_emitted_once_the_next_chunk_starts():
+    segmenter = SentenceSegmenter()
+    assert segmenter.feed("Hello there.") == []
+    assert segmenter.feed(" How") == ["Hello there."]
+    assert segmenter.flush() == "How"
+
+
+def test_abbreviations_do_not_end_a_sentence():
+    assert list(iter_sentences(["Dr. Smith met Mr. Jones, e.g. at noon. Then he left."])) == [
+        "Dr. Smith met Mr. Jones, e.g. at noon.",
+        "Then he left."
+    ]
+
+
+def test_no_is_an_abbreviation_only_before_a_number():
+    assert list(iter_sentences(["See item No. ", "5 on the list. Done."])) == [
+        "See item No. 5 on the list.",
+        "Done."
+    ]
+    assert list(iter_sentences(["The answer is no. ", "Next question."])) == [
+        "The answer is no.",
+        "Next question."
+    ]
+
+
+def test_newlines_end_a_sentence():
+    assert list(iter_sentences(["First item\nSecond item\n"])) == ["First item", "Second item"]
+
+
+def test_flush_returns_none_when_empty():
+    segmenter = SentenceSegmenter()
+    assert segmenter.feed("Done. ") == ["Done."]
+    assert segmenter.flush() is None
+    segmenter.feed("Trailing")
+    assert segmenter.flush() == "Trailing"
+    assert segmenter.flush() is None
+
+
+def test_aiter_sentences():
+    async def chunks():
+        for chunk in ["One. Tw", "o. Three"]:
+            yield chunk
+
+    async def collect():
+        return [sentence async for sentence in aiter_sentences(chunks())]
+
+    assert asyncio.run(collect()) == ["One.", "Two.", "Three"]